@@ -15,40 +15,47 @@ src_dir = os.path.join(current_dir, 'src')
 sys.path.insert(0, src_dir)
 
 from complete_dwarf_reader import MemoryReader, MemoryLayout
+from reader_daemon import connect_memory_reader
 
 def debug_dwarf_memory():
     """Debug da leitura de memória de um dwarf específico"""
     
-    # Encontrar processo do Dwarf Fortress
-    df_processes = []
-    for proc in psutil.process_iter(['pid', 'name']):
-        try:
-            if 'dwarf' in proc.info['name'].lower() and 'fortress' in proc.info['name'].lower():
-                df_processes.append(proc.info)
-        except:
-            continue
-            
-    if not df_processes:
-        print("Dwarf Fortress não encontrado!")
-        return
-        
-    df_pid = df_processes[0]['pid']
-    print(f"Dwarf Fortress encontrado: PID {df_pid}")
-    
-    # Carregar layout
-    layout_path = os.path.join(current_dir, '..', 'share', 'memory_layouts', 'windows', 'v0.52.05-steam_win64.ini')
-    from pathlib import Path
-    layout = MemoryLayout(Path(layout_path))
-    
-    if not layout.offsets:
-        print("Falha ao carregar layout!")
-        return
-        
-    # Criar memory reader
-    memory_reader = MemoryReader()
-    if not memory_reader.open_process(df_pid):
-        print("Falha ao abrir processo!")
-        return
+    # Com o reader_daemon.py rodando, usar as leituras e o layout dele
+    memory_reader = connect_memory_reader()
+    if memory_reader:
+        print("Usando o reader daemon")
+        layout = memory_reader.client.memory_layout()
+    else:
+        # Encontrar processo do Dwarf Fortress
+        df_processes = []
+        for proc in psutil.process_iter(['pid', 'name']):
+            try:
+                if 'dwarf' in proc.info['name'].lower() and 'fortress' in proc.info['name'].lower():
+                    df_processes.append(proc.info)
+            except:
+                continue
+
+        if not df_processes:
+            print("Dwarf Fortress não encontrado!")
+            return
+
+        df_pid = df_processes[0]['pid']
+        print(f"Dwarf Fortress encontrado: PID {df_pid}")
+
+        # Carregar layout
+        layout_path = os.path.join(current_dir, '..', 'share', 'memory_layouts', 'windows', 'v0.52.05-steam_win64.ini')
+        from pathlib import Path
+        layout = MemoryLayout(Path(layout_path))
+
+        if not layout.offsets:
+            print("Falha ao carregar layout!")
+            return
+
+        # Criar memory reader
+        memory_reader = MemoryReader()
+        if not memory_reader.open_process(df_pid):
+            print("Falha ao abrir processo!")
+            return
         
     try:
         # Obter endereço do vetor de criaturas
@@ -3,6 +3,8 @@
 Script principal para executar apenas o complete_dwarf_reader.py
 
 Este script executa diretamente o leitor completo de dados do Dwarf Fortress.
+Com --serve, sobe o servidor HTTP local de snapshots (src/snapshot_server.py)
+em vez de gerar um export em arquivo.
 """
 
 import sys
@@ -30,6 +32,10 @@ def main():
     try:
         # Importar e executar
         sys.path.insert(0, str(script_path.parent))
+        if '--serve' in sys.argv:
+            import snapshot_server
+            snapshot_server.main()
+            return
         import complete_dwarf_reader
         complete_dwarf_reader.main()
         
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Async Dwarf Reader - Front-end asyncio para o CompleteDFInstance
+As leituras de memória (bloqueantes) rodam num executor limitado, em lotes de
+dwarves: entre um lote e outro o event loop fica livre e a leitura pode ser
+cancelada. Pedidos de refresh simultâneos com a mesma projeção de campos
+compartilham uma única leitura em andamento (e iter_dwarves entrega os dwarves
+dela à medida que os lotes chegam); a leitura só é cancelada quando todos que
+a aguardam desistem (cancelamento ou timeout).
+"""
+
+import sys
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable, Iterable, AsyncIterator, FrozenSet
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData, DFStatus
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30.0  # segundos por chamada (connect/refresh) ou por lote (iter_dwarves)
+BATCH_SIZE = 25         # dwarves por chamada no executor
+
+class _SharedRead:
+    """Leitura em andamento: dwarves lidos até agora e um aviso a cada lote"""
+
+    def __init__(self, fields: Optional[FrozenSet[str]]):
+        self.fields = fields
+        self.dwarves: List[CompletelyDwarfData] = []
+        self.batch_ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+
+    def publish(self, batch: List[CompletelyDwarfData]):
+        self.dwarves.extend(batch)
+        ready, self.batch_ready = self.batch_ready, asyncio.Event()
+        ready.set()
+
+class AsyncDFInstance:
+    """CompleteDFInstance com connect/refresh/iter_dwarves assíncronos"""
+
+    def __init__(self, df_instance: Optional[CompleteDFInstance] = None, max_workers: int = 1,
+                 timeout: float = DEFAULT_TIMEOUT, batch_size: int = BATCH_SIZE):
+        self.df = df_instance or CompleteDFInstance()
+        # Um worker por padrão: as leituras do mesmo processo ficam serializadas
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="df-reader")
+        self.timeout = timeout
+        self.batch_size = batch_size
+
+        self.dwarves: List[CompletelyDwarfData] = []   # último refresh completo
+        self._inflight: Dict[Optional[FrozenSet[str]], _SharedRead] = {}
+        self.reads_started = 0
+        self.requests_coalesced = 0
+        self.last_refresh_seconds = 0.0
+
+    async def __aenter__(self) -> 'AsyncDFInstance':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _run(self, func: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    # ------------------------------------------------------------------
+    # Conexão
+    # ------------------------------------------------------------------
+
+    async def connect(self, layout_file: Optional[Path] = None, timeout: Optional[float] = None) -> bool:
+        """Conecta ao processo e carrega o layout de memória"""
+        def attach() -> bool:
+            return self.df.connect() and self.df.load_memory_layout(layout_file)
+        return await asyncio.wait_for(self._run(attach), timeout or self.timeout)
+
+    async def close(self):
+        """Cancela leituras em andamento, desconecta e encerra o executor"""
+        for shared in list(self._inflight.values()):
+            if shared.task:
+                shared.task.cancel()
+        await asyncio.gather(*(shared.task for shared in list(self._inflight.values()) if shared.task),
+                             return_exceptions=True)
+        await self._run(self.df.disconnect)
+        self._executor.shutdown(wait=True)
+
+    # ------------------------------------------------------------------
+    # Leitura compartilhada
+    # ------------------------------------------------------------------
+
+    def _join(self, fields: Optional[Iterable[str]]) -> _SharedRead:
+        """Leitura em andamento para a projeção, ou uma nova"""
+        key = None if fields is None else frozenset(fields)
+        shared = self._inflight.get(key)
+        if shared is not None:
+            self.requests_coalesced += 1
+            return shared
+        if self.df.status < DFStatus.LAYOUT_OK:
+            raise RuntimeError(f"Status inadequado para leitura: {self.df.status}")
+        self.df._read_plan(fields)  # campos desconhecidos falham aqui, antes da tarefa
+        shared = _SharedRead(key)
+        shared.task = asyncio.create_task(self._read(shared))
+        self._inflight[key] = shared
+        self.reads_started += 1
+        return shared
+
+    def _leave(self, shared: _SharedRead):
+        shared.waiters -= 1
+        if shared.waiters == 0 and shared.task and not shared.task.done():
+            logger.info("Leitura cancelada: nenhum consumidor aguardando")
+            shared.task.cancel()
+
+    def _prepare(self, fields: Optional[FrozenSet[str]]):
+        plan = self.df._read_plan(fields)
+        return self.df.creature_addresses(), plan, self.df._prepare_read(plan)
+
+    async def _read(self, shared: _SharedRead) -> List[CompletelyDwarfData]:
+        started = time.perf_counter()
+        try:
+            addresses, plan, current_year = await self._run(self._prepare, shared.fields)
+            for start in range(0, len(addresses), self.batch_size):
+                batch = await self._run(self.df.read_dwarf_batch, addresses[start:start + self.batch_size],
+                                        plan, current_year)
+                shared.publish(batch)
+            if plan.complete:
+                self.dwarves = self.df.dwarves = shared.dwarves
+                self.df._notify_refresh(shared.dwarves)
+                self.last_refresh_seconds = time.perf_counter() - started
+            if shared.dwarves:
+                self.df.status = DFStatus.GAME_LOADED
+            logger.info(f"Refresh assíncrono: {len(shared.dwarves)} dwarves em "
+                        f"{time.perf_counter() - started:.3f}s")
+            return shared.dwarves
+        finally:
+            if self._inflight.get(shared.fields) is shared:
+                del self._inflight[shared.fields]
+            shared.batch_ready.set()
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    async def refresh(self, fields: Optional[Iterable[str]] = None,
+                      timeout: Optional[float] = None) -> List[CompletelyDwarfData]:
+        """
+        Lê os dwarves (todos os campos, ou só fields como em read_dwarves). Se já
+        houver uma leitura igual em andamento, aguarda o resultado dela.
+        """
+        shared = self._join(fields)
+        shared.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(shared.task), timeout or self.timeout)
+        finally:
+            self._leave(shared)
+
+    async def iter_dwarves(self, fields: Optional[Iterable[str]] = None,
+                           timeout: Optional[float] = None) -> AsyncIterator[CompletelyDwarfData]:
+        """Entrega os dwarves de uma leitura (compartilhada) conforme cada lote termina"""
+        shared = self._join(fields)
+        shared.waiters += 1
+        try:
+            index = 0
+            while True:
+                while index < len(shared.dwarves):
+                    yield shared.dwarves[index]
+                    index += 1
+                if shared.task.done():
+                    shared.task.result()  # propaga erro ou cancelamento da leitura
+                    if index >= len(shared.dwarves):
+                        return
+                    continue
+                await asyncio.wait_for(shared.batch_ready.wait(), timeout or self.timeout)
+        finally:
+            self._leave(shared)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "reads_started": self.reads_started,
+            "requests_coalesced": self.requests_coalesced,
+            "in_flight": len(self._inflight),
+            "dwarves": len(self.dwarves),
+            "last_refresh_seconds": round(self.last_refresh_seconds, 3),
+        }
+
+async def _demo():
+    async with AsyncDFInstance() as reader:
+        if not await reader.connect():
+            print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+            return
+
+        # Três consumidores simultâneos: uma leitura só
+        results = await asyncio.gather(reader.refresh(), reader.refresh(), reader.refresh())
+        print(f"🔄 {len(results[0])} dwarves para 3 consumidores; {reader.stats()}")
+
+        print("\n📡 Nomes e estresse conforme os lotes chegam:")
+        count = 0
+        async for dwarf in reader.iter_dwarves(fields={'name', 'personality'}):
+            if count < 10:
+                stress = dwarf.personality.stress_level if dwarf.personality else 0
+                print(f"   {dwarf.name}: estresse {stress}")
+            count += 1
+        print(f"   ... {count} dwarves")
+        print(f"\n📊 {reader.stats()}")
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== ASYNC DWARF READER - Leituras compartilhadas com asyncio ===")
+    print()
+    asyncio.run(_demo())
+
+if __name__ == "__main__":
+    main()
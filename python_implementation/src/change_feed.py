@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Change Feed - Assinaturas de mudanças por campo dos dwarves
+Depois de cada refresh (read_dwarves completo, AsyncDFInstance ou
+RefreshScheduler) o feed compara o novo estado com o anterior uma única vez,
+só para a união dos campos assinados, e entrega a cada assinante apenas as
+tuplas (unit_id, campo, antigo, novo) dos campos e unidades que ele pediu,
+por callback ou por iterador assíncrono. Além dos campos de
+CompletelyDwarfData valem as colunas derivadas do dwarf_query (stress, focus,
+has_wounds...). Chegadas e saídas de unidades vêm no campo '*'.
+"""
+
+import sys
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Any, Callable, Iterable, NamedTuple, FrozenSet
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData, DWARF_FIELDS
+from dwarf_query import COLUMNS
+
+logger = logging.getLogger(__name__)
+
+UNIT_EVENT = '*'  # campo das chegadas (antigo None) e saídas (novo None) de unidades
+FEED_FIELDS = frozenset(DWARF_FIELDS | set(COLUMNS) | {UNIT_EVENT})
+
+class FieldChange(NamedTuple):
+    """Mudança de um campo de uma unidade entre dois refreshes"""
+    unit_id: int
+    field: str
+    old: Any
+    new: Any
+
+def _extractor(name: str) -> Callable[[CompletelyDwarfData], Any]:
+    if name in COLUMNS:
+        return COLUMNS[name]
+    return lambda dwarf: getattr(dwarf, name)
+
+class Subscription:
+    """Assinatura: campos e unidades de interesse e o destino das mudanças"""
+
+    def __init__(self, feed: 'ChangeFeed', callback: Callable[[List[FieldChange]], None],
+                 fields: Optional[FrozenSet[str]], units: Optional[FrozenSet[int]]):
+        self.feed = feed
+        self.callback = callback
+        self.fields = fields
+        self.units = units
+        self.delivered = 0
+
+    def wants(self, change: FieldChange) -> bool:
+        return ((self.fields is None or change.field in self.fields) and
+                (self.units is None or change.unit_id in self.units))
+
+    def unsubscribe(self):
+        self.feed._remove(self)
+
+class ChangeStream:
+    """Iterador assíncrono de lotes de mudanças (um lote por refresh)"""
+
+    def __init__(self, feed: 'ChangeFeed', fields: Optional[FrozenSet[str]],
+                 units: Optional[FrozenSet[int]], maxsize: int):
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.subscription = feed._add(Subscription(feed, self._push, fields, units))
+
+    def _push(self, changes: Optional[List[FieldChange]]):
+        # publish pode rodar em outra thread (executor): entregar pelo loop do assinante
+        self._loop.call_soon_threadsafe(self._put, changes)
+
+    def _put(self, changes: Optional[List[FieldChange]]):
+        if changes is not None and self.maxsize and self._queue.qsize() >= self.maxsize:
+            self._queue.get_nowait()  # descarta o lote mais antigo
+            self.dropped += 1
+        self._queue.put_nowait(changes)
+
+    def __aiter__(self) -> 'ChangeStream':
+        return self
+
+    async def __anext__(self) -> List[FieldChange]:
+        changes = await self._queue.get()
+        if changes is None:
+            raise StopAsyncIteration
+        return changes
+
+    def close(self):
+        self.subscription.unsubscribe()
+        self._push(None)
+
+class ChangeFeed:
+    """Calcula as diferenças uma vez por refresh e distribui aos assinantes"""
+
+    def __init__(self):
+        self._subscriptions: List[Subscription] = []
+        self._extractors: Dict[str, Callable[[CompletelyDwarfData], Any]] = {}
+        self._watch_units = False
+        self._previous: Dict[int, Dict[str, Any]] = {}   # unit_id -> campo -> valor
+        self.refreshes = 0
+        self.last_diff_seconds = 0.0
+
+    def attach(self, source: Any) -> 'ChangeFeed':
+        """Assina os refreshes de um CompleteDFInstance (ou RefreshScheduler)"""
+        source.add_refresh_listener(self.publish)
+        return self
+
+    # ------------------------------------------------------------------
+    # Assinaturas
+    # ------------------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[List[FieldChange]], None], fields: Optional[Iterable[str]] = None,
+                  units: Optional[Iterable[int]] = None) -> Subscription:
+        """callback(mudanças) após cada refresh com mudanças nos campos/unidades pedidos (None = todos)"""
+        return self._add(Subscription(self, callback, self._check_fields(fields),
+                                      None if units is None else frozenset(units)))
+
+    def stream(self, fields: Optional[Iterable[str]] = None, units: Optional[Iterable[int]] = None,
+               maxsize: int = 0) -> ChangeStream:
+        """Iterador assíncrono (async for) dos lotes de mudanças; maxsize limita a fila"""
+        return ChangeStream(self, self._check_fields(fields), None if units is None else frozenset(units), maxsize)
+
+    def _check_fields(self, fields: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+        if fields is None:
+            return None
+        fields = frozenset(fields)
+        unknown = fields - FEED_FIELDS
+        if unknown:
+            raise ValueError(f"Campos desconhecidos no feed: {sorted(unknown)}")
+        return fields
+
+    def _add(self, subscription: Subscription) -> Subscription:
+        self._subscriptions.append(subscription)
+        self._rebuild()
+        return subscription
+
+    def _remove(self, subscription: Subscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+            self._rebuild()
+
+    def _rebuild(self):
+        """União dos campos assinados; campos novos entram na base no próximo refresh"""
+        watched = set()
+        for subscription in self._subscriptions:
+            watched |= subscription.fields if subscription.fields is not None else FEED_FIELDS
+        self._watch_units = UNIT_EVENT in watched
+        watched.discard(UNIT_EVENT)
+        self._extractors = {name: _extractor(name) for name in sorted(watched)}
+
+    # ------------------------------------------------------------------
+    # Diferenças
+    # ------------------------------------------------------------------
+
+    def publish(self, dwarves: List[CompletelyDwarfData], units: Optional[Set[int]] = None) -> List[FieldChange]:
+        """
+        Compara o refresh com o anterior e entrega as mudanças. units = ids que
+        podem ter mudado (dica do RefreshScheduler); None = todos.
+        """
+        started = time.perf_counter()
+        extractors = self._extractors
+        previous = self._previous
+        current: Dict[int, Dict[str, Any]] = {}
+        changes: List[FieldChange] = []
+
+        for dwarf in dwarves:
+            unit_id = dwarf.id
+            old = previous.get(unit_id)
+            if old is not None and units is not None and unit_id not in units and old.keys() == extractors.keys():
+                current[unit_id] = old
+                continue
+            values = {name: extract(dwarf) for name, extract in extractors.items()}
+            current[unit_id] = values
+            if old is None:
+                if self.refreshes and self._watch_units:
+                    changes.append(FieldChange(unit_id, UNIT_EVENT, None, dwarf.name))
+                continue
+            for name, value in values.items():
+                if name in old and old[name] != value:
+                    changes.append(FieldChange(unit_id, name, old[name], value))
+
+        if self._watch_units:
+            for unit_id in previous.keys() - current.keys():
+                changes.append(FieldChange(unit_id, UNIT_EVENT, previous[unit_id].get('name', ""), None))
+
+        self._previous = current
+        self.refreshes += 1
+        self.last_diff_seconds = time.perf_counter() - started
+        if changes:
+            self._dispatch(changes)
+        return changes
+
+    def _dispatch(self, changes: List[FieldChange]):
+        for subscription in list(self._subscriptions):
+            selected = [change for change in changes if subscription.wants(change)]
+            if not selected:
+                continue
+            subscription.delivered += len(selected)
+            try:
+                subscription.callback(selected)
+            except Exception as e:
+                logger.error(f"Erro no assinante de mudanças: {e}")
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== CHANGE FEED - Mudanças de estresse e ferimentos ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        from refresh_scheduler import RefreshScheduler
+        scheduler = RefreshScheduler(df)
+        feed = ChangeFeed().attach(scheduler)
+        names: Dict[int, str] = {}
+
+        def show(changes: List[FieldChange]):
+            for change in changes:
+                print(f"   {names.get(change.unit_id, change.unit_id)}: {change.field} "
+                      f"{change.old} -> {change.new}")
+
+        feed.subscribe(show, fields={'stress', 'has_wounds', UNIT_EVENT})
+        for _ in range(30):
+            scheduler.poll()
+            names.update((dwarf.id, dwarf.name) for dwarf in scheduler.dwarf_list())
+            time.sleep(0.5)
+        print(f"\n📊 {feed.refreshes} refreshes, último diff em {feed.last_diff_seconds * 1000:.2f}ms")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
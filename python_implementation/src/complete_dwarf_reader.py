@@ -26,11 +26,14 @@ import sys
 import json
 import traceback
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Tuple, Any, Iterable, FrozenSet, NamedTuple
+from dataclasses import dataclass, asdict, field, fields as dataclass_fields, MISSING
 from enum import IntEnum
 import logging
 
+sys.path.insert(0, str(Path(__file__).parent))
+from game_data import read_array
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -96,6 +99,14 @@ class Equipment:
     material_index: int = 0
     quality: int = 0
     wear: int = 0
+    material_name: str = ""
+
+    @property
+    def material(self) -> Tuple[int, int]:
+        """(mat_type, mat_index) com sinal, como no DF (-1 = nenhum / material base)"""
+        mat_type = self.material_type - 0x10000 if self.material_type >= 0x8000 else self.material_type
+        mat_index = self.material_index - 0x100000000 if self.material_index >= 0x80000000 else self.material_index
+        return mat_type, mat_index
 
 @dataclass
 class Syndrome:
@@ -150,6 +161,7 @@ class CompletelyDwarfData:
     physical_attributes: List[Attribute] = field(default_factory=list)
     mental_attributes: List[Attribute] = field(default_factory=list)
     labors: List[Labor] = field(default_factory=list)
+    labor_mask: int = 0  # bit N = labor N habilitado (pack_labors)
     wounds: List[Wound] = field(default_factory=list)
     equipment: List[Equipment] = field(default_factory=list)
     syndromes: List[Syndrome] = field(default_factory=list)
@@ -163,8 +175,8 @@ class CompletelyDwarfData:
     address: int = 0
     soul_address: int = 0
     
-    def to_dict(self, human_readable: bool = False):
-        """Convert to dictionary for JSON serialization"""
+    def to_dict(self, human_readable: bool = False, figures=None):
+        """Convert to dictionary for JSON serialization (figures: HistoricalFigureIndex opcional)"""
         result = {}
         for key, value in asdict(self).items():
             if isinstance(value, list) and value and hasattr(value[0], '__dict__'):
@@ -180,7 +192,7 @@ class CompletelyDwarfData:
                 'flags': HumanReadableDecoder.decode_flags(self.flags1, self.flags2, self.flags3),
                 'body': HumanReadableDecoder.interpret_body_size(self.body_size),
                 'blood': HumanReadableDecoder.analyze_blood_level(self.blood_level),
-                'history': HumanReadableDecoder.validate_hist_id(self.hist_id),
+                'history': HumanReadableDecoder.validate_hist_id(self.hist_id, figures),
                 'squad': HumanReadableDecoder.decode_squad_info(self.squad_id, self.squad_position),
                 'pet': HumanReadableDecoder.decode_pet_owner(self.pet_owner_id),
                 'equipment': [EquipmentDecoder.decode_equipment_item(item) for item in result.get('equipment', [])]
@@ -188,12 +200,80 @@ class CompletelyDwarfData:
         
         return result
 
+MAX_CREATURES = 500  # criaturas lidas do creature_vector (limite para performance)
+
+# Sentinela de 32 bits convertido para -1 (ver nota no topo do arquivo)
+UINT32_MAX = 4294967295
+
+# Campos escalares de [dwarf_offsets], lidos num único bloco por dwarf:
+# campo -> (chave do offset, formato struct)
+DWARF_SCALARS: Dict[str, Tuple[str, str]] = {
+    'id': ('id', '<I'),
+    'race': ('race', '<I'),
+    'caste': ('caste', '<H'),
+    'sex': ('sex', '<B'),
+    'profession': ('profession', '<B'),
+    'mood': ('mood', '<h'),
+    'temp_mood': ('temp_mood', '<h'),
+    'flags1': ('flags1', '<I'),
+    'flags2': ('flags2', '<I'),
+    'flags3': ('flags3', '<I'),
+    'body_size': ('size_info', '<I'),
+    'blood_level': ('blood', '<I'),
+    'hist_id': ('hist_id', '<I'),
+    'civ_id': ('civ', '<I'),
+    'squad_id': ('squad_id', '<I'),
+    'squad_position': ('squad_position', '<I'),
+    'pet_owner_id': ('pet_owner_id', '<I'),
+    'turn_count': ('turn_count', '<I'),
+}
+_SENTINEL_FIELDS = ('squad_id', 'squad_position', 'pet_owner_id')
+_COUNTER_KEYS = (('counter1', 'counters1'), ('counter2', 'counters2'), ('counter3', 'counters3'))
+# Campos que saem da mesma leitura: pedir um traz os outros
+_FIELD_GROUPS = (('labors', 'labor_mask'), ('birth_year', 'birth_time', 'age'))
+# Campos lidos a partir da alma (precisam de soul_address)
+_SOUL_FIELDS = ('skills', 'personality', 'mental_attributes')
+
+_DWARF_DEFAULTS = {
+    f.name: f.default_factory if f.default_factory is not MISSING else (lambda value=f.default: value)
+    for f in dataclass_fields(CompletelyDwarfData)
+}
+DWARF_FIELDS = frozenset(_DWARF_DEFAULTS) - {'address'}
+
+class ReadPlan(NamedTuple):
+    """Campos de uma leitura e o bloco contíguo que cobre os escalares deles"""
+    fields: FrozenSet[str]
+    scalars: Tuple[Tuple[str, int, str], ...]  # (chave do offset, offset, formato)
+    block_start: int
+    block_size: int
+    complete: bool
+
+class ProjectedDwarf(CompletelyDwarfData):
+    """
+    Dwarf de read_dwarves(fields=...): só os campos pedidos são lidos; qualquer
+    outro campo é lido da memória no primeiro acesso (e fica guardado)
+    """
+
+    def __init__(self, df_instance: 'CompleteDFInstance', address: int):
+        # Sem CompletelyDwarfData.__init__: campo fora de __dict__ = ainda não lido
+        self.__dict__['_df'] = df_instance
+        self.__dict__['address'] = address
+
+    def __getattribute__(self, name: str):
+        if name in DWARF_FIELDS:
+            state = object.__getattribute__(self, '__dict__')
+            if name not in state:
+                df_instance = state['_df']
+                df_instance._apply_read_plan(self, df_instance._read_plan((name,), lazy=True))
+        return object.__getattribute__(self, name)
+
 class MemoryReader:
     """Low-level memory reading utilities for Windows"""
     
     def __init__(self):
         self.kernel32 = ctypes.windll.kernel32
         self.process_handle = None
+        self.read_calls = 0  # chamadas a ReadProcessMemory (orçamento de leitura)
         logger.info("MemoryReader inicializado")
         
     def open_process(self, pid: int) -> bool:
@@ -224,6 +304,7 @@ class MemoryReader:
             
         buffer = ctypes.create_string_buffer(size)
         bytes_read = ctypes.c_size_t()
+        self.read_calls += 1
         
         success = self.kernel32.ReadProcessMemory(
             self.process_handle,
@@ -234,7 +315,42 @@ class MemoryReader:
         )
         
         return buffer.raw if success else b''
-        
+
+    def read_blocks(self, addresses: List[int], size: int, max_gap: int = 0x1000) -> List[bytes]:
+        """
+        Read one block of `size` bytes per address, coalescing nearby blocks
+        into a single ReadProcessMemory call. Blocks that cannot be read come
+        back as b''.
+        """
+        if not addresses:
+            return []
+
+        order = sorted(range(len(addresses)), key=lambda i: addresses[i])
+        blocks = [b''] * len(addresses)
+
+        run = [order[0]]
+        for index in order[1:] + [None]:
+            if index is not None:
+                run_end = addresses[run[-1]] + size
+                if addresses[index] - run_end <= max_gap:
+                    run.append(index)
+                    continue
+
+            run_start = addresses[run[0]]
+            data = self.read_memory(run_start, addresses[run[-1]] + size - run_start)
+            for member in run:
+                if data:
+                    start = addresses[member] - run_start
+                    blocks[member] = data[start:start + size]
+                else:
+                    # Run crosses an unreadable page: fall back to one read per block
+                    blocks[member] = self.read_memory(addresses[member], size)
+
+            if index is not None:
+                run = [index]
+
+        return blocks
+
     def read_int32(self, address: int) -> int:
         """Read 32-bit integer from memory"""
         data = self.read_memory(address, 4)
@@ -298,13 +414,81 @@ class MemoryReader:
                 data = data[:null_pos]
                 
             return data.decode('utf-8', errors='ignore')
-            
+
         except Exception as e:
             logger.debug(f"Erro ao ler DF string em 0x{address:x}: {e}")
             return ""
 
-    def read_vector(self, address: int, pointer_size: int = 8) -> List[int]:
-        """Read std::vector of pointers"""
+    def decode_df_string(self, block: bytes, offset: int, pointer_size: int = 8) -> str:
+        """
+        Decode a DF string embedded in an already-read block. Short strings
+        live inline in the block; only heap-allocated ones cost a read.
+        """
+        STRING_BUFFER_LENGTH = 16
+        size_format = '<Q' if pointer_size == 8 else '<I'
+        if len(block) < offset + STRING_BUFFER_LENGTH + 2 * pointer_size:
+            return ""
+
+        length = struct.unpack_from(size_format, block, offset + STRING_BUFFER_LENGTH)[0]
+        capacity = struct.unpack_from(size_format, block, offset + STRING_BUFFER_LENGTH + pointer_size)[0]
+        if capacity == 0 or length == 0 or length > capacity or length > 1024:
+            return ""
+
+        if capacity >= STRING_BUFFER_LENGTH:
+            data = self.read_memory(struct.unpack_from(size_format, block, offset)[0], length)
+        else:
+            data = block[offset:offset + length]
+
+        null_pos = data.find(b'\x00')
+        if null_pos >= 0:
+            data = data[:null_pos]
+        return data.decode('utf-8', errors='ignore')
+
+    def read_pointer_array(self, address: int, count: int, pointer_size: int = 8) -> List[int]:
+        """Read `count` consecutive pointers with a single memory read"""
+        if count <= 0:
+            return []
+        data = self.read_memory(address, count * pointer_size)
+        if len(data) != count * pointer_size:
+            return []
+        return list(struct.unpack(f'<{count}{"Q" if pointer_size == 8 else "I"}', data))
+
+    def read_embedded_vectors(self, blocks: List[bytes], offset: int, pointer_size: int = 8,
+                              max_count: int = 10000, item_format: Optional[str] = None) -> List[Tuple[int, ...]]:
+        """
+        Read the contents of the std::vector embedded at `offset` in each
+        already-read block, with one coalesced read for all of them. Elements
+        are pointers unless `item_format` (e.g. 'i' for vector<int32>) is given.
+        """
+        pointer_format = 'Q' if pointer_size == 8 else 'I'
+        item_format = item_format or pointer_format
+        item_size = struct.calcsize('<' + item_format)
+
+        bounds = []
+        for block in blocks:
+            if len(block) < offset + 2 * pointer_size:
+                bounds.append((0, 0))
+                continue
+            start, end = struct.unpack_from(f'<2{pointer_format}', block, offset)
+            valid = start and start < end <= start + max_count * item_size
+            bounds.append((start, end) if valid else (0, 0))
+
+        wanted = [i for i, (start, _) in enumerate(bounds) if start]
+        sizes = [bounds[i][1] - bounds[i][0] for i in wanted]
+        storage = self.read_blocks([bounds[i][0] for i in wanted], max(sizes, default=0))
+        vectors: List[Tuple[int, ...]] = [() for _ in blocks]
+        for i, size, data in zip(wanted, sizes, storage):
+            count = size // item_size
+            if count > 0 and len(data) >= count * item_size:
+                vectors[i] = struct.unpack_from(f'<{count}{item_format}', data)
+        return vectors
+
+    def read_vector(self, address: int, pointer_size: int = 8, max_count: int = 10000,
+                    keep_nulls: bool = False) -> List[int]:
+        """
+        Read std::vector of pointers. Null slots are dropped unless
+        `keep_nulls` is set, which keeps list index == DF id.
+        """
         try:
             start_ptr = self.read_pointer(address, pointer_size)
             end_ptr = self.read_pointer(address + pointer_size, pointer_size)
@@ -313,17 +497,11 @@ class MemoryReader:
                 return []
                 
             count = (end_ptr - start_ptr) // pointer_size
-            if count > 10000:  # Sanity check
+            if count > max_count:  # Sanity check
                 return []
                 
-            pointers = []
-            for i in range(count):
-                ptr_addr = start_ptr + (i * pointer_size)
-                ptr = self.read_pointer(ptr_addr, pointer_size)
-                if ptr != 0:
-                    pointers.append(ptr)
-                    
-            return pointers
+            pointers = self.read_pointer_array(start_ptr, count, pointer_size)
+            return pointers if keep_nulls else [ptr for ptr in pointers if ptr != 0]
             
         except Exception as e:
             logger.debug(f"Erro ao ler vetor em 0x{address:x}: {e}")
@@ -368,8 +546,10 @@ class MemoryLayout:
         offset_sections = [
             'offsets', 'dwarf_offsets', 'soul_details', 'unit_wound_offsets',
             'race_offsets', 'caste_offsets', 'hist_figure_offsets',
+            'hist_entity_offsets', 'hist_event_offsets',
             'item_offsets', 'syndrome_offsets', 'emotion_offsets',
-            'need_offsets', 'job_details', 'squad_offsets', 'activity_offsets'
+            'need_offsets', 'job_details', 'squad_offsets', 'activity_offsets',
+            'material_offsets', 'plant_offsets'
         ]
         
         for section in offset_sections:
@@ -383,13 +563,17 @@ class MemoryLayout:
                     'race_offsets': 'race',
                     'caste_offsets': 'caste',
                     'hist_figure_offsets': 'hist_figure',
+                    'hist_entity_offsets': 'hist_entity',
+                    'hist_event_offsets': 'hist_event',
                     'item_offsets': 'item',
                     'syndrome_offsets': 'syndrome',
                     'emotion_offsets': 'emotion',
                     'need_offsets': 'need',
                     'job_details': 'job',
                     'squad_offsets': 'squad',
-                    'activity_offsets': 'activity'
+                    'activity_offsets': 'activity',
+                    'material_offsets': 'material',
+                    'plant_offsets': 'plant'
                 }
                 
                 key = key_map.get(section, section.replace('_offsets', '').replace('_details', ''))
@@ -400,6 +584,21 @@ class MemoryLayout:
                 
         logger.info(f"Total de seções de offset carregadas: {len(self.offsets)}")
         logger.info(f"Seções disponíveis: {list(self.offsets.keys())}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Layout já interpretado (info, endereços, offsets), para enviar a outro processo"""
+        return {'info': self.info, 'addresses': self.addresses, 'offsets': self.offsets}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MemoryLayout':
+        """Layout recebido de outro processo (reader_daemon.py), sem arquivo .ini"""
+        layout = cls.__new__(cls)
+        layout.config = configparser.ConfigParser()
+        layout.info = dict(data.get('info', {}))
+        layout.addresses = {k: int(v) for k, v in data.get('addresses', {}).items()}
+        layout.offsets = {section: {k: int(v) for k, v in values.items()}
+                          for section, values in data.get('offsets', {}).items()}
+        return layout
                 
     def get_address(self, key: str) -> int:
         """Get global address for a key"""
@@ -585,8 +784,8 @@ class HumanReadableDecoder:
         }
     
     @staticmethod
-    def validate_hist_id(hist_id: int) -> Dict[str, Any]:
-        """Valida e interpreta o hist_id"""
+    def validate_hist_id(hist_id: int, figures=None) -> Dict[str, Any]:
+        """Valida e interpreta o hist_id (figures: HistoricalFigureIndex opcional)"""
         if hist_id < 0:
             return {
                 "valid": False,
@@ -596,13 +795,22 @@ class HumanReadableDecoder:
                 "display_text": "N/A (no history)"
             }
         
-        return {
+        result = {
             "valid": True,
             "has_history": True,
             "id": hist_id,
             "description": f"Figura histórica #{hist_id}",
             "display_text": f"Historical Figure #{hist_id:,}"
         }
+        
+        if figures is not None:
+            figure = figures.get(hist_id)
+            result["found"] = figure is not None
+            if figure is not None:
+                result["race"] = figure.race
+                result["name"] = figures.name(hist_id)
+        
+        return result
     
     @staticmethod
     def decode_squad_info(squad_id: int, squad_position: int) -> Dict[str, Any]:
@@ -789,6 +997,10 @@ class EquipmentDecoder:
         if "wear" in item:
             decoded["wear"] = EquipmentDecoder.decode_wear(item["wear"])
         
+        # Material name resolved by MaterialIndex at read time
+        if item.get("material_name"):
+            decoded["material"] = item["material_name"]
+        
         # Keep original values for reference
         decoded["raw_values"] = {
             "item_id": item.get("item_id", -1),
@@ -802,18 +1014,48 @@ class EquipmentDecoder:
         return decoded
 
 
+# Vetores globais de itens usados para pré-carregar os tipos por vtable.
+# artifacts_vector fica de fora: guarda artifact_record (sem vtable, artifact_id em +0x0), não itens
+ITEM_VECTOR_KEYS = (
+    'weapons_vector', 'shields_vector', 'quivers_vector', 'crutches_vector',
+    'backpacks_vector', 'ammo_vector', 'flasks_vector', 'pants_vector',
+    'armor_vector', 'shoes_vector', 'helms_vector', 'gloves_vector'
+)
+
+# unit.status.labors: um byte (bool) por labor, lido inteiro como em Dwarf::read_labors
+LABOR_COUNT = 94
+_LABOR_BIT_TABLE = b'0' + b'1' * 255  # byte != 0 -> '1'
+
+def pack_labors(data: bytes) -> int:
+    """Array de bools dos labors -> inteiro com o bit N = labor N habilitado"""
+    return int(data.translate(_LABOR_BIT_TABLE)[::-1], 2) if data else 0
+
+# VM_TYPE_OFFSET do dfinstance.h (Windows): imediato de "mov eax, tipo" em getType()
+VM_TYPE_OFFSET = 0x1
+
 class CompleteDFInstance:
     """Instância completa que lê TODOS os dados possíveis"""
     
-    def __init__(self):
+    def __init__(self, prescan_item_types: bool = False, memory_reader: Optional[MemoryReader] = None):
         logger.info("Inicializando CompleteDFInstance")
-        self.memory_reader = MemoryReader()
+        # memory_reader alternativo: RemoteMemoryReader lê pelo reader_daemon.py
+        self.memory_reader = memory_reader or MemoryReader()
         self.layout: Optional[MemoryLayout] = None
         self.pid = 0
         self.base_addr = 0
         self.pointer_size = 8
         self.status = DFStatus.DISCONNECTED
         self.dwarves: List[CompletelyDwarfData] = []
+        self.race_cache = None  # RaceCache, carregado uma vez por conexão (race_cache.py)
+        self.material_index = None  # MaterialIndex, idem (material_index.py)
+        self.hist_figures = None  # HistoricalFigureIndex, idem (historical_figures.py)
+        # vtable -> ITEM_TYPE (None = tipo fora da faixa); ~90 classes de item por sessão
+        self.item_type_cache: Dict[int, Optional[int]] = {}
+        self.prescan_item_types = prescan_item_types
+        # Planos de leitura por projeção de campos (read_dwarves), por layout
+        self._read_plans: Dict[Tuple[Optional[FrozenSet[str]], bool], ReadPlan] = {}
+        # listener(dwarves, unit_ids alterados ou None) após cada leitura completa (change_feed.py)
+        self.refresh_listeners: List[Any] = []
         
         # Dados de referência
         self.skill_names = self._load_skill_names()
@@ -842,7 +1084,13 @@ class CompleteDFInstance:
         }
         
     def _load_labor_names(self) -> Dict[int, str]:
-        """Load labor names"""
+        """Load labor names from game_data.ini ([labors]), falling back to the basic set"""
+        try:
+            labors = {int(entry['id']): entry.get('name', "") for entry in read_array('labors') if 'id' in entry}
+            if labors:
+                return dict(sorted(labors.items()))
+        except (FileNotFoundError, ValueError) as e:
+            logger.warning(f"Labors do game_data.ini indisponíveis: {e}")
         return {
             0: "Mine", 1: "Cut Wood", 2: "Carpentry", 3: "Stonework",
             4: "Engraving", 5: "Masonry", 6: "Animal Care", 7: "Animal Train",
@@ -962,7 +1210,11 @@ class CompleteDFInstance:
         try:
             self.layout = MemoryLayout(layout_file)
             self.status = DFStatus.LAYOUT_OK
+            self.item_type_cache.clear()
+            self._read_plans.clear()
             logger.info("Layout carregado com sucesso")
+            if self.prescan_item_types:
+                self.prescan_item_vtables()
             return True
         except Exception as e:
             logger.error(f"Erro ao carregar layout: {e}")
@@ -971,44 +1223,42 @@ class CompleteDFInstance:
             
     def read_complete_dwarves(self) -> List[CompletelyDwarfData]:
         """Lê TODOS os dados possíveis dos dwarves"""
-        logger.info("=== LENDO DADOS COMPLETOS DOS DWARVES ===")
+        return self.read_dwarves()
+
+    def read_dwarves(self, fields: Optional[Iterable[str]] = None) -> List[CompletelyDwarfData]:
+        """
+        Lê os dwarves do creature_vector. Sem fields lê tudo; com fields (ex.:
+        {'name', 'personality'}) lê só esses campos, mais id e name, e devolve
+        ProjectedDwarf, que lê qualquer outro campo da memória se for acessado.
+        """
+        if fields is None:
+            logger.info("=== LENDO DADOS COMPLETOS DOS DWARVES ===")
         
         if self.status < DFStatus.LAYOUT_OK:
             logger.error(f"Status inadequado para leitura: {self.status}")
             return []
             
+        plan = self._read_plan(fields)
+        if not plan.complete:
+            logger.info(f"Lendo dwarves com os campos: {sorted(plan.fields)}")
+
         try:
-            creature_vector_addr = self.layout.get_address('creature_vector')
-            if not creature_vector_addr:
-                logger.error("Endereço creature_vector não encontrado no layout")
-                logger.error(f"Endereços disponíveis: {list(self.layout.addresses.keys())}")
-                return []
-                
-            logger.info(f"creature_vector base: 0x{creature_vector_addr:x}")
-            creature_vector_addr += self.base_addr
-            logger.info(f"creature_vector final: 0x{creature_vector_addr:x}")
-            
-            creature_pointers = self.memory_reader.read_vector(creature_vector_addr, self.pointer_size)
-            
-            logger.info(f"Encontradas {len(creature_pointers)} criaturas")
-            
+            creature_pointers = self.creature_addresses()
             if not creature_pointers:
                 logger.warning("Nenhuma criatura encontrada no vetor")
                 return []
             
-            complete_dwarves = []
-            for i, creature_addr in enumerate(creature_pointers[:500]):  # Limite para performance
-                logger.debug(f"Processando criatura {i+1}/{len(creature_pointers)} em 0x{creature_addr:x}")
-                dwarf = self._read_complete_dwarf(creature_addr)
-                if dwarf and dwarf.name:
-                    complete_dwarves.append(dwarf)
-                    logger.debug(f"Dwarf carregado: {dwarf.name} (ID: {dwarf.id})")
+            current_year = self._prepare_read(plan)
+            complete_dwarves = self.read_dwarf_batch(creature_pointers, plan, current_year)
                     
-            self.dwarves = complete_dwarves
+            if plan.complete:
+                self.dwarves = complete_dwarves
+                self._notify_refresh(complete_dwarves)
             
             if complete_dwarves:
                 self.status = DFStatus.GAME_LOADED
-                logger.info(f"=== CARREGADOS {len(complete_dwarves)} DWARVES COMPLETOS ===")
+                logger.info(f"=== CARREGADOS {len(complete_dwarves)} DWARVES "
+                            f"{'COMPLETOS' if plan.complete else 'PARCIAIS'} ===")
             else:
                 logger.warning("Nenhum dwarf válido foi carregado")
                 
@@ -1018,119 +1268,215 @@ class CompleteDFInstance:
             logger.error(f"Erro ao ler dwarves completos: {e}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             return []
+
+    def add_refresh_listener(self, listener):
+        """listener(dwarves, units) é chamado após cada leitura completa dos dwarves"""
+        self.refresh_listeners.append(listener)
+
+    def _notify_refresh(self, dwarves: List[CompletelyDwarfData], units=None):
+        for listener in self.refresh_listeners:
+            try:
+                listener(dwarves, units)
+            except Exception as e:
+                logger.error(f"Erro em listener de refresh: {e}")
+
+    def creature_addresses(self) -> List[int]:
+        """Endereços das criaturas do creature_vector (até MAX_CREATURES)"""
+        creature_vector_addr = self.layout.get_address('creature_vector')
+        if not creature_vector_addr:
+            logger.error("Endereço creature_vector não encontrado no layout")
+            logger.error(f"Endereços disponíveis: {list(self.layout.addresses.keys())}")
+            return []
             
-    def _read_complete_dwarf(self, address: int) -> Optional[CompletelyDwarfData]:
-        """Lê TODOS os dados de um dwarf"""
+        logger.debug(f"creature_vector base: 0x{creature_vector_addr:x}")
+        creature_vector_addr += self.base_addr
+        logger.debug(f"creature_vector final: 0x{creature_vector_addr:x}")
+        
+        creature_pointers = self.memory_reader.read_vector(creature_vector_addr, self.pointer_size)
+        logger.debug(f"Encontradas {len(creature_pointers)} criaturas")
+        return creature_pointers[:MAX_CREATURES]
+
+    def _prepare_read(self, plan: ReadPlan) -> Optional[int]:
+        """Carrega o que o plano precisa (índice de materiais) e devolve o ano atual"""
+        if self.material_index is None and 'equipment' in plan.fields:
+            try:
+                from material_index import load_material_index
+                load_material_index(self)
+            except Exception as e:
+                logger.warning(f"Índice de materiais indisponível: {e}")
+        return self._read_current_year() if 'age' in plan.fields else None
+
+    def read_dwarf_batch(self, addresses: List[int], plan: Optional[ReadPlan] = None,
+                         current_year: Optional[int] = None) -> List[CompletelyDwarfData]:
+        """Lê os dwarves dos endereços com o plano; criaturas sem nome são descartadas"""
+        plan = plan or self._read_plan()
+        dwarves = []
+        for i, creature_addr in enumerate(addresses):
+            logger.debug(f"Processando criatura {i+1}/{len(addresses)} em 0x{creature_addr:x}")
+            dwarf = self._read_complete_dwarf(creature_addr, plan, current_year)
+            if dwarf and dwarf.name:
+                dwarves.append(dwarf)
+                logger.debug(f"Dwarf carregado: {dwarf.name} (ID: {dwarf.id})")
+        return dwarves
+
+    def _read_plan(self, fields: Optional[Iterable[str]] = None, lazy: bool = False) -> ReadPlan:
+        """
+        Plano de leitura para uma projeção (None = todos os campos). lazy = só os
+        campos pedidos, para ProjectedDwarf completar um campo acessado
+        """
+        key = (None if fields is None else frozenset(fields), lazy)
+        plan = self._read_plans.get(key)
+        if plan is not None:
+            return plan
+
+        if fields is None:
+            wanted = set(DWARF_FIELDS)
+        else:
+            wanted = set(fields)
+            unknown = wanted - DWARF_FIELDS - {'address'}
+            if unknown:
+                raise ValueError(f"Campos desconhecidos em CompletelyDwarfData: {sorted(unknown)}")
+            wanted.discard('address')
+            if not lazy:
+                wanted.update(('id', 'name'))
+        for group in _FIELD_GROUPS:
+            if wanted.intersection(group):
+                wanted.update(group)
+        if wanted.intersection(_SOUL_FIELDS):
+            wanted.add('soul_address')
+
+        offsets = self.layout.offsets.get('dwarf', {})
+        keys = [DWARF_SCALARS[name] for name in DWARF_SCALARS if name in wanted]
+        if 'counters' in wanted:
+            keys.extend((offset_key, '<I') for _, offset_key in _COUNTER_KEYS)
+        if 'age' in wanted and offsets.get('birth_year', 0):
+            keys.append(('birth_year', '<I'))
+            if offsets.get('birth_time', 0):
+                keys.append(('birth_time', '<I'))
+        scalars = tuple((offset_key, offsets.get(offset_key, 0), fmt) for offset_key, fmt in keys)
+
+        block_start = min((offset for _, offset, _ in scalars), default=0)
+        block_end = max((offset + struct.calcsize(fmt) for _, offset, fmt in scalars), default=0)
+        plan = ReadPlan(fields=frozenset(wanted), scalars=scalars, block_start=block_start,
+                        block_size=block_end - block_start, complete=fields is None)
+        self._read_plans[key] = plan
+        return plan
+
+    def _read_current_year(self) -> Optional[int]:
+        current_year_addr = self.layout.get_address('current_year')
+        if not current_year_addr:
+            return None
+        return self.memory_reader.read_int32(current_year_addr + self.base_addr)
+            
+    def _read_complete_dwarf(self, address: int, plan: Optional[ReadPlan] = None,
+                             current_year: Optional[int] = None) -> Optional[CompletelyDwarfData]:
+        """Lê os dados de um dwarf (TODOS, ou só os campos do plano)"""
         try:
-            offsets = self.layout.offsets.get('dwarf', {})
-            if not offsets:
+            if not self.layout.offsets.get('dwarf', {}):
                 return None
                 
-            dwarf = CompletelyDwarfData(address=address)
-            
-            # 1. DADOS BÁSICOS
-            dwarf.id = self.memory_reader.read_int32(address + offsets.get('id', 0))
-            dwarf.race = self.memory_reader.read_int32(address + offsets.get('race', 0))
-            dwarf.caste = self.memory_reader.read_int16(address + offsets.get('caste', 0))
-            dwarf.sex = self.memory_reader.read_int8(address + offsets.get('sex', 0))
-            dwarf.profession = self.memory_reader.read_int8(address + offsets.get('profession', 0))
-            dwarf.mood = self.memory_reader.read_int16_signed(address + offsets.get('mood', 0))
-            dwarf.temp_mood = self.memory_reader.read_int16_signed(address + offsets.get('temp_mood', 0))
-            
-            # 2. FLAGS E STATUS
-            dwarf.flags1 = self.memory_reader.read_int32(address + offsets.get('flags1', 0))
-            dwarf.flags2 = self.memory_reader.read_int32(address + offsets.get('flags2', 0))
-            dwarf.flags3 = self.memory_reader.read_int32(address + offsets.get('flags3', 0))
-            
-            # 3. DADOS FÍSICOS
-            dwarf.body_size = self.memory_reader.read_int32(address + offsets.get('size_info', 0))
-            dwarf.blood_level = self.memory_reader.read_int32(address + offsets.get('blood', 0))
-            
-            # 4. IDS E REFERÊNCIAS
-            dwarf.hist_id = self.memory_reader.read_int32(address + offsets.get('hist_id', 0))
-            dwarf.civ_id = self.memory_reader.read_int32(address + offsets.get('civ', 0))
-            
-            # Converter valores sentinela (4294967295 = 0xFFFFFFFF) para -1 (mais legível)
-            UINT32_MAX = 4294967295
-            squad_id_raw = self.memory_reader.read_int32(address + offsets.get('squad_id', 0))
-            dwarf.squad_id = -1 if squad_id_raw == UINT32_MAX else squad_id_raw
-            
-            squad_position_raw = self.memory_reader.read_int32(address + offsets.get('squad_position', 0))
-            dwarf.squad_position = -1 if squad_position_raw == UINT32_MAX else squad_position_raw
-            
-            pet_owner_id_raw = self.memory_reader.read_int32(address + offsets.get('pet_owner_id', 0))
-            dwarf.pet_owner_id = -1 if pet_owner_id_raw == UINT32_MAX else pet_owner_id_raw
-            
-            # 5. CONTADORES
-            dwarf.turn_count = self.memory_reader.read_int32(address + offsets.get('turn_count', 0))
-            dwarf.counters = {
-                'counter1': self.memory_reader.read_int32(address + offsets.get('counters1', 0)),
-                'counter2': self.memory_reader.read_int32(address + offsets.get('counters2', 0)),
-                'counter3': self.memory_reader.read_int32(address + offsets.get('counters3', 0))
-            }
-            
-            # 6. STRINGS
-            name_offset = offsets.get('name', 0)
-            if name_offset:
-                dwarf.name = self.memory_reader.read_df_string(address + name_offset, self.pointer_size)
-                
-            custom_prof_offset = offsets.get('custom_profession', 0)
-            if custom_prof_offset:
-                dwarf.custom_profession = self.memory_reader.read_df_string(address + custom_prof_offset, self.pointer_size)
-            
-            # 7. IDADE
-            birth_year_offset = offsets.get('birth_year', 0)
-            birth_time_offset = offsets.get('birth_time', 0)
-            if birth_year_offset:
-                dwarf.birth_year = self.memory_reader.read_int32(address + birth_year_offset)
-                if birth_time_offset:
-                    dwarf.birth_time = self.memory_reader.read_int32(address + birth_time_offset)
-                    
-                current_year_addr = self.layout.get_address('current_year')
-                if current_year_addr:
-                    current_year = self.memory_reader.read_int32(current_year_addr + self.base_addr)
-                    dwarf.age = current_year - dwarf.birth_year
-            
-            # 8. DADOS COMPLEXOS - SKILLS
-            souls_offset = offsets.get('souls', 0)
-            if souls_offset:
-                dwarf.soul_address, dwarf.skills = self._read_skills(address + souls_offset)
-                
-            # 9. ATRIBUTOS FÍSICOS
-            phys_attrs_offset = offsets.get('physical_attrs', 0)
-            if phys_attrs_offset:
-                dwarf.physical_attributes = self._read_attributes(address + phys_attrs_offset, is_physical=True)
-                
-            # 10. LABORS
-            labors_offset = offsets.get('labors', 0)
-            if labors_offset:
-                dwarf.labors = self._read_labors(address + labors_offset)
-                
-            # 11. FERIMENTOS
-            wounds_offset = offsets.get('wounds_vector', 0)
-            if wounds_offset:
-                dwarf.wounds = self._read_wounds(address + wounds_offset)
-                
-            # 12. SÍNDROMES
-            syndrome_offset = offsets.get('active_syndrome_vector', 0)
-            if syndrome_offset:
-                dwarf.syndromes = self._read_syndromes(address + syndrome_offset)
-                
-            # 13. EQUIPAMENTOS
-            inventory_offset = offsets.get('inventory', 0)
-            if inventory_offset:
-                dwarf.equipment = self._read_equipment(address + inventory_offset)
-                
-            # 14. PERSONALIDADE (da alma)
-            if dwarf.soul_address:
-                dwarf.personality = self._read_personality(dwarf.soul_address)
-                dwarf.mental_attributes = self._read_mental_attributes(dwarf.soul_address)
-                
+            if plan is None:
+                plan = self._read_plan()
+                current_year = self._read_current_year()
+            if plan.complete:
+                dwarf = CompletelyDwarfData(address=address)
+            else:
+                dwarf = ProjectedDwarf(self, address)
+            self._apply_read_plan(dwarf, plan, current_year)
             return dwarf
             
         except Exception as e:
             logger.debug(f"Erro ao ler dwarf completo em 0x{address:x}: {e}")
             return None
+
+    def _apply_read_plan(self, dwarf: CompletelyDwarfData, plan: ReadPlan,
+                         current_year: Optional[int] = None):
+        """Preenche em dwarf os campos do plano, lidos de dwarf.address"""
+        address = dwarf.address
+        offsets = self.layout.offsets.get('dwarf', {})
+        wanted = plan.fields
+        if not plan.complete:
+            for name in wanted:
+                setattr(dwarf, name, _DWARF_DEFAULTS[name]())
+
+        # 1-5. ESCALARES (dados básicos, flags, físico, IDs, contadores): um bloco só
+        values = {}
+        if plan.scalars:
+            block = self.memory_reader.read_memory(address + plan.block_start, plan.block_size)
+            for offset_key, offset, fmt in plan.scalars:
+                size = struct.calcsize(fmt)
+                if len(block) == plan.block_size:
+                    data = block[offset - plan.block_start:offset - plan.block_start + size]
+                else:
+                    # Bloco atravessa página ilegível: um read por campo
+                    data = self.memory_reader.read_memory(address + offset, size)
+                values[offset_key] = struct.unpack(fmt, data)[0] if len(data) == size else 0
+
+        for name, (offset_key, _) in DWARF_SCALARS.items():
+            if name in wanted:
+                value = values[offset_key]
+                # Converter valores sentinela (4294967295 = 0xFFFFFFFF) para -1 (mais legível)
+                setattr(dwarf, name, -1 if name in _SENTINEL_FIELDS and value == UINT32_MAX else value)
+        if 'counters' in wanted:
+            dwarf.counters = {counter: values[offset_key] for counter, offset_key in _COUNTER_KEYS}
+        
+        # 6. STRINGS
+        name_offset = offsets.get('name', 0)
+        if name_offset and 'name' in wanted:
+            dwarf.name = self.memory_reader.read_df_string(address + name_offset, self.pointer_size)
+            
+        custom_prof_offset = offsets.get('custom_profession', 0)
+        if custom_prof_offset and 'custom_profession' in wanted:
+            dwarf.custom_profession = self.memory_reader.read_df_string(address + custom_prof_offset, self.pointer_size)
+        
+        # 7. IDADE
+        if 'birth_year' in values:
+            dwarf.birth_year = values['birth_year']
+            dwarf.birth_time = values.get('birth_time', 0)
+            if current_year is None:
+                current_year = self._read_current_year()
+            if current_year is not None:
+                dwarf.age = current_year - dwarf.birth_year
+        
+        # 8. DADOS COMPLEXOS - SKILLS (e endereço da alma)
+        souls_offset = offsets.get('souls', 0)
+        if souls_offset and 'skills' in wanted:
+            dwarf.soul_address, dwarf.skills = self._read_skills(address + souls_offset)
+        elif souls_offset and 'soul_address' in wanted:
+            soul_pointers = self.memory_reader.read_vector(address + souls_offset, self.pointer_size)
+            dwarf.soul_address = soul_pointers[0] if soul_pointers else 0
+            
+        # 9. ATRIBUTOS FÍSICOS
+        phys_attrs_offset = offsets.get('physical_attrs', 0)
+        if phys_attrs_offset and 'physical_attributes' in wanted:
+            dwarf.physical_attributes = self._read_attributes(address + phys_attrs_offset, is_physical=True)
+            
+        # 10. LABORS
+        labors_offset = offsets.get('labors', 0)
+        if labors_offset and 'labors' in wanted:
+            dwarf.labor_mask, dwarf.labors = self._read_labors(address + labors_offset)
+            
+        # 11. FERIMENTOS
+        wounds_offset = offsets.get('wounds_vector', 0)
+        if wounds_offset and 'wounds' in wanted:
+            dwarf.wounds = self._read_wounds(address + wounds_offset)
+            
+        # 12. SÍNDROMES
+        syndrome_offset = offsets.get('active_syndrome_vector', 0)
+        if syndrome_offset and 'syndromes' in wanted:
+            dwarf.syndromes = self._read_syndromes(address + syndrome_offset)
+            
+        # 13. EQUIPAMENTOS
+        inventory_offset = offsets.get('inventory', 0)
+        if inventory_offset and 'equipment' in wanted:
+            dwarf.equipment = self._read_equipment(address + inventory_offset)
+            
+        # 14. PERSONALIDADE (da alma)
+        if 'soul_address' in wanted and dwarf.soul_address:
+            if 'personality' in wanted:
+                dwarf.personality = self._read_personality(dwarf.soul_address)
+            if 'mental_attributes' in wanted:
+                dwarf.mental_attributes = self._read_mental_attributes(dwarf.soul_address)
             
     def _read_skills(self, souls_vector_addr: int) -> Tuple[int, List[Skill]]:
         """Lê skills da alma do dwarf"""
@@ -1213,33 +1559,23 @@ class CompleteDFInstance:
             logger.debug(f"Erro ao ler atributos mentais: {e}")
             return []
             
-    def _read_labors(self, labors_addr: int) -> List[Labor]:
-        """Lê trabalhos habilitados/desabilitados"""
+    def _read_labors(self, labors_addr: int) -> Tuple[int, List[Labor]]:
+        """Lê trabalhos habilitados/desabilitados (máscara empacotada e lista nomeada)"""
         try:
-            # Labors são um bitfield de ~30 bytes
-            labor_data = self.memory_reader.read_memory(labors_addr, 32)
+            # Labors são um array de bools, um byte por labor
+            labor_data = self.memory_reader.read_memory(labors_addr, LABOR_COUNT)
             if not labor_data:
-                return []
-                
-            labors = []
-            for labor_id in range(min(len(self.labor_names), 32 * 8)):
-                byte_index = labor_id // 8
-                bit_index = labor_id % 8
+                return 0, []
                 
-                if byte_index < len(labor_data):
-                    enabled = bool(labor_data[byte_index] & (1 << bit_index))
-                    
-                    labor = Labor(
-                        id=labor_id,
-                        enabled=enabled,
-                        name=self.labor_names.get(labor_id, f"Labor_{labor_id}")
-                    )
-                    labors.append(labor)
-                    
-            return labors
+            mask = pack_labors(labor_data)
+            labors = [
+                Labor(id=labor_id, enabled=bool(mask >> labor_id & 1), name=name)
+                for labor_id, name in self.labor_names.items() if labor_id < len(labor_data)
+            ]
+            return mask, labors
         except Exception as e:
             logger.debug(f"Erro ao ler labors: {e}")
-            return []
+            return 0, []
             
     def _read_wounds(self, wounds_vector_addr: int) -> List[Wound]:
         """Lê ferimentos"""
@@ -1286,7 +1622,64 @@ class CompleteDFInstance:
             logger.debug(f"Erro ao ler síndromes: {e}")
             return []
             
-    def _read_item_type(self, item_addr: int) -> int:
+    def _item_type_for_vtable(self, vtable_addr: int) -> Optional[int]:
+        """
+        Resolve and memoize the ITEM_TYPE of a vtable. Every item of the same
+        class shares one vtable, so this costs two reads per class per session.
+        """
+        if vtable_addr in self.item_type_cache:
+            return self.item_type_cache[vtable_addr]
+
+        item_type = -1  # NONE: type info pointer is invalid
+        type_info_addr = self.memory_reader.read_pointer(vtable_addr, self.pointer_size)
+        if type_info_addr >= 0x1000:
+            value = self.memory_reader.read_int32(type_info_addr + VM_TYPE_OFFSET)
+            # Validate range (ITEM_TYPE enum is 0-90 approximately); None = probe the item
+            item_type = value if value <= 100 else None
+
+        self.item_type_cache[vtable_addr] = item_type
+        return item_type
+
+    def prescan_item_vtables(self, samples_per_vector: int = 256) -> int:
+        """
+        Pre-resolve the vtables of the items found in the global item vectors,
+        so later _read_item_type calls cost a single pointer read per item.
+        Returns the number of vtables resolved.
+        """
+        item_pointers: List[int] = []
+        for key in ITEM_VECTOR_KEYS:
+            vector_addr = self.layout.get_address(key)
+            if vector_addr:
+                item_pointers.extend(self.memory_reader.read_vector(vector_addr + self.base_addr,
+                                                                    self.pointer_size)[:samples_per_vector])
+
+        pointer_format = '<Q' if self.pointer_size == 8 else '<I'
+        vtables = set()
+        for block in self.memory_reader.read_blocks(item_pointers, self.pointer_size):
+            if len(block) == self.pointer_size:
+                vtable_addr = struct.unpack(pointer_format, block)[0]
+                if vtable_addr >= 0x1000 and vtable_addr not in self.item_type_cache:
+                    vtables.add(vtable_addr)
+
+        vtables = sorted(vtables)
+        type_infos = [struct.unpack(pointer_format, block)[0] if len(block) == self.pointer_size else 0
+                      for block in self.memory_reader.read_blocks(vtables, self.pointer_size)]
+        readable = [i for i, address in enumerate(type_infos) if address >= 0x1000]
+        values = self.memory_reader.read_blocks([type_infos[i] + VM_TYPE_OFFSET for i in readable], 4)
+
+        for vtable_addr in vtables:
+            self.item_type_cache[vtable_addr] = -1
+        for i, block in zip(readable, values):
+            if len(block) != 4:
+                del self.item_type_cache[vtables[i]]  # resolved lazily instead
+            else:
+                value = struct.unpack('<I', block)[0]
+                self.item_type_cache[vtables[i]] = value if value <= 100 else None
+
+        logger.info(f"Pré-varredura de itens: {len(vtables)} vtables de {len(item_pointers)} itens")
+        return len(vtables)
+
+    def _read_item_type(self, item_addr: int, vtable_addr: Optional[int] = None) -> int:
         """
         Read item type from vtable (C++ polymorphism)
         Based on src/item.cpp line 119:
@@ -1298,37 +1691,31 @@ class CompleteDFInstance:
         - Windows default: 0x1
         - Linux: 0x5
         - OSX: varies
+        
+        The vtable -> type mapping is memoized in item_type_cache; callers that
+        already read the item block can pass vtable_addr to skip the first read.
         """
         try:
             # Step 1: Read vtable pointer at item address
-            vtable_addr = self.memory_reader.read_pointer(item_addr, self.pointer_size)
+            if vtable_addr is None:
+                vtable_addr = self.memory_reader.read_pointer(item_addr, self.pointer_size)
             
             if vtable_addr == 0 or vtable_addr < 0x1000:  # Invalid pointer
                 return -1  # NONE
             
-            # Step 2: Read type info pointer from vtable + VM_TYPE_OFFSET
-            # Try Windows default: 0x1 (from dfinstance.h)
-            vm_type_offset = 0x1
-            type_info_addr = self.memory_reader.read_pointer(vtable_addr, self.pointer_size)
-            
-            if type_info_addr == 0 or type_info_addr < 0x1000:
-                return -1
-            
-            # Step 3: Read actual type ID (int32) at type_info_addr + offset
-            item_type = self.memory_reader.read_int32(type_info_addr + vm_type_offset)
-            
-            # Validate range (ITEM_TYPE enum is 0-90 approximately)
-            if item_type < -1 or item_type > 100:
-                # Try alternative: read directly from vtable structure
-                # Some DF versions may store type differently
-                for test_offset in [0, 4, 8, 12, 16, 20]:
-                    test_type = self.memory_reader.read_int32(item_addr + test_offset)
-                    if 0 <= test_type <= 90:
-                        logger.debug(f"Found item_type {test_type} at offset {test_offset:x} for addr {item_addr:x}")
-                        return test_type
-                return -1
-                
-            return item_type
+            # Steps 2-3: type info pointer + type ID, once per vtable
+            item_type = self._item_type_for_vtable(vtable_addr)
+            if item_type is not None:
+                return item_type
+            
+            # Try alternative: read directly from item structure
+            # Some DF versions may store type differently
+            for test_offset in [0, 4, 8, 12, 16, 20]:
+                test_type = self.memory_reader.read_int32(item_addr + test_offset)
+                if 0 <= test_type <= 90:
+                    logger.debug(f"Found item_type {test_type} at offset {test_offset:x} for addr {item_addr:x}")
+                    return test_type
+            return -1
         except Exception as e:
             logger.debug(f"Failed to read item type at {item_addr:x}: {e}")
             return -1  # NONE
@@ -1365,15 +1752,19 @@ class CompleteDFInstance:
                 
                 # Read item type via vtable (now should work correctly!)
                 item_type = self._read_item_type(item_addr)
+                mat_index_raw = self.memory_reader.read_int32(item_addr + item_offsets.get('mat_index', 0))
                 
                 item = Equipment(
                     item_id=self.memory_reader.read_int32(item_addr + item_offsets.get('id', 0)),
                     item_type=item_type,
                     material_type=mat_type_raw,
-                    material_index=self.memory_reader.read_int32(item_addr + item_offsets.get('mat_index', 0)),
+                    material_index=mat_index_raw,
                     quality=-1 if quality_raw == SHORT_MAX else quality_raw,
                     wear=-1 if wear_raw == SHORT_MAX else wear_raw
                 )
+                if self.material_index:
+                    # mat_type/mat_index são com sinal no DF (-1 = nenhum); nome memorizado por par
+                    item.material_name = self.material_index.name(*item.material, item_type)
                 equipment.append(item)
                 
             return equipment
@@ -1395,12 +1786,16 @@ class CompleteDFInstance:
                 focus_level=self.memory_reader.read_int32(soul_addr + focus_offset) if focus_offset else 0
             )
             
-            # Ler traits (array de valores)
+            # Ler traits (array de valores) numa leitura só
             if traits_offset:
-                for trait_id in range(25):  # ~25 traits de personalidade
-                    trait_addr = soul_addr + traits_offset + (trait_id * 4)
-                    trait_value = self.memory_reader.read_int32(trait_addr)
-                    personality.traits[trait_id] = trait_value
+                trait_count = 25  # ~25 traits de personalidade
+                data = self.memory_reader.read_memory(soul_addr + traits_offset, trait_count * 4)
+                if len(data) == trait_count * 4:
+                    personality.traits = dict(enumerate(struct.unpack(f'<{trait_count}I', data)))
+                else:
+                    for trait_id in range(trait_count):
+                        trait_addr = soul_addr + traits_offset + (trait_id * 4)
+                        personality.traits[trait_id] = self.memory_reader.read_int32(trait_addr)
                     
             return personality
         except Exception as e:
@@ -1425,6 +1820,14 @@ class CompleteDFInstance:
             total_skills = sum(len(d.skills) for d in self.dwarves)
             total_wounds = sum(len(d.wounds) for d in self.dwarves)
             total_equipment = sum(len(d.equipment) for d in self.dwarves)
+
+            figures = None
+            if decode_data and self.status >= DFStatus.LAYOUT_OK:
+                try:
+                    from historical_figures import load_hist_figures
+                    figures = load_hist_figures(self)
+                except Exception as e:
+                    logger.warning(f"Figuras históricas indisponíveis: {e}")
             
             data = {
                 'metadata': {
@@ -1444,11 +1847,23 @@ class CompleteDFInstance:
                         'dwarves_with_equipment': len([d for d in self.dwarves if d.equipment])
                     }
                 },
-                'dwarves': [dwarf.to_dict(human_readable=decode_data) for dwarf in self.dwarves]
+                'dwarves': [dwarf.to_dict(human_readable=decode_data, figures=figures) for dwarf in self.dwarves]
             }
             
             # Aplicar decodificação adicional se solicitado
             if decode_data:
+                race_cache = None
+                if self.status >= DFStatus.LAYOUT_OK:
+                    try:
+                        from race_cache import load_race_cache
+                        race_cache = load_race_cache(self)
+                        data['metadata']['race_table'] = race_cache.world_key
+                        for dwarf, dwarf_dict in zip(self.dwarves, data['dwarves']):
+                            dwarf_dict['_decoded']['race'] = race_cache.describe(dwarf.race, dwarf.caste)
+                    except Exception as e:
+                        logger.warning(f"Tabela de raças indisponível: {e}")
+                        race_cache = None
+
                 logger.info("Aplicando decodificação adicional aos dados...")
                 try:
                     # Importar decodificador externo se disponível
@@ -1456,7 +1871,7 @@ class CompleteDFInstance:
                     sys.path.insert(0, str(tools_path))
                     from complete_decoder import DwarfDataDecoder
                     
-                    decoder = DwarfDataDecoder()
+                    decoder = DwarfDataDecoder(race_cache=race_cache)
                     
                     for i, dwarf_dict in enumerate(data['dwarves']):
                         if i % 50 == 0:
@@ -1496,6 +1911,10 @@ class CompleteDFInstance:
     def disconnect(self):
         """Disconnect from process"""
         self.memory_reader.close_process()
+        self.race_cache = None
+        self.material_index = None
+        self.hist_figures = None
+        self.item_type_cache.clear()
         self.status = DFStatus.DISCONNECTED
 
 def main():
@@ -1538,10 +1957,13 @@ def main():
         # Estatísticas detalhadas
         print(f"\nDADOS CARREGADOS:")
         print(f"   Dwarves: {len(dwarves)}")
-        print(f"   Com skills: {len([d for d in dwarves if d.skills])}")
-        print(f"   Com ferimentos: {len([d for d in dwarves if d.wounds])}")
-        print(f"   Com equipamentos: {len([d for d in dwarves if d.equipment])}")
-        print(f"   Com personalidade: {len([d for d in dwarves if d.personality])}")
+        from dwarf_query import DwarfIndex
+        index = DwarfIndex()
+        index.refresh(dwarves)
+        print(f"   Com skills: {index.count('has_skills')}")
+        print(f"   Com ferimentos: {index.count('has_wounds')}")
+        print(f"   Com equipamentos: {index.count('has_equipment')}")
+        print(f"   Com personalidade: {index.count('has_personality')}")
         
         # Primeiro dwarf como exemplo
         if dwarves:
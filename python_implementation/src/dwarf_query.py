@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Dwarf Query - Consultas indexadas sobre a lista de dwarves
+Mantém os dwarves em colunas com índices secundários em bitsets (bit R =
+linha R): profissão, raça, casta, sexo, squad, humor, flags (tem skills,
+ferimentos...), cada labor e cada skill por nível. Filtros por campos
+indexados viram AND/OR/NOT de inteiros e só as linhas restantes são lidas para
+filtros livres, ordenação e projeção. A cada refresh apenas os bits dos
+valores que mudaram são atualizados; as linhas de cada unidade são estáveis.
+"""
+
+import sys
+import json
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any, Callable, Iterable, Union
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData, LABOR_COUNT
+from labor_matrix import load_labor_catalog, iter_bits, popcount
+from game_data import read_array
+
+logger = logging.getLogger(__name__)
+
+MAX_SKILL_LEVEL = 20  # níveis acima (lendário +N) contam como 20 nos índices
+
+# Colunas extraídas de cada dwarf
+COLUMNS: Dict[str, Callable[[CompletelyDwarfData], Any]] = {
+    'id': lambda dwarf: dwarf.id,
+    'name': lambda dwarf: dwarf.name,
+    'profession': lambda dwarf: dwarf.profession,
+    'race': lambda dwarf: dwarf.race,
+    'caste': lambda dwarf: dwarf.caste,
+    'sex': lambda dwarf: dwarf.sex,
+    'age': lambda dwarf: dwarf.age,
+    'mood': lambda dwarf: dwarf.mood,
+    'happiness': lambda dwarf: dwarf.happiness,
+    'squad_id': lambda dwarf: dwarf.squad_id,
+    'civ_id': lambda dwarf: dwarf.civ_id,
+    'hist_id': lambda dwarf: dwarf.hist_id,
+    'labor_mask': lambda dwarf: dwarf.labor_mask,
+    'stress': lambda dwarf: dwarf.personality.stress_level if dwarf.personality else 0,
+    'focus': lambda dwarf: dwarf.personality.focus_level if dwarf.personality else 0,
+    'has_skills': lambda dwarf: bool(dwarf.skills),
+    'has_wounds': lambda dwarf: bool(dwarf.wounds),
+    'has_equipment': lambda dwarf: bool(dwarf.equipment),
+    'has_syndromes': lambda dwarf: bool(dwarf.syndromes),
+    'has_personality': lambda dwarf: dwarf.personality is not None,
+}
+# Colunas com índice por valor
+INDEXED_FIELDS = ('profession', 'race', 'caste', 'sex', 'squad_id', 'civ_id', 'mood',
+                  'has_skills', 'has_wounds', 'has_equipment', 'has_syndromes', 'has_personality')
+
+def _set_bit(index: Dict[Any, int], key: Any, bit: int):
+    index[key] = index.get(key, 0) | bit
+
+def _clear_bit(index: Dict[Any, int], key: Any, bit: int):
+    bitset = index.get(key, 0) & ~bit
+    if bitset:
+        index[key] = bitset
+    else:
+        index.pop(key, None)
+
+def _skill_levels(dwarf: CompletelyDwarfData) -> Dict[int, int]:
+    return {skill.id: max(0, min(skill.level, MAX_SKILL_LEVEL)) for skill in dwarf.skills}
+
+class DwarfIndex:
+    """Dwarves em colunas com índices em bitsets, atualizados incrementalmente"""
+
+    def __init__(self):
+        self.dwarves: List[Optional[CompletelyDwarfData]] = []
+        self.columns: Dict[str, List[Any]] = {name: [] for name in COLUMNS}
+        self.skills: List[Dict[int, int]] = []        # linha -> {skill: nível}
+        self.indexes: Dict[str, Dict[Any, int]] = {field: {} for field in INDEXED_FIELDS}
+        self.labors: List[int] = [0] * LABOR_COUNT    # labor -> bitset
+        self.skill_levels: Dict[int, List[int]] = {}  # skill -> nível -> bitset
+        self.alive = 0
+        self._row_of: Dict[int, int] = {}
+        self._free_rows: List[int] = []
+        self.version = 0
+        self.last_changes: Dict[str, int] = {}
+        self.refresh_seconds = 0.0
+
+        self._labor_ids: Optional[Dict[str, int]] = None
+        self._skill_ids: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    # ------------------------------------------------------------------
+    # Atualização incremental
+    # ------------------------------------------------------------------
+
+    def refresh(self, dwarves: List[CompletelyDwarfData]) -> Dict[str, int]:
+        """Aplica a nova lista: adiciona, atualiza (só bits alterados) e remove"""
+        started = time.perf_counter()
+        added = updated = 0
+        seen = set()
+        for dwarf in dwarves:
+            seen.add(dwarf.id)
+            row = self._row_of.get(dwarf.id)
+            if row is None:
+                self._insert(dwarf)
+                added += 1
+            elif self._update(row, dwarf):
+                updated += 1
+
+        removed = [unit_id for unit_id in self._row_of if unit_id not in seen]
+        for unit_id in removed:
+            self._remove(self._row_of[unit_id])
+
+        self.version += 1
+        self.last_changes = {"added": added, "updated": updated, "removed": len(removed)}
+        self.refresh_seconds = time.perf_counter() - started
+        logger.info(f"Índice v{self.version}: {len(self)} dwarves "
+                    f"(+{added} ~{updated} -{len(removed)}) em {self.refresh_seconds:.3f}s")
+        return self.last_changes
+
+    def _insert(self, dwarf: CompletelyDwarfData):
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            row = len(self.dwarves)
+            self.dwarves.append(None)
+            self.skills.append({})
+            for column in self.columns.values():
+                column.append(None)
+        bit = 1 << row
+        self._row_of[dwarf.id] = row
+        self.dwarves[row] = dwarf
+        self.alive |= bit
+        for name, extract in COLUMNS.items():
+            self.columns[name][row] = extract(dwarf)
+        for field in INDEXED_FIELDS:
+            _set_bit(self.indexes[field], self.columns[field][row], bit)
+        for labor_id in iter_bits(dwarf.labor_mask):
+            if labor_id < LABOR_COUNT:
+                self.labors[labor_id] |= bit
+        levels = _skill_levels(dwarf)
+        self.skills[row] = levels
+        for skill_id, level in levels.items():
+            self._skill_buckets(skill_id)[level] |= bit
+
+    def _update(self, row: int, dwarf: CompletelyDwarfData) -> bool:
+        bit = 1 << row
+        changed = False
+        self.dwarves[row] = dwarf
+        for name, extract in COLUMNS.items():
+            value = extract(dwarf)
+            column = self.columns[name]
+            if column[row] == value:
+                continue
+            changed = True
+            if name in self.indexes:
+                _clear_bit(self.indexes[name], column[row], bit)
+                _set_bit(self.indexes[name], value, bit)
+            elif name == 'labor_mask':
+                for labor_id in iter_bits(column[row] ^ value):
+                    if labor_id < LABOR_COUNT:
+                        self.labors[labor_id] ^= bit
+            column[row] = value
+
+        levels = _skill_levels(dwarf)
+        old_levels = self.skills[row]
+        if levels != old_levels:
+            changed = True
+            for skill_id, level in old_levels.items():
+                if levels.get(skill_id) != level:
+                    self.skill_levels[skill_id][level] &= ~bit
+            for skill_id, level in levels.items():
+                if old_levels.get(skill_id) != level:
+                    self._skill_buckets(skill_id)[level] |= bit
+            self.skills[row] = levels
+        return changed
+
+    def _remove(self, row: int):
+        bit = 1 << row
+        for field in INDEXED_FIELDS:
+            _clear_bit(self.indexes[field], self.columns[field][row], bit)
+        for labor_id in iter_bits(self.columns['labor_mask'][row]):
+            if labor_id < LABOR_COUNT:
+                self.labors[labor_id] &= ~bit
+        for skill_id, level in self.skills[row].items():
+            self.skill_levels[skill_id][level] &= ~bit
+        del self._row_of[self.columns['id'][row]]
+        self.dwarves[row] = None
+        self.skills[row] = {}
+        for column in self.columns.values():
+            column[row] = None
+        self.alive &= ~bit
+        self._free_rows.append(row)
+
+    def _skill_buckets(self, skill_id: int) -> List[int]:
+        buckets = self.skill_levels.get(skill_id)
+        if buckets is None:
+            buckets = self.skill_levels[skill_id] = [0] * (MAX_SKILL_LEVEL + 1)
+        return buckets
+
+    # ------------------------------------------------------------------
+    # Bitsets
+    # ------------------------------------------------------------------
+
+    def labor_id(self, labor: Union[int, str]) -> int:
+        """Id do labor pelo id ou nome do game_data.ini"""
+        if isinstance(labor, int):
+            return labor
+        if self._labor_ids is None:
+            self._labor_ids = {info.name.lower(): labor_id for labor_id, info in load_labor_catalog().items()}
+        return self._labor_ids.get(labor.lower(), -1)
+
+    def skill_id(self, skill: Union[int, str]) -> int:
+        """Id da skill pelo id ou nome do game_data.ini"""
+        if isinstance(skill, int):
+            return skill
+        if self._skill_ids is None:
+            self._skill_ids = {entry.get('name', "").lower(): skill_id
+                               for skill_id, entry in enumerate(read_array('skills'))}
+        return self._skill_ids.get(skill.lower(), -1)
+
+    def bits_for(self, field: str, values: Iterable[Any]) -> int:
+        """Linhas com o campo indexado igual a qualquer um dos valores"""
+        index = self.indexes[field]
+        bitset = 0
+        for value in values:
+            bitset |= index.get(value, 0)
+        return bitset
+
+    def labor_bits(self, labor: Union[int, str]) -> int:
+        labor_id = self.labor_id(labor)
+        return self.labors[labor_id] if 0 <= labor_id < LABOR_COUNT else 0
+
+    def skill_bits(self, skill: Union[int, str], min_level: int = 0, max_level: int = MAX_SKILL_LEVEL) -> int:
+        """Linhas com a skill num nível entre min_level e max_level"""
+        buckets = self.skill_levels.get(self.skill_id(skill))
+        bitset = 0
+        if buckets:
+            for level in range(max(min_level, 0), min(max_level, MAX_SKILL_LEVEL) + 1):
+                bitset |= buckets[level]
+        return bitset
+
+    def count(self, field: str, value: Any = True) -> int:
+        """Contagem direto do índice (ex.: count('has_wounds'))"""
+        return popcount(self.indexes[field].get(value, 0))
+
+    def rows_of(self, bitset: int) -> List[int]:
+        return list(iter_bits(bitset))
+
+    def query(self) -> 'DwarfQuery':
+        return DwarfQuery(self)
+
+class DwarfQuery:
+    """
+    Consulta encadeável: filtros por índice (where, has_labor, skill_at_least,
+    not_in_squad...) estreitam o bitset; filter/between, order_by, select e
+    limit atuam só nas linhas que sobraram.
+    """
+
+    def __init__(self, index: DwarfIndex):
+        self.index = index
+        self._bits = index.alive
+        self._predicates: List[Callable[[int], bool]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._fields: Optional[Tuple[str, ...]] = None
+        self._limit: Optional[int] = None
+
+    # Filtros indexados ---------------------------------------------------
+
+    def where(self, field: str, *values: Any) -> 'DwarfQuery':
+        """Campo igual a um dos valores (índice se houver, senão varredura das linhas restantes)"""
+        if field in self.index.indexes:
+            self._bits &= self.index.bits_for(field, values)
+        else:
+            column = self.index.columns[field]
+            accepted = set(values)
+            self._predicates.append(lambda row: column[row] in accepted)
+        return self
+
+    def exclude(self, field: str, *values: Any) -> 'DwarfQuery':
+        if field in self.index.indexes:
+            self._bits &= ~self.index.bits_for(field, values)
+        else:
+            column = self.index.columns[field]
+            rejected = set(values)
+            self._predicates.append(lambda row: column[row] not in rejected)
+        return self
+
+    def has_labor(self, *labors: Union[int, str]) -> 'DwarfQuery':
+        """Com todos os labors"""
+        for labor in labors:
+            self._bits &= self.index.labor_bits(labor)
+        return self
+
+    def has_any_labor(self, *labors: Union[int, str]) -> 'DwarfQuery':
+        bitset = 0
+        for labor in labors:
+            bitset |= self.index.labor_bits(labor)
+        self._bits &= bitset
+        return self
+
+    def lacks_labor(self, *labors: Union[int, str]) -> 'DwarfQuery':
+        """Sem nenhum dos labors"""
+        for labor in labors:
+            self._bits &= ~self.index.labor_bits(labor)
+        return self
+
+    def skill_at_least(self, skill: Union[int, str], level: int) -> 'DwarfQuery':
+        self._bits &= self.index.skill_bits(skill, level)
+        return self
+
+    def skill_between(self, skill: Union[int, str], low: int, high: int) -> 'DwarfQuery':
+        self._bits &= self.index.skill_bits(skill, low, high)
+        return self
+
+    def in_squad(self) -> 'DwarfQuery':
+        return self.exclude('squad_id', -1)
+
+    def not_in_squad(self) -> 'DwarfQuery':
+        return self.where('squad_id', -1)
+
+    # Filtros livres ------------------------------------------------------
+
+    def between(self, field: str, low: Any = None, high: Any = None) -> 'DwarfQuery':
+        column = self.index.columns[field]
+        self._predicates.append(lambda row: (low is None or column[row] >= low) and
+                                            (high is None or column[row] <= high))
+        return self
+
+    def filter(self, predicate: Callable[[CompletelyDwarfData], bool]) -> 'DwarfQuery':
+        """Predicado sobre o CompletelyDwarfData (avaliado depois dos índices)"""
+        dwarves = self.index.dwarves
+        self._predicates.append(lambda row: predicate(dwarves[row]))
+        return self
+
+    # Ordenação, projeção e limite ----------------------------------------
+
+    def order_by(self, field: str, descending: bool = False) -> 'DwarfQuery':
+        self._order.append((field, descending))
+        return self
+
+    def select(self, *fields: str) -> 'DwarfQuery':
+        self._fields = fields
+        return self
+
+    def limit(self, count: int) -> 'DwarfQuery':
+        self._limit = count
+        return self
+
+    # Resultados ----------------------------------------------------------
+
+    def bitset(self) -> int:
+        return self._bits
+
+    def _rows(self) -> List[int]:
+        rows = self.index.rows_of(self._bits)
+        for predicate in self._predicates:
+            rows = [row for row in rows if predicate(row)]
+        for field, descending in reversed(self._order):
+            column = self.index.columns[field] if field in self.index.columns else None
+            if column is not None:
+                rows.sort(key=column.__getitem__, reverse=descending)
+            else:
+                dwarves = self.index.dwarves
+                rows.sort(key=lambda row: getattr(dwarves[row], field), reverse=descending)
+        return rows if self._limit is None else rows[:self._limit]
+
+    def count(self) -> int:
+        """Contagem; sem filtros livres é só o popcount do bitset"""
+        if not self._predicates:
+            count = popcount(self._bits)
+            return count if self._limit is None else min(count, self._limit)
+        return len(self._rows())
+
+    def ids(self) -> List[int]:
+        column = self.index.columns['id']
+        return [column[row] for row in self._rows()]
+
+    def all(self) -> List[Any]:
+        """Dwarves, ou dicionários com os campos de select()"""
+        rows = self._rows()
+        if self._fields is None:
+            return [self.index.dwarves[row] for row in rows]
+        columns = self.index.columns
+        dwarves = self.index.dwarves
+        return [{field: columns[field][row] if field in columns else getattr(dwarves[row], field)
+                 for field in self._fields} for row in rows]
+
+    def first(self) -> Optional[Any]:
+        results = self.limit(1).all()
+        return results[0] if results else None
+
+def export_query(rows: List[Dict[str, Any]], description: str) -> str:
+    """Exporta o resultado projetado de uma consulta"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    exports_dir = Path(__file__).parent.parent / "exports"
+    exports_dir.mkdir(exist_ok=True)
+    filepath = exports_dir / f"dwarf_query_{timestamp}.json"
+
+    export_data = {
+        "analysis_type": "dwarf_query",
+        "query": description,
+        "total_results": len(rows),
+        "results": rows
+    }
+
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+    logger.info(f"Consulta exportada para: {filepath}")
+    return str(filepath)
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== DWARF QUERY - Consultas indexadas ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        index = DwarfIndex()
+        index.refresh(df.read_complete_dwarves())
+        print(f"🔎 {len(index)} dwarves indexados em {index.refresh_seconds * 1000:.1f}ms")
+        print(f"   Com skills: {index.count('has_skills')}, ferimentos: {index.count('has_wounds')}, "
+              f"equipamentos: {index.count('has_equipment')}")
+
+        description = "mineradores com Mining >= 10 fora de squads, por estresse"
+        started = time.perf_counter()
+        miners = (index.query().has_labor('Mining').skill_at_least('Mining', 10).not_in_squad()
+                  .order_by('stress', descending=True).select('id', 'name', 'stress').all())
+        print(f"\n⛏️  {description}: {len(miners)} em {(time.perf_counter() - started) * 1000:.2f}ms")
+        for miner in miners[:10]:
+            print(f"   {miner['name']} (estresse {miner['stress']})")
+
+        index.refresh(df.read_complete_dwarves())
+        print(f"\n♻️  Refresh incremental: {index.last_changes}")
+
+        filepath = export_query(miners, description)
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
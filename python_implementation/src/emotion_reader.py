@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Emotion Reader - Emoções e pensamentos de todos os dwarves com [emotion_offsets]
+O catálogo de pensamentos (unit_thoughts, unit_subthoughts, unit_emotions e
+happiness_levels do game_data.ini) é compilado uma vez e gravado em
+data/cache/thoughts; a leitura das emoções da fortaleza inteira usa três
+leituras em bloco (personalidades, vetores de emoções, emoções) e monta as
+listas por dwarf e os histogramas da fortaleza na mesma passada, como
+Dwarf::read_emotions e UnitEmotion no C++.
+"""
+
+import sys
+import json
+import time
+import struct
+import logging
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Any, NamedTuple
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData
+from game_data import read_array, read_group, game_data_key, to_int, GAME_DATA_FILE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "cache" / "thoughts"
+CATALOG_VERSION = 1
+
+MAX_EMOTIONS = 1000
+TRAIT_COUNT = 50
+STRESS_VULNERABILITY_TRAIT = 8
+TICKS_PER_YEAR = 1200 * 28 * 12
+
+EMOTION_FIELDS = ('emotion_type', 'strength', 'thought_id', 'sub_id', 'level', 'year', 'year_tick')
+
+# DWARF_HAPPINESS na ordem do C++, com os limiares padrão de GameDataReader
+HAPPINESS_LEVELS = (
+    ('miserable', "Miserable", 50000),
+    ('very_unhappy', "Very Unhappy", 25000),
+    ('unhappy', "Unhappy", 10000),
+    ('fine', "Fine", -10000),
+    ('content', "Content", -25000),
+    ('happy', "Happy", -50000),
+    ('ecstatic', "Ecstatic", -100000),
+)
+
+class ThoughtCatalog:
+    """Tabelas de pensamentos, subpensamentos e emoções compiladas do game_data.ini"""
+
+    def __init__(self):
+        self.key = ""
+        self.thoughts: Dict[int, Dict[str, Any]] = {}          # thought_id -> título, texto, subtipo
+        self.subthought_types: Dict[int, Dict[str, Any]] = {}  # subtipo -> placeholder, {sub_id: texto}
+        self.emotions: Dict[int, Dict[str, Any]] = {}          # EMOTION_TYPE -> nome, divisor
+        self.skills: Dict[int, str] = {}
+        self.happiness: List[Tuple[str, str, int, str]] = []   # (chave, nome, limiar, descrição)
+        self._descriptions: Dict[Tuple[int, int, int, int], Tuple[str, Any]] = {}
+
+    @classmethod
+    def build(cls, path: Optional[Path] = None) -> 'ThoughtCatalog':
+        """Compila o catálogo a partir do game_data.ini"""
+        catalog = cls()
+        catalog.key = game_data_key(path)
+
+        # Ids começam em 0 para pensamentos e subtipos e em -1 para emoções
+        for thought_id, entry in enumerate(read_array('unit_thoughts', path)):
+            title = entry.get('title', "Unknown")
+            catalog.thoughts[thought_id] = {
+                'title': title,
+                'thought': entry.get('thought', title),
+                'value': to_int(entry.get('value'), 0),
+                'subtype': to_int(entry.get('subthoughts_type'), -1),
+            }
+        for subtype, entry in enumerate(read_array('unit_subthoughts', path)):
+            catalog.subthought_types[subtype] = {
+                'placeholder': entry.get('placeholder', ""),
+                'subthoughts': {to_int(sub.get('id'), -1): sub.get('thought', "??")
+                                for sub in entry.get('subthoughts', [])},
+            }
+        for index, entry in enumerate(read_array('unit_emotions', path)):
+            catalog.emotions[index - 1] = {
+                'name': entry.get('emotion', ""),
+                'divider': to_int(entry.get('divider'), 1),
+            }
+        for skill_id, entry in enumerate(read_array('skills', path)):
+            catalog.skills[skill_id] = entry.get('name', "")
+
+        levels = read_group('happiness_levels', path)
+        for key, name, default in HAPPINESS_LEVELS:
+            level = levels.get(key, {})
+            catalog.happiness.append((key, name, to_int(level.get('threshold'), default), level.get('desc', "")))
+        return catalog
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None, cache_dir: Optional[Path] = None,
+             refresh: bool = False) -> 'ThoughtCatalog':
+        """Catálogo do cache em disco, recompilado se o game_data.ini mudou"""
+        cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        key = game_data_key(path)
+        cache_path = cache_dir / f"thought_catalog_{key}.json"
+
+        if not refresh and cache_path.exists():
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == CATALOG_VERSION:
+                    return cls.from_dict(data)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Cache de pensamentos inválido em {cache_path}: {e}")
+
+        catalog = cls.build(path)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(catalog.to_dict(), f, indent=2, ensure_ascii=False)
+        tmp_path.replace(cache_path)
+        logger.info(f"Catálogo de pensamentos compilado em {cache_path}")
+        return catalog
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': CATALOG_VERSION,
+            'key': self.key,
+            'thoughts': self.thoughts,
+            'subthought_types': self.subthought_types,
+            'emotions': self.emotions,
+            'skills': self.skills,
+            'happiness': self.happiness,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ThoughtCatalog':
+        # JSON converte as chaves inteiras em texto
+        catalog = cls()
+        catalog.key = data['key']
+        catalog.thoughts = {int(k): v for k, v in data['thoughts'].items()}
+        catalog.subthought_types = {
+            int(k): {'placeholder': v['placeholder'],
+                     'subthoughts': {int(sub_id): text for sub_id, text in v['subthoughts'].items()}}
+            for k, v in data['subthought_types'].items()
+        }
+        catalog.emotions = {int(k): v for k, v in data['emotions'].items()}
+        catalog.skills = {int(k): v for k, v in data['skills'].items()}
+        catalog.happiness = [tuple(level) for level in data['happiness']]
+        return catalog
+
+    def thought_title(self, thought_id: int) -> str:
+        thought = self.thoughts.get(thought_id)
+        return thought['title'] if thought else f"{thought_id} - Unknown"
+
+    def emotion_name(self, emotion_type: int) -> str:
+        emotion = self.emotions.get(emotion_type) or self.emotions.get(-1, {})
+        return emotion.get('name', "")
+
+    def emotion_divider(self, emotion_type: int) -> int:
+        emotion = self.emotions.get(emotion_type) or self.emotions.get(-1, {})
+        return emotion.get('divider', 0)
+
+    def describe(self, emotion_type: int, thought_id: int, sub_id: int, level: int) -> Tuple[str, Any]:
+        """
+        Texto da emoção e chave de comparação (UnitEmotion::m_compare_id),
+        memorizados por (emoção, pensamento, sub_id, nível)
+        """
+        key = (emotion_type, thought_id, sub_id, level)
+        cached = self._descriptions.get(key)
+        if cached is None:
+            cached = self._describe(*key)
+            self._descriptions[key] = cached
+        return cached
+
+    def _describe(self, emotion_type: int, thought_id: int, sub_id: int, level: int) -> Tuple[str, Any]:
+        compare_id: Any = ""
+        thought = self.thoughts.get(thought_id)
+        desc = thought['thought'] if thought else "??"
+
+        if thought and (sub_id != -1 or level != -1):
+            s_types = self.subthought_types.get(thought['subtype'])
+            if s_types:
+                sub = sub_id if sub_id != -1 else level
+                s_thought = s_types['subthoughts'].get(sub, "??")
+                if s_types['placeholder']:
+                    desc = desc.replace(s_types['placeholder'], s_thought)
+                    compare_id = sub
+                else:
+                    desc += s_thought
+            elif '[' in desc:
+                # Habilidades, construções, síndromes etc. não se agrupam entre si
+                compare_id = sub_id
+                if '[skill]' in desc and sub_id in self.skills:
+                    desc = desc.replace('[skill]', self.skills[sub_id])
+
+        name = self.emotion_name(emotion_type)
+        return (f"{name} {desc}" if name else desc), compare_id
+
+    def happiness_level(self, stress_level: int) -> Tuple[str, str]:
+        """(nome, descrição) do nível de felicidade para o estresse, como em read_emotions"""
+        i = 0
+        while i < len(self.happiness) - 1 and stress_level < self.happiness[i][2]:
+            i += 1
+        _, name, _, desc = self.happiness[i]
+        return name, desc
+
+def stress_multiplier(stress_vulnerability: int) -> float:
+    """Multiplicador de UnitEmotion::set_effect pela vulnerabilidade ao estresse"""
+    if stress_vulnerability >= 91:
+        return 5.0
+    if stress_vulnerability >= 76:
+        return 3.0
+    if stress_vulnerability >= 61:
+        return 2.0
+    if stress_vulnerability <= 9:
+        return 0.0
+    if stress_vulnerability <= 24:
+        return 0.25
+    if stress_vulnerability <= 39:
+        return 0.5
+    return 1.0
+
+class UnitEmotion(NamedTuple):
+    """Circunstância emocional agrupada (as repetições somam em count)"""
+    emotion_type: int
+    emotion: str
+    thought_id: int
+    thought: str
+    sub_id: int
+    level: int
+    strength: int
+    year: int
+    year_tick: int
+    count: int
+    stress_effect: int  # > 0 aumenta o estresse, < 0 reduz
+    description: str
+
+    @property
+    def time(self) -> int:
+        return self.year * TICKS_PER_YEAR + self.year_tick
+
+@dataclass
+class DwarfEmotions:
+    """Estado emocional de um dwarf"""
+    unit_id: int
+    name: str
+    stress_level: int = 0
+    stress_vulnerability: int = 50
+    happiness: str = ""
+    happiness_desc: str = ""
+    emotions: List[UnitEmotion] = field(default_factory=list)
+    thoughts: List[int] = field(default_factory=list)
+
+    @property
+    def stress_effect(self) -> int:
+        return sum(emotion.stress_effect for emotion in self.emotions)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'unit_id': self.unit_id,
+            'name': self.name,
+            'stress_level': self.stress_level,
+            'stress_vulnerability': self.stress_vulnerability,
+            'happiness': self.happiness,
+            'happiness_desc': self.happiness_desc,
+            'stress_effect': self.stress_effect,
+            'emotions': [emotion._asdict() for emotion in self.emotions],
+            'thoughts': self.thoughts,
+        }
+
+class EmotionReader:
+    """Emoções de todos os dwarves com histogramas da fortaleza"""
+
+    def __init__(self, df_instance: CompleteDFInstance, catalog: Optional[ThoughtCatalog] = None):
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.pointer_size = df_instance.pointer_size
+        self.catalog = catalog or ThoughtCatalog.load()
+        self.soul_offsets = df_instance.layout.offsets.get('soul', {})
+        self.emotion_offsets = df_instance.layout.offsets.get('emotion', {})
+        self._emotion_names, self._emotion_struct = self._compile_emotion_struct()
+
+        self.dwarves: Dict[int, DwarfEmotions] = {}
+        self.emotion_histogram: Counter = Counter()    # emoção -> ocorrências
+        self.thought_histogram: Counter = Counter()    # pensamento -> dwarves
+        self.happiness_histogram: Counter = Counter()  # nível de felicidade -> dwarves
+        self.refresh_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.dwarves)
+
+    def _personality_block_size(self) -> int:
+        return max(self.soul_offsets.get('emotions', 0) + 2 * self.pointer_size,
+                   self.soul_offsets.get('traits', 0) + 2 * TRAIT_COUNT,
+                   self.soul_offsets.get('stress_level', 0) + 4)
+
+    def refresh(self, dwarves: List[CompletelyDwarfData]) -> int:
+        """Lê as emoções de todos os dwarves (com soul_address) de uma vez"""
+        started = time.perf_counter()
+        if 'personality' not in self.soul_offsets or not self.emotion_offsets:
+            logger.error("[soul_details] personality ou [emotion_offsets] não encontrado no layout")
+            return 0
+
+        dwarves = [dwarf for dwarf in dwarves if dwarf.soul_address]
+        block_size = self._personality_block_size()
+        personality_offset = self.soul_offsets['personality']
+        blocks = self.memory.read_blocks([dwarf.soul_address + personality_offset for dwarf in dwarves],
+                                         block_size)
+
+        emotion_vectors = self.memory.read_embedded_vectors(blocks, self.soul_offsets.get('emotions', 0),
+                                                            self.pointer_size, MAX_EMOTIONS)
+        addresses = [address for vector in emotion_vectors for address in vector if address]
+        emotion_layout = self._emotion_struct
+        emotion_blocks = dict(zip(addresses, self.memory.read_blocks(addresses, emotion_layout.size)))
+
+        results: Dict[int, DwarfEmotions] = {}
+        for dwarf, block, vector in zip(dwarves, blocks, emotion_vectors):
+            if len(block) != block_size:
+                continue
+            raw = [emotion_layout.unpack_from(emotion_blocks[address])
+                   for address in vector if len(emotion_blocks.get(address, b'')) == emotion_layout.size]
+            results[dwarf.id] = self._decode_dwarf(dwarf, block, raw)
+
+        self.dwarves = results
+        self._build_histograms()
+        self.refresh_seconds = time.perf_counter() - started
+        logger.info(f"Emoções de {len(results)} dwarves ({len(addresses)} registros) lidas em "
+                    f"{self.refresh_seconds:.3f}s")
+        return len(results)
+
+    def _compile_emotion_struct(self) -> Tuple[List[str], struct.Struct]:
+        """Struct com padding cobrindo os campos de [emotion_offsets], todos int32"""
+        layout = '<'
+        position = 0
+        names = []
+        for name, offset in sorted(((name, self.emotion_offsets[name]) for name in EMOTION_FIELDS
+                                    if name in self.emotion_offsets), key=lambda item: item[1]):
+            layout += f"{offset - position}xi" if offset > position else 'i'
+            position = offset + 4
+            names.append(name)
+        return names, struct.Struct(layout)
+
+    def _decode_dwarf(self, dwarf: CompletelyDwarfData, block: bytes,
+                      raw_emotions: List[Tuple[int, ...]]) -> DwarfEmotions:
+        stress_level = struct.unpack_from('<i', block, self.soul_offsets['stress_level'])[0] \
+            if 'stress_level' in self.soul_offsets else 0
+        vulnerability = 50
+        if 'traits' in self.soul_offsets:
+            vulnerability = struct.unpack_from('<h', block, self.soul_offsets['traits'] +
+                                               STRESS_VULNERABILITY_TRAIT * 2)[0]
+            vulnerability = min(max(vulnerability, 0), 100)
+        multiplier = stress_multiplier(vulnerability)
+
+        records = [dict(zip(self._emotion_names, values)) for values in raw_emotions]
+        records = [record for record in records if record.get('thought_id', -1) >= 0]
+        # Mais recentes primeiro; duplicatas somam na primeira ocorrência
+        records.sort(key=lambda r: r.get('year', 0) * TICKS_PER_YEAR + r.get('year_tick', 0), reverse=True)
+
+        grouped: Dict[Tuple[int, int, Any], List[Any]] = {}
+        thoughts: List[int] = []
+        for record in records:
+            emotion_type = record.get('emotion_type', -1)
+            thought_id = record['thought_id']
+            if thought_id not in thoughts:
+                thoughts.append(thought_id)
+            description, compare_id = self.catalog.describe(emotion_type, thought_id,
+                                                            record.get('sub_id', -1), record.get('level', -1))
+            key = (thought_id, emotion_type, compare_id)
+            if key in grouped:
+                grouped[key][1] += 1
+            else:
+                grouped[key] = [record, 1, description]
+
+        emotions = []
+        for record, count, description in grouped.values():
+            emotion_type = record.get('emotion_type', -1)
+            divider = self.catalog.emotion_divider(emotion_type)
+            strength = record.get('strength', 0)
+            effect = int(strength / divider) if divider else 0
+            emotions.append(UnitEmotion(
+                emotion_type=emotion_type,
+                emotion=self.catalog.emotion_name(emotion_type),
+                thought_id=record['thought_id'],
+                thought=self.catalog.thought_title(record['thought_id']),
+                sub_id=record.get('sub_id', -1),
+                level=record.get('level', -1),
+                strength=strength,
+                year=record.get('year', 0),
+                year_tick=record.get('year_tick', 0),
+                count=count,
+                stress_effect=int(effect * multiplier),
+                description=description
+            ))
+
+        happiness, happiness_desc = self.catalog.happiness_level(stress_level)
+        return DwarfEmotions(
+            unit_id=dwarf.id,
+            name=dwarf.name,
+            stress_level=stress_level,
+            stress_vulnerability=vulnerability,
+            happiness=happiness,
+            happiness_desc=happiness_desc,
+            emotions=emotions,
+            thoughts=thoughts
+        )
+
+    def _build_histograms(self):
+        self.emotion_histogram = Counter()
+        self.thought_histogram = Counter()
+        self.happiness_histogram = Counter()
+        for state in self.dwarves.values():
+            self.happiness_histogram[state.happiness] += 1
+            for emotion in state.emotions:
+                self.emotion_histogram[emotion.emotion] += emotion.count
+            for thought_id in state.thoughts:
+                self.thought_histogram[self.catalog.thought_title(thought_id)] += 1
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def most_stressed(self, limit: int = 10) -> List[DwarfEmotions]:
+        """Dwarves com maior nível de estresse, para triagem"""
+        return sorted(self.dwarves.values(), key=lambda state: state.stress_level, reverse=True)[:limit]
+
+    def with_thought(self, thought_id: int) -> List[DwarfEmotions]:
+        return [state for state in self.dwarves.values() if thought_id in state.thoughts]
+
+    def export_emotions(self) -> str:
+        """Exporta as emoções por dwarf e os histogramas da fortaleza"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        exports_dir = Path(__file__).parent.parent / "exports"
+        exports_dir.mkdir(exist_ok=True)
+        filepath = exports_dir / f"emotions_{timestamp}.json"
+
+        export_data = {
+            "analysis_type": "emotions",
+            "total_dwarves": len(self.dwarves),
+            "refresh_seconds": self.refresh_seconds,
+            "happiness_histogram": dict(self.happiness_histogram.most_common()),
+            "emotion_histogram": dict(self.emotion_histogram.most_common()),
+            "thought_histogram": dict(self.thought_histogram.most_common()),
+            "dwarves": [state.to_dict() for state in self.most_stressed(len(self.dwarves))]
+        }
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Emoções exportadas para: {filepath}")
+        return str(filepath)
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== EMOTION READER - Emoções e estresse da fortaleza ===")
+    print()
+
+    catalog = ThoughtCatalog.load()
+    print(f"🧠 Catálogo: {len(catalog.thoughts)} pensamentos, {len(catalog.emotions)} emoções "
+          f"({GAME_DATA_FILE.name} {catalog.key})")
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        dwarves = df.read_complete_dwarves()
+        reader = EmotionReader(df, catalog)
+        reader.refresh(dwarves)
+
+        print(f"😶 {len(reader)} dwarves lidos em {reader.refresh_seconds:.3f}s")
+        for happiness, count in reader.happiness_histogram.most_common():
+            print(f"   {happiness}: {count}")
+
+        print("\n😫 Mais estressados:")
+        for state in reader.most_stressed(5):
+            print(f"   {state.name}: {state.stress_level} ({state.happiness})")
+            for emotion in state.emotions[:3]:
+                print(f"      {emotion.description}" + (f" (x{emotion.count})" if emotion.count > 1 else ""))
+
+        filepath = reader.export_emotions()
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Game Data - Leitura das seções de resources/game_data.ini
+O arquivo usa o formato de arrays do QSettings ("1/title", "1\\name",
+"1/subthoughts/2/id"); aqui cada seção vira uma lista de dicionários na ordem
+do arquivo (índice 0 = entrada 1), como GameDataReader no C++. O arquivo é
+interpretado uma vez por modificação.
+"""
+
+import re
+import hashlib
+import configparser
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+GAME_DATA_FILE = Path(__file__).parent.parent.parent / "resources" / "game_data.ini"
+
+_KEY_SEPARATOR = re.compile(r'[/\\]')
+
+def _unquote(value: str) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+@lru_cache(maxsize=4)
+def _parse(path: str, mtime: float) -> configparser.ConfigParser:
+    config = configparser.ConfigParser(strict=False, interpolation=None)
+    config.optionxform = str  # manter a caixa das chaves
+    config.read(path, encoding='utf-8')
+    return config
+
+def load_game_data(path: Optional[Path] = None) -> configparser.ConfigParser:
+    """game_data.ini interpretado (memorizado enquanto o arquivo não muda)"""
+    path = Path(path or GAME_DATA_FILE)
+    if not path.exists():
+        raise FileNotFoundError(f"game_data.ini não encontrado: {path}")
+    return _parse(str(path), path.stat().st_mtime)
+
+def game_data_key(path: Optional[Path] = None) -> str:
+    """Hash curto do conteúdo do arquivo, para invalidar caches derivados"""
+    path = Path(path or GAME_DATA_FILE)
+    return hashlib.blake2b(path.read_bytes(), digest_size=8).hexdigest()
+
+def _to_list(entries: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    result = []
+    for index in sorted(entries):
+        entry = entries[index]
+        for name, value in entry.items():
+            if isinstance(value, dict):
+                entry[name] = _to_list(value)
+        result.append(entry)
+    return result
+
+def read_array(section: str, path: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """
+    Array do QSettings como lista de dicionários; sub-arrays ("subthoughts",
+    "excludes") viram listas aninhadas. Valores ficam como texto sem aspas.
+    """
+    config = load_game_data(path)
+    if section not in config:
+        return []
+
+    entries: Dict[int, Dict[str, Any]] = {}
+    for key, value in config[section].items():
+        parts = _KEY_SEPARATOR.split(key)
+        if len(parts) < 2 or not parts[0].isdigit():
+            continue  # "size" da seção
+        node = entries
+        while True:
+            entry = node.setdefault(int(parts[0]), {})
+            if len(parts) == 2:
+                entry[parts[1]] = _unquote(value)
+                break
+            if parts[2] == 'size' or not parts[2].isdigit():
+                break
+            node = entry.setdefault(parts[1], {})
+            parts = parts[2:]
+    return _to_list(entries)
+
+def read_group(section: str, path: Optional[Path] = None) -> Dict[str, Dict[str, str]]:
+    """Seção agrupada ("miserable/threshold") como {grupo: {chave: valor}}"""
+    config = load_game_data(path)
+    if section not in config:
+        return {}
+
+    groups: Dict[str, Dict[str, str]] = {}
+    for key, value in config[section].items():
+        parts = _KEY_SEPARATOR.split(key, 1)
+        if len(parts) == 2:
+            groups.setdefault(parts[0], {})[parts[1]] = _unquote(value)
+    return groups
+
+def read_map(section: str, path: Optional[Path] = None) -> Dict[int, str]:
+    """Seção "id = nome" (ex.: sphere_names) como {id: nome}"""
+    config = load_game_data(path)
+    if section not in config:
+        return {}
+    return {int(key): _unquote(value) for key, value in config[section].items()
+            if key.lstrip('-').isdigit()}
+
+def to_int(value: Any, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Historical Figures - Leitura em massa do historical_figures_vector
+Carrega o vetor inteiro com uma única leitura, decodifica as figuras em lotes
+paralelos e monta um índice hist_id -> registro compacto, para que resolver a
+figura histórica de cada dwarf seja uma consulta O(1) (como
+DFInstance::find_historical_figure no C++).
+"""
+
+import sys
+import time
+import struct
+import logging
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, NamedTuple
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData
+
+logger = logging.getLogger(__name__)
+
+# Mundos grandes passam de 100k figuras; o limite padrão de read_vector é 10000
+MAX_HIST_FIGURES = 2_000_000
+BATCH_SIZE = 4096
+
+class HistFigure(NamedTuple):
+    """Registro compacto de uma figura histórica"""
+    hist_id: int
+    race: int
+    address: int
+    info_address: int
+
+class HistoricalFigureIndex:
+    """Índice hist_id -> HistFigure carregado uma vez por sessão"""
+
+    def __init__(self, df_instance: CompleteDFInstance, workers: int = 4):
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.workers = workers
+        self.figures: Dict[int, HistFigure] = {}
+        self._names: Dict[int, str] = {}
+        self.load_seconds = 0.0
+
+        offsets = self.df.layout.offsets.get('hist_figure', {})
+        self.id_offset = offsets.get('id', 0)
+        self.race_offset = offsets.get('hist_race', 0)
+        self.name_offset = offsets.get('hist_name', 0)
+        self.info_offset = offsets.get('hist_fig_info', 0)
+        self.block_size = max(self.id_offset + 4, self.race_offset + 2, self.info_offset + self.df.pointer_size)
+        self._pointer_format = '<Q' if self.df.pointer_size == 8 else '<I'
+
+    def __len__(self) -> int:
+        return len(self.figures)
+
+    def __contains__(self, hist_id: int) -> bool:
+        return hist_id in self.figures
+
+    def load(self) -> int:
+        """Lê todas as figuras históricas e reconstrói o índice"""
+        started = time.perf_counter()
+        vector_addr = self.df.layout.get_address('historical_figures_vector')
+        if not vector_addr:
+            logger.error("historical_figures_vector não encontrado no layout")
+            return 0
+
+        pointers = self.memory.read_vector(vector_addr + self.df.base_addr, self.df.pointer_size,
+                                           max_count=MAX_HIST_FIGURES)
+        batches = [pointers[i:i + BATCH_SIZE] for i in range(0, len(pointers), BATCH_SIZE)]
+
+        figures: Dict[int, HistFigure] = {}
+        # ReadProcessMemory libera o GIL, então os lotes são lidos em paralelo
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for batch_figures in executor.map(self._read_batch, batches):
+                for figure in batch_figures:
+                    figures[figure.hist_id] = figure
+
+        self.figures = figures
+        self._names.clear()
+        self.load_seconds = time.perf_counter() - started
+        logger.info(f"{len(figures)} figuras históricas indexadas em {self.load_seconds:.2f}s")
+        return len(figures)
+
+    def _read_batch(self, addresses: List[int]) -> List[HistFigure]:
+        """Lê e decodifica um lote de estruturas historical_figure"""
+        figures = []
+        for address, block in zip(addresses, self.memory.read_blocks(addresses, self.block_size)):
+            if len(block) != self.block_size:
+                continue
+            figures.append(HistFigure(
+                hist_id=struct.unpack_from('<i', block, self.id_offset)[0],
+                race=struct.unpack_from('<h', block, self.race_offset)[0],
+                address=address,
+                info_address=struct.unpack_from(self._pointer_format, block, self.info_offset)[0]
+            ))
+        return figures
+
+    def get(self, hist_id: int) -> Optional[HistFigure]:
+        """Figura histórica pelo hist_id (None se não existir)"""
+        return self.figures.get(hist_id)
+
+    def name(self, hist_id: int) -> str:
+        """Primeiro nome da figura (language_name.first_name), lido sob demanda"""
+        if hist_id in self._names:
+            return self._names[hist_id]
+        figure = self.figures.get(hist_id)
+        name = self.memory.read_df_string(figure.address + self.name_offset, self.df.pointer_size) if figure else ""
+        self._names[hist_id] = name
+        return name
+
+    def resolve_dwarves(self, dwarves: List[CompletelyDwarfData]) -> Dict[int, Optional[HistFigure]]:
+        """id da unidade -> figura histórica, para todos os dwarves"""
+        return {dwarf.id: self.figures.get(dwarf.hist_id) for dwarf in dwarves}
+
+    def race_histogram(self) -> Dict[int, int]:
+        """Quantidade de figuras por raça"""
+        histogram: Dict[int, int] = {}
+        for figure in self.figures.values():
+            histogram[figure.race] = histogram.get(figure.race, 0) + 1
+        return histogram
+
+def load_hist_figures(df_instance: CompleteDFInstance, refresh: bool = False) -> HistoricalFigureIndex:
+    """Carrega (uma vez por conexão) o índice de figuras históricas da instância"""
+    index = getattr(df_instance, 'hist_figures', None)
+    if index is None or refresh:
+        index = HistoricalFigureIndex(df_instance)
+        index.load()
+        df_instance.hist_figures = index
+    return index
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== HISTORICAL FIGURES - Índice de figuras históricas ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        index = load_hist_figures(df)
+        dwarves = df.read_complete_dwarves()
+        resolved = index.resolve_dwarves(dwarves)
+
+        print(f"📚 Figuras históricas: {len(index)} ({index.load_seconds:.2f}s)")
+        print(f"👥 Dwarves com figura histórica: {sum(1 for f in resolved.values() if f)}/{len(dwarves)}")
+        for dwarf in dwarves[:10]:
+            figure = resolved.get(dwarf.id)
+            if figure:
+                print(f"   {dwarf.name}: #{figure.hist_id} ({index.name(figure.hist_id)}) raça {figure.race}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Item Reader - Leitura em massa dos vetores globais de itens
+Carrega weapons_vector, armor_vector, helms_vector, ... com uma leitura em
+bloco por vetor e decodifica id, material, qualidade e desgaste de cada item
+com um plano de leitura compilado de [item_offsets] (um struct.unpack_from
+por item). Índices por tipo, material e qualidade respondem consultas de
+estoque e prontidão militar sem tocar de novo na memória do processo.
+O artifacts_vector não entra: guarda artifact_record (id e nome do artefato),
+não itens, e o plano de leitura de item daria lixo nesses registros.
+"""
+
+import sys
+import json
+import time
+import struct
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any, NamedTuple
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, EquipmentDecoder, ITEM_VECTOR_KEYS
+
+logger = logging.getLogger(__name__)
+
+MAX_ITEMS_PER_VECTOR = 500000
+
+# Campos lidos de cada item: nome em [item_offsets] -> formato struct
+ITEM_FIELDS = (
+    ('id', 'i'),
+    ('stack_size', 'i'),
+    ('wear', 'h'),
+    ('mat_type', 'h'),
+    ('mat_index', 'i'),
+    ('maker_race', 'h'),
+    ('quality', 'h'),
+)
+
+class ItemRecord(NamedTuple):
+    """Item decodificado de um vetor global"""
+    item_id: int
+    item_type: int
+    material_type: int
+    material_index: int
+    quality: int
+    wear: int
+    stack_size: int
+    maker_race: int
+    address: int
+
+class ItemReadPlan:
+    """
+    Plano de leitura compilado a partir de [item_offsets]: um único struct com
+    padding entre os campos, começando pelo ponteiro da vtable no offset 0
+    """
+
+    def __init__(self, item_offsets: Dict[str, int], pointer_size: int = 8):
+        fields = [('vtable', 0, 'Q' if pointer_size == 8 else 'I')]
+        fields += [(name, item_offsets[name], fmt) for name, fmt in ITEM_FIELDS if name in item_offsets]
+        fields.sort(key=lambda item: item[1])
+
+        layout = '<'
+        position = 0
+        self.names: List[str] = []
+        for name, offset, fmt in fields:
+            if offset < position:
+                continue  # campo sobreposto no layout, ignorado
+            layout += f"{offset - position}x{fmt}" if offset > position else fmt
+            position = offset + struct.calcsize('<' + fmt)
+            self.names.append(name)
+
+        self.struct = struct.Struct(layout)
+        self.size = self.struct.size
+
+    def decode(self, block: bytes) -> Dict[str, int]:
+        return dict(zip(self.names, self.struct.unpack_from(block)))
+
+class GlobalItemReader:
+    """Itens de todos os vetores globais com índices por tipo, material e qualidade"""
+
+    def __init__(self, df_instance: CompleteDFInstance, vector_keys=ITEM_VECTOR_KEYS):
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.vector_keys = vector_keys
+        self.plan = ItemReadPlan(df_instance.layout.offsets.get('item', {}), df_instance.pointer_size)
+
+        self.items: Dict[int, ItemRecord] = {}               # endereço -> item
+        self.vectors: Dict[str, List[int]] = {}              # vetor -> endereços
+        self.by_type: Dict[int, List[ItemRecord]] = {}
+        self.by_material: Dict[Tuple[int, int], List[ItemRecord]] = {}
+        self.by_quality: Dict[int, List[ItemRecord]] = {}
+        self.refresh_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def refresh(self) -> int:
+        """Relê todos os vetores e reconstrói os índices"""
+        started = time.perf_counter()
+        items: Dict[int, ItemRecord] = {}
+        vectors: Dict[str, List[int]] = {}
+
+        for key in self.vector_keys:
+            vector_addr = self.df.layout.get_address(key)
+            if not vector_addr:
+                continue
+            pointers = self.memory.read_vector(vector_addr + self.df.base_addr, self.df.pointer_size,
+                                               max_count=MAX_ITEMS_PER_VECTOR)
+            vectors[key] = pointers
+            # Endereço já decodificado por outro vetor não é lido de novo
+            pending = [address for address in pointers if address not in items]
+            for address, block in zip(pending, self.memory.read_blocks(pending, self.plan.size)):
+                if len(block) != self.plan.size:
+                    continue
+                items[address] = self._decode(address, block)
+
+        self.items = items
+        self.vectors = vectors
+        self._build_indexes()
+        self.refresh_seconds = time.perf_counter() - started
+        logger.info(f"{len(items)} itens em {len(vectors)} vetores lidos em {self.refresh_seconds:.2f}s")
+        return len(items)
+
+    def _decode(self, address: int, block: bytes) -> ItemRecord:
+        values = self.plan.decode(block)
+        return ItemRecord(
+            item_id=values.get('id', -1),
+            # Tipo memorizado por vtable: nenhuma leitura extra para classes já vistas
+            item_type=self.df._read_item_type(address, values['vtable']),
+            material_type=values.get('mat_type', -1),
+            material_index=values.get('mat_index', -1),
+            quality=values.get('quality', -1),
+            wear=values.get('wear', -1),
+            stack_size=values.get('stack_size', 1),
+            maker_race=values.get('maker_race', -1),
+            address=address
+        )
+
+    def _build_indexes(self):
+        self.by_type = {}
+        self.by_material = {}
+        self.by_quality = {}
+        for item in self.items.values():
+            self.by_type.setdefault(item.item_type, []).append(item)
+            self.by_material.setdefault((item.material_type, item.material_index), []).append(item)
+            self.by_quality.setdefault(item.quality, []).append(item)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def histogram(self) -> Dict[str, int]:
+        """Quantidade de itens por tipo (nome do ITEM_TYPE)"""
+        return {
+            EquipmentDecoder.decode_item_type(item_type)["type_name"]: len(items)
+            for item_type, items in sorted(self.by_type.items(), key=lambda entry: len(entry[1]), reverse=True)
+        }
+
+    def query(self, item_type: Optional[int] = None, material: Optional[Tuple[int, int]] = None,
+              min_quality: Optional[int] = None, max_wear: Optional[int] = None) -> List[ItemRecord]:
+        """Itens que atendem a todos os filtros, partindo do índice mais seletivo"""
+        candidates = None
+        if item_type is not None:
+            candidates = self.by_type.get(item_type, [])
+        if material is not None:
+            by_material = self.by_material.get(material, [])
+            if candidates is None or len(by_material) < len(candidates):
+                candidates = by_material
+        if candidates is None and min_quality is not None:
+            candidates = [item for quality, items in self.by_quality.items() if quality >= min_quality
+                          for item in items]
+        if candidates is None:
+            candidates = list(self.items.values())
+
+        return [
+            item for item in candidates
+            if (item_type is None or item.item_type == item_type)
+            and (material is None or (item.material_type, item.material_index) == material)
+            and (min_quality is None or item.quality >= min_quality)
+            and (max_wear is None or item.wear <= max_wear)
+        ]
+
+    def count(self, **filters) -> int:
+        """Soma do stack_size dos itens que atendem aos filtros"""
+        return sum(max(item.stack_size, 1) for item in self.query(**filters))
+
+    def material_name(self, item: ItemRecord) -> str:
+        """Nome do material pelo MaterialIndex da instância, se carregado"""
+        index = getattr(self.df, 'material_index', None)
+        return index.name(item.material_type, item.material_index, item.item_type) if index else ""
+
+    def export_items(self) -> str:
+        """Exporta o histograma e os itens de cada vetor"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        exports_dir = Path(__file__).parent.parent / "exports"
+        exports_dir.mkdir(exist_ok=True)
+        filepath = exports_dir / f"global_items_{timestamp}.json"
+
+        export_data: Dict[str, Any] = {
+            "analysis_type": "global_items",
+            "total_items": len(self.items),
+            "refresh_seconds": self.refresh_seconds,
+            "histogram": self.histogram(),
+            "quality_histogram": {EquipmentDecoder.decode_quality(q)["name"]: len(items)
+                                  for q, items in sorted(self.by_quality.items())},
+            "vectors": {
+                key: [dict(self.items[address]._asdict(), material_name=self.material_name(self.items[address]))
+                      for address in addresses if address in self.items]
+                for key, addresses in self.vectors.items()
+            }
+        }
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Itens exportados para: {filepath}")
+        return str(filepath)
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== ITEM READER - Itens dos vetores globais ===")
+    print()
+
+    df = CompleteDFInstance(prescan_item_types=True)
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        reader = GlobalItemReader(df)
+        reader.refresh()
+
+        print(f"📦 {len(reader)} itens lidos em {reader.refresh_seconds:.2f}s")
+        for type_name, count in list(reader.histogram().items())[:15]:
+            print(f"   {type_name}: {count}")
+
+        started = time.perf_counter()
+        masterwork_weapons = reader.count(item_type=24, min_quality=5)
+        print(f"\n⚔️ Armas obra-prima: {masterwork_weapons} "
+              f"(consulta em {(time.perf_counter() - started) * 1000:.2f} ms)")
+
+        filepath = reader.export_items()
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+"""
+Job Reader - Trabalho atual das unidades e atividades da fortaleza
+Lê current_job de todas as unidades ([job_details]) com uma leitura em bloco
+por unidade e o activities_vector completo ([activity_offsets]) com uma
+leitura por etapa. Os nomes vêm de uma tabela de trabalhos compilada uma vez
+do game_data.ini (unit_jobs, unit_activities, unit_orders), e os índices
+tipo de trabalho -> unidades e unidades ociosas ficam prontos após o refresh,
+como Dwarf::read_current_job, Activity e ActivityEvent no C++.
+"""
+
+import sys
+import json
+import time
+import struct
+import logging
+from functools import lru_cache
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, NamedTuple
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData, VM_TYPE_OFFSET
+from game_data import read_array, read_map, game_data_key, to_int
+from race_cache import DF_STRING_SIZE
+
+logger = logging.getLogger(__name__)
+
+MAX_UNITS = 100000
+MAX_ACTIVITIES = 10000
+
+# DwarfJob::UNIT_JOB_TYPE (negativos são custom do DT)
+JOB_UNKNOWN = -999
+JOB_MEETING = -5
+JOB_CAGED = -4
+JOB_IDLE = -3
+JOB_ON_BREAK = -2
+JOB_SOLDIER = -1
+JOB_DRINK = 17
+JOB_DRINK_BLOOD = 223
+MOOD_JOBS = range(55, 68)
+ACTIVITY_OFFSET = 5000
+ORDER_OFFSET = 7000
+
+# Activity::ACT_CATEGORY que não afetam o trabalho atual
+IGNORED_ACTIVITIES = {2, 5}  # ACT_CONFLICT, ACT_CONVERSE
+
+# ActivityEvent::ACT_EVT_TYPE usados na decodificação
+EVT_SQ_SKILL_DEMO = 2
+EVT_PRAY = 11
+EVT_PERFORM = 14
+EVT_SERVICE_ORDER = 19
+EVT_COPY_WRITTEN = 21
+EVT_PF_STORY = 100
+EVT_PF_DANCE = 103
+EVT_PF_AUDIENCE = 104
+EVT_PF_INSTRUMENT = 105
+EVT_PF_SING = 106
+EVT_PF_LISTEN = 107
+EVT_SQ_LEAD_DEMO = 200
+EVT_SQ_WATCH_DEMO = 201
+EVT_MEDITATION = 300
+IGNORED_EVENTS = {6, 7, 8, 10}  # HARASS, TALK, CONFLICT, REUNION
+SINGLE_PARTICIPANT_EVENTS = {EVT_SERVICE_ORDER, EVT_COPY_WRITTEN}
+
+# ActivityEvent::ACT_PERF_TYPE
+PERF_STORY, PERF_POETRY, PERF_MUSIC, PERF_DANCE, PERF_AUDIENCE, PERF_IGNORE = range(6)
+PERF_DESC = {PERF_STORY: "Tell Story", PERF_POETRY: "Recite Poetry", PERF_MUSIC: "Play Music/Sing",
+             PERF_DANCE: "Dance"}
+AUDIENCE_DESC = {PERF_STORY: "Listen to Story", PERF_POETRY: "Listen to Poetry",
+                 PERF_MUSIC: "Listen to Music", PERF_DANCE: "Watch Dance"}
+
+# DwarfJob::get_job_mat_category_name
+MAT_CATEGORY_NAMES = {
+    0: "plant", 2: "wood", 4: "cloth", 8: "silk", 16: "leather", 32: "bone", 64: "shell",
+    128: "wood mat", 256: "soap", 512: "ivory/tooth", 1024: "horn/hoof", 2048: "pearl",
+    4096: "yarn/wool/fur",
+}
+
+class JobType(NamedTuple):
+    """Tipo de trabalho do game_data.ini (DwarfJob)"""
+    job_id: int
+    name: str
+    group: str
+    military: bool
+    reaction_class: str
+
+    @property
+    def has_placeholder(self) -> bool:
+        return '[' in self.name
+
+    def format(self, replacement: str = "") -> str:
+        """Nome com o [placeholder] substituído, como DwarfJob::name"""
+        if not replacement or not self.has_placeholder:
+            return self.name
+        start, end = self.name.find('['), self.name.find(']')
+        return self.name[:start] + replacement + self.name[end + 1:] if end > start else self.name
+
+class JobCatalog:
+    """Tabela de trabalhos, atividades e ordens (ids com ACTIVITY_OFFSET/ORDER_OFFSET)"""
+
+    def __init__(self, jobs: Dict[int, JobType], skills: Dict[int, str], spheres: Dict[int, str],
+                 moods: Dict[int, str]):
+        self.jobs = jobs
+        self.skills = skills
+        self.spheres = spheres
+        self.moods = moods
+        self._unknown = JobType(JOB_UNKNOWN, "Unknown", "Unknown", False, "")
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def get(self, job_id: int) -> JobType:
+        return self.jobs.get(job_id, self._unknown)
+
+    def name(self, job_id: int, replacement: str = "") -> str:
+        return self.get(job_id).format(replacement)
+
+def _read_job_section(section: str, offset: int, jobs: Dict[int, JobType]):
+    """GameDataReader::read_activity_section"""
+    for entry in read_array(section):
+        group = entry.get('name', "")
+        military = entry.get('is_military', "false").lower() in ('1', 'true')
+        subs = entry.get('sub')
+        for sub in (subs if subs else [entry]):
+            name = sub.get('name', group) or group
+            job = JobType(
+                job_id=to_int(sub.get('id'), 0) + offset,
+                name=name,
+                group=(group if subs else "") or name,
+                military=sub.get('is_military', str(military)).lower() in ('1', 'true'),
+                reaction_class=sub.get('reaction_class', "")
+            )
+            if job.job_id in jobs:
+                logger.debug(f"Trabalho duplicado: {job.name} ({job.job_id})")
+            else:
+                jobs[job.job_id] = job
+
+@lru_cache(maxsize=2)
+def _compile_job_catalog(key: str) -> JobCatalog:
+    jobs: Dict[int, JobType] = {}
+    _read_job_section('unit_jobs', 0, jobs)
+    _read_job_section('unit_activities', ACTIVITY_OFFSET, jobs)
+    _read_job_section('unit_orders', ORDER_OFFSET, jobs)
+    skills = {skill_id: entry.get('name', "") for skill_id, entry in enumerate(read_array('skills'))}
+    moods = {mood_id: entry.get('name', "") for mood_id, entry in enumerate(read_array('unit_moods'))}
+    logger.info(f"Tabela de trabalhos compilada: {len(jobs)} tipos")
+    return JobCatalog(jobs, skills, read_map('sphere_names'), moods)
+
+def load_job_catalog() -> JobCatalog:
+    """Tabela de trabalhos compilada uma vez por conteúdo do game_data.ini"""
+    return _compile_job_catalog(game_data_key())
+
+class UnitJob(NamedTuple):
+    """Trabalho atual de uma unidade"""
+    unit_id: int
+    hist_id: int
+    job_id: int
+    job_name: str
+    sub_job: str   # nome da reação (sub_job_id)
+    address: int
+
+    @property
+    def idle(self) -> bool:
+        return self.job_id == JOB_IDLE
+
+class ActivityReader:
+    """activities_vector: o que cada figura histórica está fazendo fora de jobs"""
+
+    def __init__(self, df_instance: CompleteDFInstance, catalog: Optional[JobCatalog] = None):
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.pointer_size = df_instance.pointer_size
+        self._pointer_format = '<Q' if self.pointer_size == 8 else '<I'
+        self.offsets = df_instance.layout.offsets.get('activity', {})
+        self.catalog = catalog or load_job_catalog()
+
+        self.actions: Dict[int, Tuple[int, str]] = {}   # hist_id -> (job_id, descrição)
+        self._event_types: Dict[int, int] = {}          # vtable do evento -> ACT_EVT_TYPE
+        self.refresh_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def find(self, hist_id: int) -> Tuple[int, str]:
+        """(job_id, descrição) da atividade da figura, ou (JOB_UNKNOWN, "")"""
+        return self.actions.get(hist_id, (JOB_UNKNOWN, ""))
+
+    def _offset_block_size(self, *names: str, extra: int = 4) -> int:
+        return max(self.offsets.get(name, 0) for name in names) + extra
+
+    def refresh(self) -> int:
+        """Relê o activities_vector inteiro"""
+        started = time.perf_counter()
+        vector_addr = self.df.layout.get_address('activities_vector')
+        if not vector_addr or 'events' not in self.offsets:
+            logger.warning("activities_vector ou [activity_offsets] não encontrado no layout")
+            self.actions = {}
+            return 0
+
+        addresses = self.memory.read_vector(vector_addr + self.df.base_addr, self.pointer_size,
+                                            max_count=MAX_ACTIVITIES)
+        block_size = max(self._offset_block_size('activity_type', extra=2),
+                         self.offsets['events'] + 2 * self.pointer_size)
+        blocks = self.memory.read_blocks(addresses, block_size)
+
+        activities = []
+        for block in blocks:
+            if len(block) != block_size:
+                continue
+            activity_id = struct.unpack_from('<i', block, 0)[0]
+            activity_type = struct.unpack_from('<h', block, self.offsets.get('activity_type', 0))[0]
+            if activity_type not in IGNORED_ACTIVITIES:
+                activities.append((activity_id, block))
+        # Como DFInstance::find_activity: a atividade de maior id prevalece
+        activities.sort(key=lambda item: item[0], reverse=True)
+
+        event_vectors = self.memory.read_embedded_vectors([block for _, block in activities],
+                                                          self.offsets['events'], self.pointer_size)
+        # Eventos de trás para frente: os últimos são os mais específicos
+        events = [address for vector in event_vectors for address in reversed(vector)]
+        self.actions = self._read_events(events)
+
+        self.refresh_seconds = time.perf_counter() - started
+        logger.info(f"{len(activities)} atividades ({len(self.actions)} participantes) lidas em "
+                    f"{self.refresh_seconds:.3f}s")
+        return len(self.actions)
+
+    def _event_types_for(self, vtables: List[int]) -> List[int]:
+        """ACT_EVT_TYPE pela 1ª função virtual de cada vtable, memorizado por vtable"""
+        unknown = sorted({vtable for vtable in vtables if vtable and vtable not in self._event_types})
+        functions = [struct.unpack(self._pointer_format, block)[0] if len(block) == self.pointer_size else 0
+                     for block in self.memory.read_blocks(unknown, self.pointer_size)]
+        values = self.memory.read_blocks([function + VM_TYPE_OFFSET for function in functions], 2)
+        for vtable, function, value in zip(unknown, functions, values):
+            raw_type = struct.unpack('<h', value)[0] if function and len(value) == 2 else 0
+            self._event_types[vtable] = max(raw_type, 0)
+        return [self._event_types.get(vtable, -1) for vtable in vtables]
+
+    def _read_events(self, events: List[int]) -> Dict[int, Tuple[int, str]]:
+        pointer_size = self.pointer_size
+        block_size = max(
+            self._offset_block_size('sq_lead', 'sq_skill', 'sq_train_rounds', 'pray_deity', 'pray_sphere',
+                                    'knowledge_category', 'knowledge_flag', 'perf_type'),
+            self._offset_block_size('participants', 'perf_participants', extra=2 * pointer_size),
+            2 * pointer_size
+        )
+        blocks = self.memory.read_blocks(events, block_size)
+        valid = [block for block in blocks if len(block) == block_size]
+        vtables = [struct.unpack_from(self._pointer_format, block, 0)[0] for block in valid]
+        typed = [(event_type, block) for event_type, block in zip(self._event_types_for(vtables), valid)
+                 if event_type >= 0 and event_type not in IGNORED_EVENTS]
+
+        multi = [(event_type, block) for event_type, block in typed if event_type not in SINGLE_PARTICIPANT_EVENTS]
+        participants = self.memory.read_embedded_vectors([block for _, block in multi],
+                                                         self.offsets.get('participants', 0),
+                                                         pointer_size, item_format='i')
+        performers = self._read_performers([block for event_type, block in multi if event_type == EVT_PERFORM])
+
+        actions: Dict[int, Tuple[int, str]] = {}
+        multi_cursor = perform_cursor = 0
+        for event_type, block in typed:
+            if event_type in SINGLE_PARTICIPANT_EVENTS:
+                hist_id = self._int(block, 'participants')
+                if hist_id not in actions:
+                    self._add_action(actions, hist_id, event_type)
+                continue
+
+            event_participants = participants[multi_cursor]
+            multi_cursor += 1
+            if event_type == EVT_PERFORM:
+                if event_participants:
+                    for hist_id, action in performers[perform_cursor]:
+                        actions.setdefault(hist_id, action)
+                perform_cursor += 1
+                continue
+            for hist_id in dict.fromkeys(event_participants):
+                if hist_id not in actions:
+                    self._decode_participant(actions, hist_id, event_type, block)
+        return actions
+
+    def _int(self, block: bytes, name: str, fmt: str = '<i') -> int:
+        return struct.unpack_from(fmt, block, self.offsets.get(name, 0))[0]
+
+    def _add_action(self, actions: Dict[int, Tuple[int, str]], hist_id: int, event_type: int, desc: str = ""):
+        job_id = event_type + ACTIVITY_OFFSET
+        actions[hist_id] = (job_id, desc or self.catalog.name(job_id))
+
+    def _decode_participant(self, actions: Dict[int, Tuple[int, str]], hist_id: int, event_type: int,
+                            block: bytes):
+        """ActivityEvent::read_data para um participante de evento com vários"""
+        if event_type == EVT_SQ_SKILL_DEMO:
+            if self._int(block, 'sq_train_rounds') <= 0:
+                return
+            event_type = EVT_SQ_LEAD_DEMO if self._int(block, 'sq_lead') == hist_id else EVT_SQ_WATCH_DEMO
+            skill_name = self.catalog.skills.get(self._int(block, 'sq_skill'), "")
+            self._add_action(actions, hist_id, event_type,
+                             self.catalog.name(ACTIVITY_OFFSET + event_type, skill_name))
+            return
+        if event_type == EVT_PRAY:
+            sphere_id = self._int(block, 'pray_sphere', '<h')
+            if sphere_id != -1:
+                self._add_action(actions, hist_id, EVT_MEDITATION,
+                                 f"Meditate on {self.catalog.spheres.get(sphere_id, sphere_id)}")
+                return
+            # O nome da divindade depende das figuras históricas; fica o nome padrão
+        self._add_action(actions, hist_id, event_type)
+
+    def _read_performers(self, blocks: List[bytes]) -> List[List[Tuple[int, Tuple[int, str]]]]:
+        """Participantes de cada apresentação (perf_participants), numa leitura para todas"""
+        if 'perf_participants' not in self.offsets or not blocks:
+            return [[] for _ in blocks]
+        vectors = self.memory.read_embedded_vectors(blocks, self.offsets['perf_participants'], self.pointer_size)
+        histfig_offset = self.offsets.get('perf_histfig', 0)
+        size = max(histfig_offset, 4) + 4
+        records = dict(zip([address for vector in vectors for address in vector],
+                           self.memory.read_blocks([address for vector in vectors for address in vector], size)))
+
+        results = []
+        for block, vector in zip(blocks, vectors):
+            perf_type = self._int(block, 'perf_type')
+            performers = []
+            for address in vector:
+                record = records.get(address, b'')
+                if len(record) != size:
+                    continue
+                par_type, sub_type = struct.unpack_from('<ii', record, 0)
+                hist_id = struct.unpack_from('<i', record, histfig_offset)[0]
+                event_type, desc = -1, ""
+                if par_type == PERF_IGNORE:
+                    continue
+                if par_type == PERF_AUDIENCE:
+                    desc = AUDIENCE_DESC.get(perf_type, "")
+                    event_type = EVT_PF_AUDIENCE if perf_type == PERF_DANCE else EVT_PF_LISTEN
+                elif par_type in (PERF_STORY, PERF_POETRY) and par_type == perf_type:
+                    desc = PERF_DESC.get(perf_type, "")
+                    event_type = EVT_PF_STORY + perf_type
+                elif par_type == PERF_MUSIC:
+                    if sub_type == 0:
+                        event_type = EVT_PF_SING
+                    elif sub_type > 0:
+                        event_type = EVT_PF_INSTRUMENT
+                elif par_type == PERF_DANCE:
+                    desc = PERF_DESC[PERF_DANCE]
+                    event_type = EVT_PF_DANCE
+                if event_type != -1:
+                    job_id = event_type + ACTIVITY_OFFSET
+                    performers.append((hist_id, (job_id, desc or self.catalog.name(job_id))))
+            results.append(performers)
+        return results
+
+class JobReader:
+    """Trabalho atual de todas as unidades com índices por tipo e ociosos"""
+
+    def __init__(self, df_instance: CompleteDFInstance, activities: Optional[ActivityReader] = None,
+                 squads=None, catalog: Optional[JobCatalog] = None):
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.pointer_size = df_instance.pointer_size
+        self._pointer_format = '<Q' if self.pointer_size == 8 else '<I'
+        self.catalog = catalog or load_job_catalog()
+        self.activities = activities if activities is not None else ActivityReader(df_instance, self.catalog)
+        self.squads = squads  # SquadReader opcional (ordens de esquadrão dos ociosos)
+        self.job_offsets = df_instance.layout.offsets.get('job', {})
+        self._unit_names, self._unit_struct = self._compile_unit_struct()
+
+        self.jobs: Dict[int, UnitJob] = {}          # unit_id -> trabalho
+        self.by_job: Dict[int, List[int]] = {}      # job_id -> unit_ids
+        self.idle: List[int] = []
+        self.refresh_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+    def _compile_unit_struct(self) -> Tuple[List[str], struct.Struct]:
+        """Um struct com padding para os campos da unidade usados aqui"""
+        offsets = self.df.layout.offsets.get('dwarf', {})
+        pointer = self._pointer_format[1]
+        fields = sorted(((name, offsets[name], fmt) for name, fmt in
+                         (('meeting', 'B'), ('id', 'i'), ('mood', 'h'), ('current_job', pointer),
+                          ('hist_id', 'i'), ('squad_id', 'i')) if name in offsets),
+                        key=lambda item: item[1])
+        layout = '<'
+        position = 0
+        names = []
+        for name, offset, fmt in fields:
+            if offset < position:
+                continue
+            layout += f"{offset - position}x{fmt}" if offset > position else fmt
+            position = offset + struct.calcsize('<' + fmt)
+            names.append(name)
+        return names, struct.Struct(layout)
+
+    def _unit_addresses(self) -> List[int]:
+        vector_addr = self.df.layout.get_address('creature_vector')
+        if not vector_addr:
+            return []
+        return self.memory.read_vector(vector_addr + self.df.base_addr, self.pointer_size, max_count=MAX_UNITS)
+
+    def refresh(self, dwarves: Optional[List[CompletelyDwarfData]] = None, refresh_activities: bool = True) -> int:
+        """
+        Lê o trabalho atual das unidades (dos dwarves informados ou de todo o
+        creature_vector) e reconstrói os índices
+        """
+        started = time.perf_counter()
+        if 'current_job' not in self._unit_names:
+            logger.error("[dwarf_offsets] current_job não encontrado no layout")
+            return 0
+        if refresh_activities:
+            self.activities.refresh()
+
+        addresses = [dwarf.address for dwarf in dwarves if dwarf.address] if dwarves is not None \
+            else self._unit_addresses()
+        size = self._unit_struct.size
+        units = [(address, dict(zip(self._unit_names, self._unit_struct.unpack_from(block))))
+                 for address, block in zip(addresses, self.memory.read_blocks(addresses, size))
+                 if len(block) == size]
+
+        job_addresses = [fields['current_job'] for _, fields in units if fields['current_job']]
+        job_blocks = dict(zip(job_addresses, self._read_job_blocks(job_addresses)))
+
+        jobs: Dict[int, UnitJob] = {}
+        for address, fields in units:
+            job_id, name, sub_job = self._decode_job(fields, job_blocks.get(fields['current_job']))
+            jobs[fields.get('id', -1)] = UnitJob(fields.get('id', -1), fields.get('hist_id', -1),
+                                                 job_id, name, sub_job, address)
+
+        self.jobs = jobs
+        self._build_indexes()
+        self.refresh_seconds = time.perf_counter() - started
+        logger.info(f"Trabalhos de {len(jobs)} unidades ({len(self.idle)} ociosas) lidos em "
+                    f"{self.refresh_seconds:.3f}s")
+        return len(jobs)
+
+    def _read_job_blocks(self, job_addresses: List[int]) -> List[bytes]:
+        offsets = self.job_offsets
+        size = max([offsets.get(name, 0) + 4 for name in ('id', 'mat_type', 'mat_index', 'reaction_skill')] +
+                   [offsets.get('mat_category', 0) + self.pointer_size] +
+                   ([offsets['sub_job_id'] + DF_STRING_SIZE] if 'sub_job_id' in offsets else []))
+        return self.memory.read_blocks(job_addresses, size)
+
+    def _decode_job(self, fields: Dict[str, int], block: Optional[bytes]) -> Tuple[int, str, str]:
+        if not fields['current_job']:
+            return self._decode_no_job(fields)
+        if not block:
+            return JOB_UNKNOWN, "Unknown job", ""
+
+        offsets = self.job_offsets
+        job_id = struct.unpack_from('<h', block, offsets.get('id', 0))[0]
+        if job_id == JOB_DRINK_BLOOD:
+            job_id = JOB_DRINK  # vampiros não são destacados
+        job = self.catalog.jobs.get(job_id)
+        if job is None:
+            return job_id, "Unknown job", ""
+
+        name = job.name
+        sub_job = self.memory.decode_df_string(block, offsets['sub_job_id'], self.pointer_size) \
+            if 'sub_job_id' in offsets else ""
+        if job_id in MOOD_JOBS:
+            name = job.format(self.catalog.moods.get(fields.get('mood', -1), ""))
+        elif not sub_job and job.has_placeholder:
+            name = job.format(self._job_material(block))
+        return job_id, name, sub_job
+
+    def _job_material(self, block: bytes) -> str:
+        offsets = self.job_offsets
+        mat_type = struct.unpack_from('<h', block, offsets.get('mat_type', 0))[0]
+        mat_index = struct.unpack_from('<i', block, offsets.get('mat_index', 0))[0]
+        material = ""
+        index = getattr(self.df, 'material_index', None)
+        if index is not None and (mat_index >= 0 or mat_type >= 0):
+            material = index.name(mat_type, mat_index)
+        if not material and 'mat_category' in offsets:
+            category = struct.unpack_from(self._pointer_format, block, offsets['mat_category'])[0] & 0xffffffff
+            material = MAT_CATEGORY_NAMES.get(category, "")
+        return material[:1].upper() + material[1:]
+
+    def _decode_no_job(self, fields: Dict[str, int]) -> Tuple[int, str, str]:
+        """Sem job: reunião, atividade, ordem de esquadrão ou ocioso"""
+        if fields.get('meeting') == 2:
+            return JOB_MEETING, self.catalog.name(JOB_MEETING), ""
+        hist_id = fields.get('hist_id', -1)
+        job_id, desc = self.activities.find(hist_id)
+        if job_id != JOB_UNKNOWN:
+            return job_id, desc, ""
+        if self.squads is not None and hist_id in self.squads.hist_to_squad:
+            squad_id, index = self.squads.hist_to_squad[hist_id]
+            order = self.squads.squads[squad_id].positions[index].order
+            if order >= 0:
+                return ORDER_OFFSET + order, self.catalog.name(ORDER_OFFSET + order), ""
+            return JOB_SOLDIER, self.catalog.name(JOB_SOLDIER), ""
+        return JOB_IDLE, self.catalog.name(JOB_IDLE), ""
+
+    def _build_indexes(self):
+        self.by_job = {}
+        for unit_id, job in self.jobs.items():
+            self.by_job.setdefault(job.job_id, []).append(unit_id)
+        self.idle = self.by_job.get(JOB_IDLE, [])
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def units_doing(self, job_id: int) -> List[int]:
+        return self.by_job.get(job_id, [])
+
+    def histogram(self) -> Dict[str, int]:
+        """Unidades por trabalho (nome do tipo), do mais comum ao menos comum"""
+        return {
+            self.catalog.name(job_id) if job_id in self.catalog.jobs else str(job_id): len(units)
+            for job_id, units in sorted(self.by_job.items(), key=lambda entry: len(entry[1]), reverse=True)
+        }
+
+    def export_jobs(self) -> str:
+        """Exporta trabalhos por unidade, histograma e ociosos"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        exports_dir = Path(__file__).parent.parent / "exports"
+        exports_dir.mkdir(exist_ok=True)
+        filepath = exports_dir / f"unit_jobs_{timestamp}.json"
+
+        export_data = {
+            "analysis_type": "unit_jobs",
+            "total_units": len(self.jobs),
+            "refresh_seconds": self.refresh_seconds,
+            "histogram": self.histogram(),
+            "idle": self.idle,
+            "activities": {hist_id: {"job_id": job_id, "description": desc}
+                           for hist_id, (job_id, desc) in self.activities.actions.items()},
+            "units": [job._asdict() for job in self.jobs.values()]
+        }
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Trabalhos exportados para: {filepath}")
+        return str(filepath)
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== JOB READER - Trabalhos e atividades das unidades ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        dwarves = df.read_complete_dwarves()
+        reader = JobReader(df)
+        reader.refresh(dwarves)
+
+        print(f"⛏️ {len(reader)} unidades lidas em {reader.refresh_seconds:.3f}s "
+              f"({len(reader.activities)} em atividades)")
+        for job_name, count in list(reader.histogram().items())[:15]:
+            print(f"   {job_name}: {count}")
+
+        # Releitura rápida: só os campos de trabalho, sem _read_complete_dwarf
+        started = time.perf_counter()
+        reader.refresh(dwarves)
+        names = {dwarf.id: dwarf.name for dwarf in dwarves}
+        print(f"\n💤 Ociosos ({len(reader.idle)}, releitura em {(time.perf_counter() - started) * 1000:.1f} ms):")
+        for unit_id in reader.idle[:20]:
+            print(f"   {names.get(unit_id, unit_id)}")
+
+        filepath = reader.export_jobs()
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Labor Matrix - Matriz dwarves x labors com operações de bits
+Lê o array de labors (um byte por labor) de todos os dwarves numa leitura em
+bloco e monta a matriz de uma vez: cada linha é a máscara empacotada de um
+dwarf (bit N = labor N) e cada coluna é um bitset de dwarves (bit R = linha R).
+Contagens, "quem tem o labor X" e "quem não tem nenhum labor de transporte"
+saem de OR/AND/popcount sobre inteiros, com nomes e flags dos labors do
+game_data.ini.
+"""
+
+import sys
+import json
+import time
+import logging
+from functools import lru_cache
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, NamedTuple, Iterable
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData, LABOR_COUNT, _LABOR_BIT_TABLE
+from game_data import read_array, game_data_key, to_int
+
+logger = logging.getLogger(__name__)
+
+class LaborInfo(NamedTuple):
+    """Labor do game_data.ini (Labor no C++)"""
+    labor_id: int
+    name: str
+    skill_id: int
+    hauling: bool
+    requires_equipment: bool
+    excludes: Tuple[int, ...]
+
+@lru_cache(maxsize=2)
+def _compile_labor_catalog(key: str) -> Dict[int, LaborInfo]:
+    labors = {}
+    for entry in read_array('labors'):
+        labor_id = to_int(entry.get('id'), -1)
+        if labor_id < 0:
+            continue
+        labors[labor_id] = LaborInfo(
+            labor_id=labor_id,
+            name=entry.get('name', f"Labor {labor_id}"),
+            skill_id=to_int(entry.get('skill'), -1),
+            hauling=entry.get('hauling', "false").lower() in ('1', 'true'),
+            requires_equipment=entry.get('requires_equipment', "false").lower() in ('1', 'true'),
+            excludes=tuple(to_int(excluded.get('labor_id'), -1) for excluded in entry.get('excludes', []))
+        )
+    return dict(sorted(labors.items()))
+
+def load_labor_catalog() -> Dict[int, LaborInfo]:
+    """Labors do game_data.ini por id, compilados uma vez por conteúdo do arquivo"""
+    return _compile_labor_catalog(game_data_key())
+
+def popcount(bitset: int) -> int:
+    """Bits ligados (int.bit_count só existe a partir do Python 3.10)"""
+    return bin(bitset).count('1')
+
+def iter_bits(bitset: int) -> Iterable[int]:
+    """Índices dos bits ligados, do menor para o maior"""
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+class LaborMatrix:
+    """Labors da fortaleza: linhas (máscara por dwarf) e colunas (bitset por labor)"""
+
+    def __init__(self, df_instance: Optional[CompleteDFInstance] = None,
+                 catalog: Optional[Dict[int, LaborInfo]] = None):
+        self.df = df_instance
+        self.catalog = catalog if catalog is not None else load_labor_catalog()
+
+        self.unit_ids: List[int] = []
+        self.names: List[str] = []
+        self.rows: List[int] = []       # linha R -> máscara de labors do dwarf
+        self.columns: List[int] = []    # labor N -> bitset de linhas
+        self.all_rows = 0
+        self._row_of: Dict[int, int] = {}
+        self.refresh_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def refresh(self, dwarves: List[CompletelyDwarfData]) -> int:
+        """Relê o array de labors de todos os dwarves numa leitura em bloco"""
+        started = time.perf_counter()
+        labors_offset = self.df.layout.get_offset('dwarf', 'labors') if self.df else 0
+        if not labors_offset:
+            logger.error("[dwarf_offsets] labors não encontrado no layout")
+            return 0
+
+        dwarves = [dwarf for dwarf in dwarves if dwarf.address]
+        blocks = self.df.memory_reader.read_blocks([dwarf.address + labors_offset for dwarf in dwarves],
+                                                   LABOR_COUNT)
+        valid = [(dwarf, block) for dwarf, block in zip(dwarves, blocks) if len(block) == LABOR_COUNT]
+        bits = b''.join(block for _, block in valid).translate(_LABOR_BIT_TABLE)
+        self._build([dwarf for dwarf, _ in valid], bits)
+        self.refresh_seconds = time.perf_counter() - started
+        logger.info(f"Labors de {len(self.rows)} dwarves lidos em {self.refresh_seconds:.3f}s")
+        return len(self.rows)
+
+    def load_masks(self, dwarves: List[CompletelyDwarfData]) -> int:
+        """Monta a matriz a partir de labor_mask já lido (sem acessar a memória)"""
+        bits = ''.join(format(dwarf.labor_mask, f'0{LABOR_COUNT}b')[::-1] for dwarf in dwarves)
+        self._build(dwarves, bits.encode())
+        return len(self.rows)
+
+    def _build(self, dwarves: List[CompletelyDwarfData], bits: bytes):
+        """
+        bits = arrays de labors concatenados em '0'/'1' (LABOR_COUNT por dwarf);
+        linhas e colunas saem de fatias dessa string, sem laço por célula
+        """
+        count = len(dwarves)
+        self.unit_ids = [dwarf.id for dwarf in dwarves]
+        self.names = [dwarf.name for dwarf in dwarves]
+        self._row_of = {unit_id: row for row, unit_id in enumerate(self.unit_ids)}
+        self.rows = [int(bits[row * LABOR_COUNT:(row + 1) * LABOR_COUNT][::-1], 2)
+                     for row in range(count)]
+        self.columns = [int(bits[labor_id::LABOR_COUNT][::-1], 2) if count else 0
+                        for labor_id in range(LABOR_COUNT)]
+        self.all_rows = (1 << count) - 1
+
+    # ------------------------------------------------------------------
+    # Consultas (operações de bits sobre as colunas)
+    # ------------------------------------------------------------------
+
+    def labor_name(self, labor_id: int) -> str:
+        info = self.catalog.get(labor_id)
+        return info.name if info else f"Labor {labor_id}"
+
+    def _units(self, bitset: int) -> List[int]:
+        return [self.unit_ids[row] for row in iter_bits(bitset)]
+
+    def count(self, labor_id: int) -> int:
+        """Quantos dwarves têm o labor habilitado"""
+        return popcount(self.columns[labor_id]) if 0 <= labor_id < len(self.columns) else 0
+
+    def counts(self) -> Dict[str, int]:
+        """Dwarves por labor conhecido, do mais ao menos atribuído"""
+        counts = {self.labor_name(labor_id): self.count(labor_id) for labor_id in self.catalog
+                  if labor_id < len(self.columns)}
+        return dict(sorted(counts.items(), key=lambda entry: entry[1], reverse=True))
+
+    def with_any(self, labor_ids: Iterable[int]) -> int:
+        """Bitset de linhas com pelo menos um dos labors"""
+        bitset = 0
+        for labor_id in labor_ids:
+            if 0 <= labor_id < len(self.columns):
+                bitset |= self.columns[labor_id]
+        return bitset
+
+    def with_all(self, labor_ids: Iterable[int]) -> int:
+        """Bitset de linhas com todos os labors"""
+        bitset = self.all_rows
+        for labor_id in labor_ids:
+            bitset &= self.columns[labor_id] if 0 <= labor_id < len(self.columns) else 0
+        return bitset
+
+    def units_with(self, labor_id: int) -> List[int]:
+        return self._units(self.with_any([labor_id]))
+
+    def units_without(self, labor_ids: Iterable[int]) -> List[int]:
+        """Dwarves sem nenhum dos labors"""
+        return self._units(self.all_rows & ~self.with_any(labor_ids))
+
+    def hauling_labors(self) -> List[int]:
+        return [labor_id for labor_id, info in self.catalog.items() if info.hauling]
+
+    def without_hauling(self) -> List[int]:
+        """Dwarves sem nenhum labor de transporte"""
+        return self.units_without(self.hauling_labors())
+
+    def labors_of(self, unit_id: int) -> List[str]:
+        row = self._row_of.get(unit_id)
+        if row is None:
+            return []
+        return [self.labor_name(labor_id) for labor_id in iter_bits(self.rows[row])]
+
+    def has(self, unit_id: int, labor_id: int) -> bool:
+        row = self._row_of.get(unit_id)
+        return row is not None and bool(self.rows[row] >> labor_id & 1)
+
+    def exclusion_conflicts(self) -> Dict[Tuple[str, str], List[int]]:
+        """Dwarves com labors mutuamente exclusivos habilitados (ex.: Mining + Wood Cutting)"""
+        conflicts = {}
+        for labor_id, info in self.catalog.items():
+            for excluded in info.excludes:
+                if labor_id < excluded < len(self.columns):
+                    bitset = self.columns[labor_id] & self.columns[excluded]
+                    if bitset:
+                        conflicts[(info.name, self.labor_name(excluded))] = self._units(bitset)
+        return conflicts
+
+    def export_matrix(self) -> str:
+        """Exporta a matriz (máscaras em hexadecimal) e as contagens por labor"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        exports_dir = Path(__file__).parent.parent / "exports"
+        exports_dir.mkdir(exist_ok=True)
+        filepath = exports_dir / f"labor_matrix_{timestamp}.json"
+
+        export_data = {
+            "analysis_type": "labor_matrix",
+            "total_dwarves": len(self.rows),
+            "refresh_seconds": self.refresh_seconds,
+            "labors": {labor_id: info.name for labor_id, info in self.catalog.items()},
+            "counts": self.counts(),
+            "without_hauling": self.without_hauling(),
+            "exclusion_conflicts": {" / ".join(pair): units for pair, units in self.exclusion_conflicts().items()},
+            "dwarves": [
+                {"unit_id": unit_id, "name": name, "labor_mask": f"{mask:#x}", "labors": self.labors_of(unit_id)}
+                for unit_id, name, mask in zip(self.unit_ids, self.names, self.rows)
+            ]
+        }
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Matriz de labors exportada para: {filepath}")
+        return str(filepath)
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== LABOR MATRIX - Labors da fortaleza ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        dwarves = df.read_complete_dwarves()
+        matrix = LaborMatrix(df)
+        matrix.refresh(dwarves)
+
+        print(f"🔨 {len(matrix)} dwarves x {len(matrix.catalog)} labors em {matrix.refresh_seconds:.3f}s")
+        for name, count in list(matrix.counts().items())[:15]:
+            print(f"   {name}: {count}")
+
+        names = dict(zip(matrix.unit_ids, matrix.names))
+        idle_haulers = matrix.without_hauling()
+        print(f"\n📦 Sem nenhum labor de transporte: {len(idle_haulers)}")
+        for unit_id in idle_haulers[:10]:
+            print(f"   {names[unit_id]}")
+
+        filepath = matrix.export_matrix()
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
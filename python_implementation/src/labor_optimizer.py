@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Labor Optimizer - Distribuição de labors a partir das notas de papéis
+Port de LaborOptimizer/laborOptimizerPlan do C++ (algoritmo do Thistleknot):
+cada labor do plano recebe um número de trabalhadores proporcional à sua
+razão, os pares (dwarf, labor) são escolhidos em ordem decrescente de nota x
+prioridade respeitando o limite de labors por dwarf e as exclusões entre
+labors, e quem ficou com poucos labors vira carregador. A seleção usa um heap
+com parada antecipada em vez de ordenar todos os pares; o resultado é um diff
+de labors por dwarf pronto para aplicar.
+"""
+
+import sys
+import json
+import math
+import time
+import heapq
+import random
+import logging
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any, NamedTuple, Set
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData
+from labor_matrix import LaborInfo, load_labor_catalog, iter_bits
+from role_ratings import RoleRatingEngine, MIN_ROLE_RATING
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PlanJob:
+    """Labor do plano (PlanDetail)"""
+    labor_id: int
+    role_name: str = ""       # vazio = usa a nota da skill do labor
+    priority: float = 1.0
+    ratio: float = 1.0        # proporção em relação aos outros labors
+    max_laborers: int = -1    # >= 0 fixa a quantidade (contagem manual)
+
+    @property
+    def overridden(self) -> bool:
+        return self.max_laborers >= 0
+
+    @property
+    def active(self) -> bool:
+        return self.priority > 0 and self.ratio > 0
+
+@dataclass
+class OptimizerPlan:
+    """Plano de otimização (laborOptimizerPlan)"""
+    name: str = "UNKNOWN"
+    jobs: List[PlanJob] = field(default_factory=list)
+    max_jobs_per_dwarf: int = 20
+    pop_percent: float = 100.0
+    auto_haulers: bool = True
+    hauler_percent: float = 50.0
+    exclude_squads: bool = True
+    excluded_units: Set[int] = field(default_factory=set)  # ficam como estão
+    check_conflicts: bool = True   # options/labor_exclusions
+
+    def job_for(self, labor_id: int) -> Optional[PlanJob]:
+        for job in self.jobs:
+            if job.labor_id == labor_id:
+                return job
+        return None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'OptimizerPlan':
+        plan = cls(**{key: value for key, value in data.items() if key not in ('jobs', 'excluded_units')})
+        plan.jobs = [PlanJob(**job) for job in data.get('jobs', [])]
+        plan.excluded_units = set(data.get('excluded_units', []))
+        return plan
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['excluded_units'] = sorted(self.excluded_units)
+        return data
+
+class LaborDiff(NamedTuple):
+    """Mudança de labors de um dwarf (máscaras com bit N = labor N)"""
+    unit_id: int
+    name: str
+    old_mask: int
+    new_mask: int
+
+    @property
+    def enabled(self) -> List[int]:
+        return list(iter_bits(self.new_mask & ~self.old_mask))
+
+    @property
+    def disabled(self) -> List[int]:
+        return list(iter_bits(self.old_mask & ~self.new_mask))
+
+@dataclass
+class Assignment:
+    """Resultado da seleção sobre a matriz de notas"""
+    masks: List[int]                 # labors otimizados por linha
+    assigned: List[int]              # trabalhadores por job do plano
+    haulers: List[int]               # linhas que viraram carregadores
+    visited: int = 0                 # pares examinados
+
+@dataclass
+class OptimizationResult:
+    """Resultado completo da otimização"""
+    plan: str
+    population: int
+    max_counts: Dict[int, int]
+    assigned_counts: Dict[int, int]
+    haulers: List[int]
+    excluded: List[Tuple[int, str]]
+    diffs: List[LaborDiff]
+    candidates: int = 0
+    seconds: float = 0.0
+
+    @property
+    def changes(self) -> List[Tuple[int, int, bool]]:
+        """(unit_id, labor_id, habilitar) na ordem de aplicação"""
+        return [(diff.unit_id, labor_id, enabled) for diff in self.diffs
+                for labor_id, enabled in ([(labor, False) for labor in diff.disabled] +
+                                          [(labor, True) for labor in diff.enabled])]
+
+def round_half_up(value: float) -> int:
+    """roundf para valores positivos"""
+    return int(math.floor(value + 0.5))
+
+class LaborOptimizer:
+    """Aplica um plano sobre as notas de papéis da fortaleza"""
+
+    def __init__(self, plan: OptimizerPlan, catalog: Optional[Dict[int, LaborInfo]] = None):
+        self.plan = plan
+        self.catalog = catalog if catalog is not None else load_labor_catalog()
+
+    # ------------------------------------------------------------------
+    # Quantidade de trabalhadores por labor (LaborOptimizer::update_ratios)
+    # ------------------------------------------------------------------
+
+    def max_counts(self, population: int) -> List[int]:
+        """Máximo de trabalhadores por job do plano (0 para jobs inativos)"""
+        plan = self.plan
+        target_population = plan.pop_percent / 100.0 * population
+        ratio_sum = sum(job.ratio for job in plan.jobs if job.active and not job.overridden)
+        # contagens manuais saem do total distribuído pelas razões
+        static_job_count = sum(job.max_laborers for job in plan.jobs if job.overridden)
+        total_jobs = target_population * plan.max_jobs_per_dwarf - static_job_count
+
+        group_ratio = [0.0] * len(plan.jobs)
+        exceeds_population = False
+        if plan.check_conflicts:
+            index_of = {job.labor_id: index for index, job in enumerate(plan.jobs)}
+            for index, job in enumerate(plan.jobs):
+                excludes = self.catalog[job.labor_id].excludes if job.labor_id in self.catalog else ()
+                if not job.active or group_ratio[index] > 0 or not excludes:
+                    continue
+                # labors conflitantes dividem a mesma população
+                related = [index_of[labor_id] for labor_id in excludes
+                           if labor_id in index_of and not plan.jobs[index_of[labor_id]].overridden]
+                group_ratio[index] = job.ratio + sum(plan.jobs[other].ratio for other in related)
+                for other in related:
+                    group_ratio[other] = group_ratio[index]
+                if (not job.overridden and ratio_sum > 0 and
+                        group_ratio[index] / ratio_sum * total_jobs > population):
+                    ratio_sum -= group_ratio[index]
+                    exceeds_population = True
+                    if ratio_sum <= 0:
+                        ratio_sum = 0
+                        break
+            if exceeds_population:
+                total_jobs -= population
+
+        counts = []
+        for index, job in enumerate(plan.jobs):
+            if not job.active:
+                counts.append(0)
+            elif job.overridden:
+                counts.append(job.max_laborers)
+            else:
+                if group_ratio[index] > 0 and exceeds_population:
+                    count = round_half_up(job.ratio / group_ratio[index] * population)
+                else:
+                    count = round_half_up(job.ratio / ratio_sum * total_jobs) if ratio_sum > 0 else 0
+                counts.append(max(0, min(count, population)))
+        return counts
+
+    # ------------------------------------------------------------------
+    # Seleção
+    # ------------------------------------------------------------------
+
+    def assign(self, ratings: List[List[float]], max_counts: List[int], method: str = 'heap') -> Assignment:
+        """
+        ratings[job][linha] = nota x prioridade. 'sorted' é a passada do C++:
+        ordena todos os pares e examina um a um. 'heap' ordena cada job
+        separadamente e intercala as cabeças num heap de jobs: um job lotado
+        sai da intercalação (seus pares restantes nem são examinados) e a
+        seleção para quando todos os dwarves estão cheios. A ordem de exame é
+        a mesma nos dois (nota decrescente, empates por job e linha), logo o
+        resultado também.
+        """
+        rows = len(ratings[0]) if ratings else 0
+        plan = self.plan
+        jobs = plan.jobs
+        limit = plan.max_jobs_per_dwarf
+        labor_bits = [1 << job.labor_id for job in jobs]
+        exclude_masks = [0] * len(jobs)
+        if plan.check_conflicts:
+            for index, job in enumerate(jobs):
+                info = self.catalog.get(job.labor_id)
+                for labor_id in (info.excludes if info else ()):
+                    if labor_id >= 0:
+                        exclude_masks[index] |= 1 << labor_id
+
+        masks = [0] * rows
+        counts = [0] * rows
+        assigned = [0] * len(jobs)
+        visited = 0
+
+        if method == 'heap':
+            # ordem de cada job (sort estável reverso: empates pela linha) consumida sob demanda
+            streams = {}
+            heads = []
+            for index, column in enumerate(ratings):
+                if jobs[index].active and max_counts[index] > 0 and rows:
+                    stream = iter(sorted(range(rows), key=column.__getitem__, reverse=True))
+                    streams[index] = stream
+                    row = next(stream)
+                    heads.append((-column[row], index * rows + row, index))
+            heapq.heapify(heads)
+            open_rows = rows if limit > 0 else 0
+
+            while heads and open_rows:
+                _, key, index = heapq.heappop(heads)
+                visited += 1
+                row = key - index * rows
+                if counts[row] < limit and not masks[row] & exclude_masks[index]:
+                    masks[row] |= labor_bits[index]
+                    counts[row] += 1
+                    assigned[index] += 1
+                    if counts[row] == limit:
+                        open_rows -= 1
+                    if assigned[index] == max_counts[index]:
+                        continue  # job lotado: sai da intercalação
+                row = next(streams[index], None)
+                if row is not None:
+                    heapq.heappush(heads, (-ratings[index][row], index * rows + row, index))
+        else:
+            candidates = sorted((-rating, index * rows + row)
+                                for index, column in enumerate(ratings) if jobs[index].active
+                                for row, rating in enumerate(column))
+            for _, key in candidates:
+                visited += 1
+                index, row = divmod(key, rows)
+                if (counts[row] < limit and assigned[index] < max_counts[index]
+                        and not masks[row] & exclude_masks[index]):
+                    masks[row] |= labor_bits[index]
+                    counts[row] += 1
+                    assigned[index] += 1
+
+        haulers = []
+        if plan.auto_haulers:
+            threshold = round_half_up(limit * plan.hauler_percent / 100.0)
+            has_candidates = any(job.active for job in jobs)
+            for row in range(rows):
+                # no C++ o dwarf sai da lista ao ser visitado com labors suficientes
+                # (com limite 0, qualquer dwarf que tenha pares)
+                if counts[row] < threshold or (threshold <= 0 and not has_candidates):
+                    haulers.append(row)
+        return Assignment(masks, assigned, haulers, visited)
+
+    # ------------------------------------------------------------------
+    # Otimização completa
+    # ------------------------------------------------------------------
+
+    def population(self, dwarves: List[CompletelyDwarfData]) -> Tuple[List[CompletelyDwarfData], List[Tuple[int, str]], List[CompletelyDwarfData]]:
+        """(otimizados, excluídos com motivo, excluídos cujos labors são limpos)"""
+        included, excluded, cleared = [], [], []
+        for dwarf in dwarves:
+            if dwarf.id in self.plan.excluded_units:
+                excluded.append((dwarf.id, f"(Excluído) {dwarf.name}"))
+            elif self.plan.exclude_squads and dwarf.squad_id > -1:
+                excluded.append((dwarf.id, f"(Esquadrão) {dwarf.name}"))
+                cleared.append(dwarf)
+            else:
+                included.append(dwarf)
+        return included, excluded, cleared
+
+    def rating_matrix(self, dwarves: List[CompletelyDwarfData], engine: RoleRatingEngine) -> List[List[float]]:
+        """Nota x prioridade por job do plano e dwarf (papel ou skill do labor)"""
+        layout = engine.catalog.layout
+        rows = [engine._row_of.get(dwarf.id) for dwarf in dwarves]
+        matrix = []
+        for job in self.plan.jobs:
+            if job.role_name:
+                source = engine.display.get(job.role_name)
+                scale = job.priority
+            else:
+                info = self.catalog.get(job.labor_id)
+                skill_id = info.skill_id if info else -1
+                source = (engine.columns[layout.offsets['skills'] + skill_id]
+                          if 0 <= skill_id < layout.sizes['skills'] and engine.columns else None)
+                scale = 100.0 * job.priority
+            if source is None:
+                matrix.append([0.0] * len(dwarves))
+            elif job.role_name:
+                matrix.append([source[row] * scale if row is not None else 0.0 for row in rows])
+            else:
+                # Skill::get_rating(true): nota nula vira a menor nota de papel
+                matrix.append([(source[row] or MIN_ROLE_RATING) * scale if row is not None else 0.0
+                               for row in rows])
+        return matrix
+
+    def optimize(self, dwarves: List[CompletelyDwarfData], engine: RoleRatingEngine,
+                 method: str = 'heap') -> OptimizationResult:
+        """Otimiza os labors e devolve o diff em relação às máscaras atuais"""
+        started = time.perf_counter()
+        included, excluded, cleared = self.population(dwarves)
+        max_counts = self.max_counts(len(included))
+        ratings = self.rating_matrix(included, engine)
+        result = self.assign(ratings, max_counts, method)
+
+        hauling_mask = 0
+        for labor_id, info in self.catalog.items():
+            if info.hauling:
+                hauling_mask |= 1 << labor_id
+        for row in result.haulers:
+            result.masks[row] |= hauling_mask
+
+        diffs = [LaborDiff(dwarf.id, dwarf.name, dwarf.labor_mask, mask)
+                 for dwarf, mask in zip(included, result.masks) if mask != dwarf.labor_mask]
+        diffs.extend(LaborDiff(dwarf.id, dwarf.name, dwarf.labor_mask, 0)
+                     for dwarf in cleared if dwarf.labor_mask)
+
+        optimization = OptimizationResult(
+            plan=self.plan.name,
+            population=len(included),
+            max_counts={job.labor_id: count for job, count in zip(self.plan.jobs, max_counts)},
+            assigned_counts={job.labor_id: count for job, count in zip(self.plan.jobs, result.assigned)},
+            haulers=[included[row].id for row in result.haulers],
+            excluded=excluded,
+            diffs=diffs,
+            candidates=sum(len(column) for column, job in zip(ratings, self.plan.jobs) if job.active),
+            seconds=time.perf_counter() - started
+        )
+        logger.info(f"Plano '{self.plan.name}': {len(diffs)} dwarves alterados, "
+                    f"{len(optimization.haulers)} carregadores em {optimization.seconds:.3f}s")
+        return optimization
+
+    def export_result(self, result: OptimizationResult) -> str:
+        """Exporta o diff de labors"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        exports_dir = Path(__file__).parent.parent / "exports"
+        exports_dir.mkdir(exist_ok=True)
+        filepath = exports_dir / f"labor_optimization_{timestamp}.json"
+
+        names = {labor_id: info.name for labor_id, info in self.catalog.items()}
+        export_data = {
+            "analysis_type": "labor_optimization",
+            "plan": self.plan.to_dict(),
+            "population": result.population,
+            "candidates": result.candidates,
+            "seconds": result.seconds,
+            "jobs": [
+                {"labor": names.get(labor_id, f"Labor {labor_id}"), "max": result.max_counts[labor_id],
+                 "assigned": result.assigned_counts[labor_id]}
+                for labor_id in result.max_counts
+            ],
+            "haulers": result.haulers,
+            "excluded": [{"unit_id": unit_id, "reason": reason} for unit_id, reason in result.excluded],
+            "diffs": [
+                {
+                    "unit_id": diff.unit_id,
+                    "name": diff.name,
+                    "labor_mask": f"{diff.new_mask:#x}",
+                    "enable": [names.get(labor_id, labor_id) for labor_id in diff.enabled],
+                    "disable": [names.get(labor_id, labor_id) for labor_id in diff.disabled]
+                }
+                for diff in result.diffs
+            ]
+        }
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Otimização exportada para: {filepath}")
+        return str(filepath)
+
+def default_plan(catalog: Dict[int, LaborInfo]) -> OptimizerPlan:
+    """Plano com todos os labors não-carregadores, pela nota da skill"""
+    jobs = [PlanJob(labor_id) for labor_id, info in catalog.items()
+            if not info.hauling and info.skill_id >= 0]
+    return OptimizerPlan(name="Padrão", jobs=jobs, max_jobs_per_dwarf=5)
+
+def benchmark(dwarf_count: int = 250, job_count: int = 80, repeat: int = 5, seed: int = 1) -> Dict[str, float]:
+    """Compara heap e passada ordenada sobre uma matriz de notas sintética"""
+    catalog = load_labor_catalog()
+    rng = random.Random(seed)
+    labor_ids = [labor_id for labor_id, info in catalog.items() if not info.hauling][:job_count]
+    plan = OptimizerPlan(name="Benchmark", max_jobs_per_dwarf=5,
+                         jobs=[PlanJob(labor_id, priority=rng.uniform(0.5, 1.5), ratio=rng.uniform(0.5, 3.0))
+                               for labor_id in labor_ids])
+    optimizer = LaborOptimizer(plan, catalog)
+    ratings = [[rng.uniform(0, 100) for _ in range(dwarf_count)] for _ in plan.jobs]
+    max_counts = optimizer.max_counts(dwarf_count)
+
+    timings = {}
+    results = {}
+    for method in ('sorted', 'heap'):
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results[method] = optimizer.assign(ratings, max_counts, method)
+            best = min(best, time.perf_counter() - started)
+        timings[method] = best
+
+    naive, fast = results['sorted'], results['heap']
+    if (naive.masks, naive.assigned, naive.haulers) != (fast.masks, fast.assigned, fast.haulers):
+        raise AssertionError("heap e passada ordenada divergiram")
+    timings['pairs'] = dwarf_count * len(plan.jobs)
+    timings['visited_heap'] = results['heap'].visited
+    return timings
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== LABOR OPTIMIZER - Distribuição de labors ===")
+    print()
+
+    if '--benchmark' in sys.argv:
+        for dwarf_count in (100, 250, 1000):
+            timings = benchmark(dwarf_count)
+            print(f"⏱️  {timings['pairs']} pares: ordenado {timings['sorted'] * 1000:.1f}ms, "
+                  f"heap {timings['heap'] * 1000:.1f}ms ({timings['visited_heap']} examinados)")
+        return
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        dwarves = df.read_complete_dwarves()
+        engine = RoleRatingEngine()
+        engine.refresh(dwarves)
+
+        catalog = load_labor_catalog()
+        plan = default_plan(catalog)
+        optimizer = LaborOptimizer(plan, catalog)
+        result = optimizer.optimize(dwarves, engine)
+
+        print(f"🛠️  {result.population} dwarves, {result.candidates} pares em {result.seconds * 1000:.1f}ms")
+        print(f"📦 Carregadores: {len(result.haulers)}")
+        for diff in result.diffs[:10]:
+            enabled = ", ".join(catalog[labor_id].name for labor_id in diff.enabled if labor_id in catalog)
+            print(f"   {diff.name}: +{len(diff.enabled)} -{len(diff.disabled)} {enabled}")
+
+        filepath = optimizer.export_result(result)
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,7 @@ from complete_dwarf_reader import (
     CompleteDFInstance, CompletelyDwarfData, MemoryReader, 
     logger as base_logger
 )
+from reader_daemon import DaemonDFInstance
 
 # Configurar logging
 logging.basicConfig(
@@ -431,8 +432,8 @@ def main():
     print("LOCATION FINDER - Descobrindo Coordenadas e Localizações")
     print("="*60)
     
-    # Conectar ao DF
-    df = CompleteDFInstance()
+    # Conectar ao DF (pelo reader_daemon.py, se estiver rodando)
+    df = DaemonDFInstance.attach() or CompleteDFInstance()
     
     try:
         # Conectar
@@ -449,7 +450,7 @@ def main():
         
         # Ler dwarves
         print("\nLendo dwarves...")
-        dwarves = df.read_complete_dwarves()
+        dwarves = df.read_dwarves(fields={'name'})
         
         if not dwarves:
             print("ERRO: Nenhum dwarf encontrado")
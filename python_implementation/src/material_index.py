@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Material Index - Resolução de (mat_type, mat_index) para nomes de materiais
+Percorre uma vez base_materials, inorganics_vector, plants_vector e
+races_vector com leituras em bloco ([material_offsets] e [plant_offsets]) e
+memoriza cada nome resolvido, seguindo as faixas de DFInstance::find_material
+(decode_materials.py). Decodificar milhares de itens equipados custa uma
+consulta em dicionário por item em vez de uma cadeia de ponteiros.
+"""
+
+import sys
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, FrozenSet, NamedTuple
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance
+from race_cache import read_flag_arrays, MAX_RACES, DF_STRING_SIZE
+
+logger = logging.getLogger(__name__)
+
+BASE_MATERIAL_COUNT = 256
+MAX_EMBEDDED_POINTERS = 10000  # descarta vetores corrompidos antes da leitura em bloco
+
+# Faixas de mat_type (DFInstance::find_material)
+RAW_MATERIAL_END = 19
+CREATURE_MATERIAL_END = 219
+HIST_FIGURE_MATERIAL_END = 419
+PLANT_MATERIAL_END = 619
+
+# MATERIAL_STATES de global_enums.h
+MATERIAL_STATES = ('solid', 'liquid', 'gas', 'powder', 'paste', 'pressed')
+SOLID, LIQUID, GAS, POWDER, PASTE, PRESSED = range(6)
+STATE_FIELDS = ('solid_name', 'liquid_name', 'gas_name', 'powder_name', 'paste_name', 'pressed_name')
+
+# ITEM_TYPE que mudam o nome exibido do material
+ITEM_SEEDS, ITEM_PLANT = 53, 54
+ITEM_DRINK, ITEM_POWDER_MISC, ITEM_CHEESE, ITEM_LIQUID_MISC = 69, 70, 71, 73
+
+# MATERIAL_FLAGS de global_enums.h
+ALCOHOL = 5
+ALCOHOL_PLANT = 13
+POWDER_MISC_PLANT = 17
+LIQUID_MISC_PLANT = 20
+IS_POWDER_MISC = 34
+IS_LIQUID_MISC = 35
+SEED_MAT = 37
+
+class Material(NamedTuple):
+    """Nomes por estado e flags de um material"""
+    state_names: Tuple[str, ...]
+    prefix: str
+    flags: FrozenSet[int]
+
+    def name(self, state: int = SOLID) -> str:
+        """Equivalente a Material::get_material_name"""
+        state_name = self.state_names[state] if 0 <= state < len(self.state_names) else ""
+        return f"{self.prefix} {state_name}" if self.prefix else state_name
+
+class Plant(NamedTuple):
+    """Nomes de uma planta e os ponteiros dos seus materiais"""
+    name: str
+    name_plural: str
+    seed_plural: str
+    material_addresses: Tuple[int, ...]
+
+class MaterialIndex:
+    """Tabelas de materiais lidas uma vez por sessão e nomes memorizados"""
+
+    def __init__(self, df_instance: CompleteDFInstance, figures=None):
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.figures = figures  # HistoricalFigureIndex opcional (faixa 219-418)
+        self.offsets = df_instance.layout.offsets.get('material', {})
+        self.base: Dict[int, Material] = {}
+        self.inorganics: List[Optional[Material]] = []
+        self.plants: List[Optional[Plant]] = []
+        self.race_material_addresses: List[Tuple[int, ...]] = []
+        # Materiais de criaturas/plantas são decodificados sob demanda, por raça/planta
+        self._creature_materials: Dict[int, List[Optional[Material]]] = {}
+        self._plant_materials: Dict[int, List[Optional[Material]]] = {}
+        self._names: Dict[Tuple[int, int, int, int], str] = {}
+        self.load_seconds = 0.0
+
+        fields = STATE_FIELDS + ('flags', 'prefix')
+        self.material_block_size = max(self.offsets.get(name, 0) for name in fields) + DF_STRING_SIZE
+
+    def load(self):
+        """Percorre os quatro vetores de materiais do layout"""
+        started = time.perf_counter()
+        df = self.df
+        layout = df.layout
+        if not self.offsets:
+            logger.error("[material_offsets] não encontrado no layout")
+            return
+
+        base_addr = layout.get_address('base_materials')
+        if base_addr:
+            pointers = self.memory.read_pointer_array(base_addr + df.base_addr, BASE_MATERIAL_COUNT, df.pointer_size)
+            used = [(index, pointer) for index, pointer in enumerate(pointers) if pointer]
+            materials = self._decode_materials([pointer for _, pointer in used])
+            self.base = {index: material for (index, _), material in zip(used, materials) if material}
+
+        inorganics_addr = layout.get_address('inorganics_vector')
+        if inorganics_addr:
+            # inorganic_raw.material é embutido na estrutura, não um ponteiro
+            embedded = self.offsets.get('inorganic_materials_vector', 0)
+            pointers = self.memory.read_vector(inorganics_addr + df.base_addr, df.pointer_size, keep_nulls=True)
+            self.inorganics = self._decode_materials([pointer + embedded if pointer else 0 for pointer in pointers])
+
+        plants_addr = layout.get_address('plants_vector')
+        if plants_addr:
+            self.plants = self._read_plants(self.memory.read_vector(plants_addr + df.base_addr, df.pointer_size,
+                                                                    keep_nulls=True))
+
+        races_addr = layout.get_address('races_vector')
+        materials_offset = layout.get_offset('race', 'materials_vector')
+        if races_addr and materials_offset:
+            races = self.memory.read_vector(races_addr + df.base_addr, df.pointer_size, max_count=MAX_RACES,
+                                            keep_nulls=True)
+            blocks = self._read_slot_blocks(races, materials_offset + 2 * df.pointer_size)
+            self.race_material_addresses = self.memory.read_embedded_vectors(blocks, materials_offset, df.pointer_size,
+                                                                               MAX_EMBEDDED_POINTERS)
+
+        self._creature_materials.clear()
+        self._plant_materials.clear()
+        self._names.clear()
+        self.load_seconds = time.perf_counter() - started
+        logger.info(f"Materiais indexados em {self.load_seconds:.2f}s: {len(self.base)} base, "
+                    f"{len(self.inorganics)} inorgânicos, {len(self.plants)} plantas, "
+                    f"{len(self.race_material_addresses)} raças")
+
+    def _read_slot_blocks(self, addresses: List[int], size: int) -> List[bytes]:
+        """read_blocks que mantém os slots nulos (b'') para o índice continuar igual ao id do DF"""
+        slots = [i for i, address in enumerate(addresses) if address]
+        blocks = [b''] * len(addresses)
+        for i, block in zip(slots, self.memory.read_blocks([addresses[i] for i in slots], size)):
+            blocks[i] = block
+        return blocks
+
+    def _decode_materials(self, addresses: List[int]) -> List[Optional[Material]]:
+        """Decodifica estruturas material com uma leitura em bloco (endereço 0 -> None)"""
+        size = self.material_block_size
+        pointer_size = self.df.pointer_size
+        blocks = self._read_slot_blocks(addresses, size)
+        flags = read_flag_arrays(self.memory, blocks, self.offsets.get('flags', 0), pointer_size)
+
+        materials: List[Optional[Material]] = []
+        for block, bits in zip(blocks, flags):
+            if len(block) != size:
+                materials.append(None)
+                continue
+            materials.append(Material(
+                state_names=tuple(self.memory.decode_df_string(block, self.offsets.get(name, 0), pointer_size)
+                                  for name in STATE_FIELDS),
+                prefix=self.memory.decode_df_string(block, self.offsets.get('prefix', 0), pointer_size),
+                flags=frozenset(bits)
+            ))
+        return materials
+
+    def _read_plants(self, pointers: List[int]) -> List[Optional[Plant]]:
+        offsets = self.df.layout.offsets.get('plant', {})
+        if not offsets:
+            return []
+        pointer_size = self.df.pointer_size
+        blocks = self._read_slot_blocks(pointers, max(offsets.values()) + DF_STRING_SIZE)
+        material_vectors = self.memory.read_embedded_vectors(blocks, offsets.get('materials_vector', 0),
+                                                             pointer_size, MAX_EMBEDDED_POINTERS)
+
+        def string(block: bytes, name: str) -> str:
+            return self.memory.decode_df_string(block, offsets[name], pointer_size) if name in offsets else ""
+
+        plants: List[Optional[Plant]] = []
+        for block, materials in zip(blocks, material_vectors):
+            if not block:
+                plants.append(None)
+                continue
+            plants.append(Plant(
+                name=string(block, 'name'),
+                name_plural=string(block, 'name_plural'),
+                seed_plural=string(block, 'name_seed_plural'),
+                material_addresses=materials
+            ))
+        return plants
+
+    # ------------------------------------------------------------------
+    # Resolução
+    # ------------------------------------------------------------------
+
+    def _creature_material(self, race_id: int, index: int) -> Optional[Material]:
+        if not 0 <= race_id < len(self.race_material_addresses):
+            return None
+        materials = self._creature_materials.get(race_id)
+        if materials is None:
+            materials = self._creature_materials[race_id] = \
+                self._decode_materials(list(self.race_material_addresses[race_id]))
+        return materials[index] if 0 <= index < len(materials) else None
+
+    def _plant_material(self, plant_id: int, index: int) -> Optional[Material]:
+        plant = self.plants[plant_id] if 0 <= plant_id < len(self.plants) else None
+        if plant is None:
+            return None
+        materials = self._plant_materials.get(plant_id)
+        if materials is None:
+            materials = self._plant_materials[plant_id] = self._decode_materials(list(plant.material_addresses))
+        return materials[index] if 0 <= index < len(materials) else None
+
+    def material(self, mat_type: int, mat_index: int) -> Optional[Material]:
+        """Equivalente a DFInstance::find_material"""
+        if mat_index < 0:
+            return self.base.get(mat_type)
+        if mat_type == 0:
+            return self.inorganics[mat_index] if mat_index < len(self.inorganics) else None
+        if mat_type < RAW_MATERIAL_END:
+            return self.base.get(mat_type)
+        if mat_type < CREATURE_MATERIAL_END:
+            return self._creature_material(mat_index, mat_type - RAW_MATERIAL_END)
+        if mat_type < HIST_FIGURE_MATERIAL_END:
+            figure = self.figures.get(mat_index) if self.figures else None
+            return self._creature_material(figure.race, mat_type - CREATURE_MATERIAL_END) if figure else None
+        if mat_type < PLANT_MATERIAL_END:
+            return self._plant_material(mat_index, mat_type - HIST_FIGURE_MATERIAL_END)
+        return None
+
+    def name(self, mat_type: int, mat_index: int, item_type: int = -1, state: int = SOLID) -> str:
+        """Nome do material como em DFInstance::find_material_name (memorizado)"""
+        key = (mat_type, mat_index, item_type, state)
+        name = self._names.get(key)
+        if name is None:
+            name = self._names[key] = self._resolve_name(mat_type, mat_index, item_type, state)
+        return name
+
+    def _resolve_name(self, mat_type: int, mat_index: int, item_type: int, state: int) -> str:
+        material = self.material(mat_type, mat_index)
+        if material is None:
+            return ""
+
+        liquid_item = item_type in (ITEM_DRINK, ITEM_LIQUID_MISC)
+        name = ""
+        if mat_index < 0 or mat_type < RAW_MATERIAL_END:
+            name = material.name(state)
+        elif mat_type < CREATURE_MATERIAL_END:
+            name = material.name(LIQUID if liquid_item else state)
+        elif mat_type < HIST_FIGURE_MATERIAL_END:
+            owner = self.figures.name(mat_index) if self.figures else ""
+            name = f"{owner}'s {material.name(state)}" if owner else material.name(state)
+        elif mat_type < PLANT_MATERIAL_END:
+            plant = self.plants[mat_index]
+            flags = material.flags
+            if item_type == ITEM_SEEDS:
+                name = plant.seed_plural
+            elif item_type == ITEM_PLANT:
+                name = plant.name_plural
+            elif state != SOLID:
+                name = material.name(state)
+            elif liquid_item:
+                name = material.name(LIQUID)
+            elif item_type in (ITEM_POWDER_MISC, ITEM_CHEESE):
+                name = material.name(POWDER)
+            elif SEED_MAT in flags:
+                name = plant.seed_plural
+            elif flags & {ALCOHOL, ALCOHOL_PLANT, IS_LIQUID_MISC, LIQUID_MISC_PLANT}:
+                name = material.name(LIQUID)
+            elif flags & {POWDER_MISC_PLANT, IS_POWDER_MISC}:
+                name = material.name(POWDER)
+            else:
+                name = material.name(SOLID)
+        return name.lower().strip()
+
+def load_material_index(df_instance: CompleteDFInstance, refresh: bool = False) -> MaterialIndex:
+    """Carrega (uma vez por conexão) o índice de materiais da instância"""
+    index = getattr(df_instance, 'material_index', None)
+    if index is None or refresh:
+        index = MaterialIndex(df_instance)
+        index.load()
+        df_instance.material_index = index
+    return index
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== MATERIAL INDEX - Nomes de materiais ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        index = load_material_index(df)
+        dwarves = df.read_complete_dwarves()
+        items = [item for dwarf in dwarves for item in dwarf.equipment]
+
+        started = time.perf_counter()
+        names: Dict[str, int] = {}
+        for item in items:
+            name = index.name(*item.material, item.item_type) or "?"
+            names[name] = names.get(name, 0) + 1
+        elapsed = time.perf_counter() - started
+
+        print(f"🧱 Inorgânicos: {len(index.inorganics)} | Plantas: {len(index.plants)} | "
+              f"Raças: {len(index.race_material_addresses)} ({index.load_seconds:.2f}s)")
+        print(f"🎒 {len(items)} itens equipados resolvidos em {elapsed * 1000:.1f} ms")
+        for name, count in sorted(names.items(), key=lambda item: item[1], reverse=True)[:15]:
+            print(f"   {name}: {count}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Memory Diff - Comparação rápida de snapshots de memória página a página
+Substitui o polling de candidate_offsets do PositionTracker por um único diff:
+tira dois snapshots das estruturas de unidades, descarta páginas idênticas pelo
+hash e compara palavra a palavra apenas as páginas que mudaram.
+"""
+
+import sys
+import json
+import time
+import hashlib
+import logging
+from bisect import bisect_right
+from datetime import datetime
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Any, Iterable, Set
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(),
+        logging.FileHandler('memory_diff.log')
+    ]
+)
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 0x1000
+WORD_SIZE = 4
+
+# Distância observada entre alocações consecutivas de unidades
+# (ex.: 0x267cbae7040 -> 0x267cbae84b0 no SimplePositionTracker)
+DEFAULT_UNIT_SIZE = 0x1470
+
+@dataclass
+class UnitRange:
+    """Faixa de endereços ocupada pela estrutura de uma unidade"""
+    address: int
+    size: int
+    unit_id: int = -1
+
+    @property
+    def end(self) -> int:
+        return self.address + self.size
+
+@dataclass
+class MemorySnapshot:
+    """Conteúdo das páginas que cobrem as estruturas de unidades"""
+    timestamp: float
+    pages: Dict[int, bytes] = field(default_factory=dict)        # endereço da página -> conteúdo
+    page_hashes: Dict[int, bytes] = field(default_factory=dict)  # endereço da página -> digest
+    unreadable: Set[int] = field(default_factory=set)            # páginas que falharam (fora do diff)
+    units: List[UnitRange] = field(default_factory=list)
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.pages) * PAGE_SIZE
+
+@dataclass
+class FieldChange:
+    """Palavra de 32 bits que mudou dentro de uma estrutura"""
+    offset: int
+    old_value: int
+    new_value: int
+
+@dataclass
+class UnitDiff:
+    """Mudanças detectadas em uma unidade entre dois snapshots"""
+    address: int
+    unit_id: int
+    changes: List[FieldChange] = field(default_factory=list)
+
+@dataclass
+class SnapshotDiff:
+    """Resultado de MemoryDiffEngine.diff"""
+    pages_compared: int = 0
+    pages_changed: int = 0
+    pages_unreadable: int = 0
+    words_changed: int = 0
+    unowned_changes: int = 0
+    elapsed_seconds: float = 0.0
+    units: Dict[int, UnitDiff] = field(default_factory=dict)  # endereço da unidade -> diff
+
+    def offset_frequency(self) -> Dict[int, int]:
+        """Quantas unidades tiveram cada offset alterado"""
+        frequency: Dict[int, int] = {}
+        for unit_diff in self.units.values():
+            for change in unit_diff.changes:
+                frequency[change.offset] = frequency.get(change.offset, 0) + 1
+        return frequency
+
+def page_digest(data: bytes) -> bytes:
+    """Hash curto usado para descartar páginas idênticas"""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def changed_words(old: bytes, new: bytes) -> List[Tuple[int, int, int]]:
+    """
+    Lista (offset, antigo, novo) das palavras de 32 bits diferentes.
+    Compara blocos de 64 bytes primeiro (memcmp) e só desce ao nível de palavra
+    nos blocos que diferem.
+    """
+    size = min(len(old), len(new)) & ~(WORD_SIZE - 1)
+    if size == 0:
+        return []
+
+    old_words = memoryview(old)[:size].cast('I')
+    new_words = memoryview(new)[:size].cast('I')
+
+    result = []
+    for block in range(0, size, 64):
+        block_end = min(block + 64, size)
+        if old[block:block_end] == new[block:block_end]:
+            continue
+        for index in range(block // WORD_SIZE, block_end // WORD_SIZE):
+            if old_words[index] != new_words[index]:
+                result.append((index * WORD_SIZE, old_words[index], new_words[index]))
+    return result
+
+class MemoryDiffEngine:
+    """Tira snapshots das estruturas de unidades e calcula o diff entre eles"""
+
+    def __init__(self, df_instance: CompleteDFInstance, unit_size: int = DEFAULT_UNIT_SIZE):
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.unit_size = unit_size
+
+    def collect_unit_ranges(self, limit: Optional[int] = None) -> List[UnitRange]:
+        """Monta as faixas de endereço das unidades a partir do creature_vector"""
+        creature_vector_addr = self.df.layout.get_address('creature_vector')
+        if not creature_vector_addr:
+            logger.error("creature_vector não encontrado no layout")
+            return []
+
+        pointers = self.memory.read_vector(creature_vector_addr + self.df.base_addr, self.df.pointer_size)
+        if limit is not None:
+            pointers = pointers[:limit]
+
+        id_offset = self.df.layout.get_offset('dwarf', 'id')
+        units = []
+        for address in pointers:
+            unit_id = self.memory.read_int32(address + id_offset) if id_offset else -1
+            units.append(UnitRange(address=address, size=self.unit_size, unit_id=unit_id))
+
+        units.sort(key=lambda unit: unit.address)
+        logger.info(f"{len(units)} faixas de unidades coletadas")
+        return units
+
+    @staticmethod
+    def pages_for_ranges(ranges: Iterable[UnitRange]) -> List[int]:
+        """Endereços das páginas (alinhadas) que cobrem as faixas"""
+        pages = set()
+        for unit in ranges:
+            first = unit.address & ~(PAGE_SIZE - 1)
+            for page in range(first, unit.end, PAGE_SIZE):
+                pages.add(page)
+        return sorted(pages)
+
+    @staticmethod
+    def _page_runs(pages: List[int]) -> List[Tuple[int, int]]:
+        """Agrupa páginas contíguas em (início, quantidade) para ler de uma vez"""
+        runs: List[Tuple[int, int]] = []
+        for page in pages:
+            if runs and runs[-1][0] + runs[-1][1] * PAGE_SIZE == page:
+                runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+            else:
+                runs.append((page, 1))
+        return runs
+
+    def take_snapshot(self, units: Optional[List[UnitRange]] = None) -> MemorySnapshot:
+        """Lê todas as páginas das unidades, uma leitura por sequência contígua"""
+        if units is None:
+            units = self.collect_unit_ranges()
+
+        snapshot = MemorySnapshot(timestamp=time.time(), units=units)
+        for start, count in self._page_runs(self.pages_for_ranges(units)):
+            data = self.memory.read_memory(start, count * PAGE_SIZE)
+            if len(data) == count * PAGE_SIZE:
+                pages = [data[i * PAGE_SIZE:(i + 1) * PAGE_SIZE] for i in range(count)]
+            else:
+                # Sequência cruza uma página inválida: cair para leitura página a página
+                pages = [self.memory.read_memory(start + i * PAGE_SIZE, PAGE_SIZE) for i in range(count)]
+            for i, page in enumerate(pages):
+                address = start + i * PAGE_SIZE
+                if len(page) != PAGE_SIZE:
+                    # Página ilegível não entra no snapshot (não vira "mudança" no diff)
+                    snapshot.unreadable.add(address)
+                    continue
+                snapshot.pages[address] = page
+                snapshot.page_hashes[address] = page_digest(page)
+
+        logger.info(f"Snapshot: {len(snapshot.pages)} páginas ({snapshot.size_bytes // 1024} KiB), "
+                    f"{len(snapshot.unreadable)} ilegíveis")
+        return snapshot
+
+    def diff(self, before: MemorySnapshot, after: MemorySnapshot) -> SnapshotDiff:
+        """Compara dois snapshots e agrupa as palavras alteradas pela unidade dona"""
+        started = time.perf_counter()
+        result = SnapshotDiff()
+
+        units = sorted(after.units or before.units, key=lambda unit: unit.address)
+        starts = [unit.address for unit in units]
+
+        result.pages_unreadable = len(before.unreadable | after.unreadable)
+        for page, new_hash in after.page_hashes.items():
+            old_hash = before.page_hashes.get(page)
+            if old_hash is None:
+                continue  # ilegível (ou fora) no snapshot anterior
+            result.pages_compared += 1
+            if old_hash == new_hash:
+                continue
+
+            result.pages_changed += 1
+            for offset, old_value, new_value in changed_words(before.pages[page], after.pages[page]):
+                address = page + offset
+                result.words_changed += 1
+
+                index = bisect_right(starts, address) - 1
+                if index < 0 or address >= units[index].end:
+                    result.unowned_changes += 1
+                    continue
+
+                unit = units[index]
+                unit_diff = result.units.get(unit.address)
+                if unit_diff is None:
+                    unit_diff = result.units[unit.address] = UnitDiff(address=unit.address, unit_id=unit.unit_id)
+                unit_diff.changes.append(FieldChange(address - unit.address, old_value, new_value))
+
+        result.elapsed_seconds = time.perf_counter() - started
+        logger.info(f"Diff: {result.pages_changed}/{result.pages_compared} páginas alteradas, "
+                    f"{result.words_changed} palavras, {len(result.units)} unidades")
+        return result
+
+    def export_diff(self, diff: SnapshotDiff, top: int = 50) -> str:
+        """Exporta o diff agrupado por unidade e o ranking de offsets alterados"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        exports_dir = Path(__file__).parent.parent / "exports"
+        exports_dir.mkdir(exist_ok=True)
+        filepath = exports_dir / f"memory_diff_{timestamp}.json"
+
+        frequency = sorted(diff.offset_frequency().items(), key=lambda item: item[1], reverse=True)
+        export_data: Dict[str, Any] = {
+            "analysis_type": "memory_diff",
+            "summary": {
+                "pages_compared": diff.pages_compared,
+                "pages_changed": diff.pages_changed,
+                "pages_unreadable": diff.pages_unreadable,
+                "words_changed": diff.words_changed,
+                "unowned_changes": diff.unowned_changes,
+                "units_changed": len(diff.units),
+                "elapsed_seconds": diff.elapsed_seconds
+            },
+            "most_changed_offsets": [
+                {"offset": f"0x{offset:x}", "units": count} for offset, count in frequency[:top]
+            ],
+            "units": {
+                f"0x{address:x}": {
+                    "unit_id": unit_diff.unit_id,
+                    "changes": [
+                        {"offset": f"0x{c.offset:x}", "old": c.old_value, "new": c.new_value}
+                        for c in unit_diff.changes
+                    ]
+                }
+                for address, unit_diff in diff.units.items()
+            }
+        }
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Diff exportado para: {filepath}")
+        return str(filepath)
+
+def main():
+    """Função principal"""
+    print("=== MEMORY DIFF - Diff de memória entre dois snapshots ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        interval = int(input("Intervalo entre snapshots em segundos (padrão: 5): ") or "5")
+    except ValueError:
+        interval = 5
+
+    try:
+        engine = MemoryDiffEngine(df)
+        units = engine.collect_unit_ranges()
+        before = engine.take_snapshot(units)
+        print(f"📸 Primeiro snapshot: {len(before.pages)} páginas. Aguardando {interval}s...")
+        time.sleep(interval)
+        after = engine.take_snapshot(units)
+
+        diff = engine.diff(before, after)
+        filepath = engine.export_diff(diff)
+
+        print(f"\n📊 {diff.pages_changed}/{diff.pages_compared} páginas alteradas, "
+              f"{diff.words_changed} palavras em {len(diff.units)} unidades "
+              f"({diff.elapsed_seconds * 1000:.1f} ms)")
+        print("\n🎯 OFFSETS MAIS ALTERADOS:")
+        for offset, count in sorted(diff.offset_frequency().items(), key=lambda item: item[1], reverse=True)[:10]:
+            print(f"   0x{offset:x}: {count} unidades")
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Needs Reader - Necessidades de todos os dwarves com [need_offsets]
+Lê o vetor de necessidades da personalidade de cada dwarf com três leituras
+em bloco (personalidades, vetores, registros) e monta uma matriz
+dwarves x tipos de necessidade com foco, nível e pontuação de necessidade
+não atendida. As pontuações por dwarf (linhas) e da fortaleza (colunas) saem
+de somas sobre a matriz plana, sem percorrer objetos por dwarf, como
+Dwarf::get_need_type_focus/get_need_type_level e UnitNeed no C++.
+"""
+
+import sys
+import json
+import time
+import struct
+import logging
+from array import array
+from datetime import datetime
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Any, NamedTuple
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData
+from game_data import read_array
+
+logger = logging.getLogger(__name__)
+
+MAX_NEEDS = 200
+NEED_FIELDS = ('id', 'deity_id', 'focus_level', 'need_level')
+
+# UnitNeed::DEGREE (foco de uma necessidade)
+NEED_DEGREES = ("badly distracted", "distracted", "unfocused", "not distracted",
+                "untroubled", "level-headed", "unfettered")
+# Dwarf::FOCUS_DEGREE (foco geral)
+FOCUS_DEGREES = ("badly distracted", "distracted", "unfocused", "untroubled",
+                 "somewhat focused", "quite focused", "very focused")
+
+DISTRACTED_FOCUS = -1000  # a partir daqui (para baixo) a necessidade distrai
+
+def need_degree(focus_level: int) -> int:
+    """UnitNeed::m_focus_degree para o focus_level"""
+    if focus_level <= -100000:
+        return 0
+    if focus_level <= -10000:
+        return 1
+    if focus_level <= -1000:
+        return 2
+    if focus_level < 100:
+        return 3
+    if focus_level < 200:
+        return 4
+    if focus_level < 300:
+        return 5
+    return 6
+
+def focus_degree(current_focus: int, undistracted_focus: int) -> int:
+    """Dwarf::m_current_focus_degree pela razão foco atual / foco sem distrações"""
+    ratio = (current_focus * 100) // undistracted_focus if undistracted_focus != 0 else 100
+    if ratio <= 60:
+        return 0
+    if ratio <= 80:
+        return 1
+    if ratio < 100:
+        return 2
+    if ratio == 100:
+        return 3
+    if ratio < 120:
+        return 4
+    if ratio < 140:
+        return 5
+    return 6
+
+def load_need_names() -> List[str]:
+    """Nomes de [needs] do game_data.ini, indexados pelo id da necessidade"""
+    try:
+        return [entry.get('name', "") for entry in read_array('needs')]
+    except FileNotFoundError as e:
+        logger.warning(f"Nomes de necessidades indisponíveis: {e}")
+        return []
+
+class UnitNeed(NamedTuple):
+    """Necessidade de um dwarf (uma por divindade nas de oração)"""
+    need_id: int
+    deity_id: int
+    focus_level: int
+    need_level: int
+
+    @property
+    def degree(self) -> str:
+        return NEED_DEGREES[need_degree(self.focus_level)]
+
+    @property
+    def unmet(self) -> int:
+        """Pontuação de não atendimento: distração ponderada pela intensidade"""
+        return self.need_level * -self.focus_level if self.focus_level < 0 else 0
+
+@dataclass
+class DwarfNeeds:
+    """Necessidades e foco de um dwarf"""
+    unit_id: int
+    name: str
+    current_focus: int = 0
+    undistracted_focus: int = 0
+    needs: List[UnitNeed] = field(default_factory=list)
+    unmet_score: int = 0
+
+    @property
+    def focus_degree(self) -> str:
+        return FOCUS_DEGREES[focus_degree(self.current_focus, self.undistracted_focus)]
+
+class NeedMatrix:
+    """
+    Matriz dwarves x tipos de necessidade em arrays planos (linha = dwarf):
+    foco mínimo e nível somado por tipo, e pontuação de não atendimento
+    """
+
+    def __init__(self, unit_ids: List[int], need_count: int):
+        self.unit_ids = unit_ids
+        self.rows = {unit_id: row for row, unit_id in enumerate(unit_ids)}
+        self.need_count = need_count
+        cells = len(unit_ids) * need_count
+        self.focus = array('q', bytes(8 * cells))
+        self.level = array('q', bytes(8 * cells))
+        self.unmet = array('q', bytes(8 * cells))
+
+    def add(self, row: int, need: UnitNeed):
+        cell = row * self.need_count + need.need_id
+        if self.level[cell] == 0 or need.focus_level < self.focus[cell]:
+            self.focus[cell] = need.focus_level
+        self.level[cell] += need.need_level
+        self.unmet[cell] += need.unmet
+
+    def row(self, values: array, row: int) -> array:
+        return values[row * self.need_count:(row + 1) * self.need_count]
+
+    def column(self, values: array, need_id: int) -> array:
+        return values[need_id::self.need_count]
+
+    def row_sums(self, values: array) -> List[int]:
+        n = self.need_count
+        return [sum(values[start:start + n]) for start in range(0, len(values), n)]
+
+    def column_sums(self, values: array) -> List[int]:
+        return [sum(values[need_id::self.need_count]) for need_id in range(self.need_count)]
+
+    def column_counts(self, values: array, threshold: int) -> List[int]:
+        """Quantos dwarves têm valor <= threshold em cada coluna (ex.: distraídos)"""
+        return [sum(1 for value in values[need_id::self.need_count] if value <= threshold)
+                for need_id in range(self.need_count)]
+
+class NeedsReader:
+    """Necessidades de todos os dwarves com pontuações por dwarf e da fortaleza"""
+
+    def __init__(self, df_instance: CompleteDFInstance, need_names: Optional[List[str]] = None):
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.pointer_size = df_instance.pointer_size
+        self.need_names = need_names if need_names is not None else load_need_names()
+        self.soul_offsets = df_instance.layout.offsets.get('soul', {})
+        self.need_offsets = df_instance.layout.offsets.get('need', {})
+        self._need_struct = self._compile_need_struct()
+
+        self.dwarves: Dict[int, DwarfNeeds] = {}
+        self.matrix = NeedMatrix([], max(len(self.need_names), 1))
+        self.fort_unmet: List[int] = [0] * self.matrix.need_count       # coluna -> pontuação somada
+        self.fort_distracted: List[int] = [0] * self.matrix.need_count  # coluna -> dwarves distraídos
+        self.refresh_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.dwarves)
+
+    def _compile_need_struct(self) -> struct.Struct:
+        """Struct com padding na ordem de NEED_FIELDS, todos int32"""
+        layout = '<'
+        position = 0
+        for name in NEED_FIELDS:
+            offset = self.need_offsets.get(name, position)
+            layout += f"{offset - position}xi" if offset > position else 'i'
+            position = offset + 4
+        return struct.Struct(layout)
+
+    def need_name(self, need_id: int) -> str:
+        return self.need_names[need_id] if 0 <= need_id < len(self.need_names) else f"Need {need_id}"
+
+    def refresh(self, dwarves: List[CompletelyDwarfData]) -> int:
+        """Lê as necessidades de todos os dwarves (com soul_address) de uma vez"""
+        started = time.perf_counter()
+        if 'personality' not in self.soul_offsets or 'needs' not in self.soul_offsets:
+            logger.error("[soul_details] personality/needs não encontrado no layout")
+            return 0
+
+        dwarves = [dwarf for dwarf in dwarves if dwarf.soul_address]
+        focus_offset = self.soul_offsets.get('current_focus')
+        undistracted_offset = self.soul_offsets.get('undistracted_focus')
+        block_size = max(self.soul_offsets['needs'] + 2 * self.pointer_size,
+                         (focus_offset or 0) + 4, (undistracted_offset or 0) + 4)
+        personality_offset = self.soul_offsets['personality']
+        blocks = self.memory.read_blocks([dwarf.soul_address + personality_offset for dwarf in dwarves],
+                                         block_size)
+
+        need_vectors = self.memory.read_embedded_vectors(blocks, self.soul_offsets['needs'],
+                                                         self.pointer_size, MAX_NEEDS)
+        addresses = [address for vector in need_vectors for address in vector if address]
+        need_size = self._need_struct.size
+        need_blocks = dict(zip(addresses, self.memory.read_blocks(addresses, need_size)))
+
+        states: List[DwarfNeeds] = []
+        for dwarf, block, vector in zip(dwarves, blocks, need_vectors):
+            if len(block) != block_size:
+                continue
+            needs = [UnitNeed(*self._need_struct.unpack_from(need_blocks[address]))
+                     for address in vector if len(need_blocks.get(address, b'')) == need_size]
+            states.append(DwarfNeeds(
+                unit_id=dwarf.id,
+                name=dwarf.name,
+                current_focus=struct.unpack_from('<i', block, focus_offset)[0] if focus_offset else 0,
+                undistracted_focus=struct.unpack_from('<i', block, undistracted_offset)[0]
+                if undistracted_offset else 0,
+                needs=[need for need in needs if need.need_id >= 0]
+            ))
+
+        self._build_matrix(states)
+        self.dwarves = {state.unit_id: state for state in states}
+        self.refresh_seconds = time.perf_counter() - started
+        logger.info(f"Necessidades de {len(states)} dwarves ({len(addresses)} registros) lidas em "
+                    f"{self.refresh_seconds:.3f}s")
+        return len(states)
+
+    def _build_matrix(self, states: List[DwarfNeeds]):
+        need_count = max([len(self.need_names)] + [need.need_id + 1 for state in states for need in state.needs])
+        matrix = NeedMatrix([state.unit_id for state in states], need_count)
+        for row, state in enumerate(states):
+            for need in state.needs:
+                matrix.add(row, need)
+
+        for state, score in zip(states, matrix.row_sums(matrix.unmet)):
+            state.unmet_score = score
+        self.fort_unmet = matrix.column_sums(matrix.unmet)
+        self.fort_distracted = matrix.column_counts(matrix.focus, DISTRACTED_FOCUS)
+        self.matrix = matrix
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def top_unmet_needs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Necessidades menos atendidas da fortaleza"""
+        ranking = sorted(range(self.matrix.need_count), key=lambda need_id: self.fort_unmet[need_id], reverse=True)
+        return [
+            {"need_id": need_id, "name": self.need_name(need_id), "unmet_score": self.fort_unmet[need_id],
+             "distracted_dwarves": self.fort_distracted[need_id]}
+            for need_id in ranking[:limit] if self.fort_unmet[need_id] > 0
+        ]
+
+    def top_unmet_for(self, unit_id: int, limit: int = 3) -> List[Tuple[str, int]]:
+        """(nome, pontuação) das necessidades menos atendidas de um dwarf"""
+        row = self.matrix.rows.get(unit_id)
+        if row is None:
+            return []
+        unmet = self.matrix.row(self.matrix.unmet, row)
+        ranking = sorted(range(len(unmet)), key=lambda need_id: unmet[need_id], reverse=True)
+        return [(self.need_name(need_id), unmet[need_id]) for need_id in ranking[:limit] if unmet[need_id] > 0]
+
+    def most_distracted(self, limit: int = 10) -> List[DwarfNeeds]:
+        """Dwarves com maior pontuação de necessidades não atendidas"""
+        return sorted(self.dwarves.values(), key=lambda state: state.unmet_score, reverse=True)[:limit]
+
+    def export_needs(self) -> str:
+        """Exporta necessidades por dwarf e o ranking da fortaleza"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        exports_dir = Path(__file__).parent.parent / "exports"
+        exports_dir.mkdir(exist_ok=True)
+        filepath = exports_dir / f"needs_{timestamp}.json"
+
+        export_data = {
+            "analysis_type": "needs",
+            "total_dwarves": len(self.dwarves),
+            "refresh_seconds": self.refresh_seconds,
+            "top_unmet_needs": self.top_unmet_needs(self.matrix.need_count),
+            "dwarves": [
+                {
+                    "unit_id": state.unit_id,
+                    "name": state.name,
+                    "focus_degree": state.focus_degree,
+                    "current_focus": state.current_focus,
+                    "undistracted_focus": state.undistracted_focus,
+                    "unmet_score": state.unmet_score,
+                    "top_unmet": self.top_unmet_for(state.unit_id),
+                    "needs": [dict(need._asdict(), name=self.need_name(need.need_id), degree=need.degree)
+                              for need in state.needs]
+                }
+                for state in self.most_distracted(len(self.dwarves))
+            ]
+        }
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Necessidades exportadas para: {filepath}")
+        return str(filepath)
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== NEEDS READER - Necessidades e foco da fortaleza ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        dwarves = df.read_complete_dwarves()
+        reader = NeedsReader(df)
+        reader.refresh(dwarves)
+
+        print(f"🙏 {len(reader)} dwarves lidos em {reader.refresh_seconds:.3f}s")
+        print("\n📉 Necessidades menos atendidas:")
+        for need in reader.top_unmet_needs(10):
+            print(f"   {need['name']}: {need['unmet_score']} ({need['distracted_dwarves']} distraídos)")
+
+        print("\n😵 Mais distraídos:")
+        for state in reader.most_distracted(5):
+            unmet = ", ".join(name for name, _ in reader.top_unmet_for(state.unit_id))
+            print(f"   {state.name}: {state.focus_degree} - {unmet}")
+
+        filepath = reader.export_needs()
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Offset Discovery - Busca estatística de offsets em todas as unidades ao mesmo tempo
+Lê os primeiros N KiB de cada estrutura de unidade em K amostras e monta uma
+matriz unidades x palavras por amostra. Variância, monotonicidade e correlação
+com campos conhecidos (id, birth_year, ...) ranqueiam os offsets candidatos
+para uma semântica alvo, no lugar do analyze_position_patterns do PositionTracker.
+"""
+
+import sys
+import json
+import math
+import time
+import logging
+import operator
+from array import array
+from datetime import datetime
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(),
+        logging.FileHandler('offset_discovery.log')
+    ]
+)
+logger = logging.getLogger(__name__)
+
+WORD_SIZE = 4
+
+# Semânticas suportadas por rank_offsets (além de "correlated:<campo>")
+TARGETS = {
+    'position': "muda ao longo do tempo com valores pequenos em trincas x, y, z",
+    'counter': "cresce monotonicamente entre amostras (ticks, contadores)",
+    'volatile': "muda com frequência em muitas unidades (stress, job, foco)",
+    'static_unique': "nunca muda, mas difere entre unidades (ids, referências)",
+}
+
+@dataclass
+class OffsetStats:
+    """Estatísticas de uma palavra de 32 bits em todas as unidades"""
+    offset: int
+    changed_fraction: float = 0.0    # unidades em que o valor mudou entre amostras
+    change_rate: float = 0.0         # pares de amostras consecutivas com mudança
+    increasing_ratio: float = 0.0    # mudanças positivas / mudanças totais
+    mean: float = 0.0
+    stddev: float = 0.0
+    distinct_fraction: float = 0.0   # valores distintos entre unidades (última amostra)
+    small_value_fraction: float = 0.0
+    correlations: Dict[str, float] = field(default_factory=dict)
+
+@dataclass
+class DiscoverySamples:
+    """Matriz unidades x palavras para cada amostra"""
+    unit_addresses: List[int]
+    words_per_unit: int
+    timestamps: List[float] = field(default_factory=list)
+    matrices: List[array] = field(default_factory=list)  # uma array('i') linearizada por amostra
+
+    @property
+    def unit_count(self) -> int:
+        return len(self.unit_addresses)
+
+    def column(self, sample: int, word: int) -> array:
+        """Valores de uma palavra em todas as unidades"""
+        return self.matrices[sample][word::self.words_per_unit]
+
+def _pearson(xs: array, ys: array) -> float:
+    """Correlação de Pearson entre duas colunas"""
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    sum_x = sum(xs)
+    sum_y = sum(ys)
+    cov = sum(map(operator.mul, xs, ys)) - sum_x * sum_y / n
+    var_x = sum(map(operator.mul, xs, xs)) - sum_x * sum_x / n
+    var_y = sum(map(operator.mul, ys, ys)) - sum_y * sum_y / n
+    if var_x <= 0 or var_y <= 0:
+        return 0.0
+    return cov / math.sqrt(var_x * var_y)
+
+class OffsetDiscovery:
+    """Coleta amostras de todas as unidades e ranqueia offsets por semântica"""
+
+    def __init__(self, df_instance: CompleteDFInstance, struct_kib: int = 4):
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.block_size = struct_kib * 1024
+        self.words_per_unit = self.block_size // WORD_SIZE
+
+        # offset -> nome do campo conhecido no layout
+        self.known_fields = {offset: name for name, offset in self.df.layout.offsets.get('dwarf', {}).items()}
+
+    def collect_samples(self, samples: int = 5, interval_seconds: float = 2.0,
+                        limit: Optional[int] = None) -> DiscoverySamples:
+        """Lê o bloco inicial de cada unidade em `samples` momentos diferentes"""
+        creature_vector_addr = self.df.layout.get_address('creature_vector')
+        pointers = self.memory.read_vector(creature_vector_addr + self.df.base_addr, self.df.pointer_size)
+        if limit is not None:
+            pointers = pointers[:limit]
+
+        result = DiscoverySamples(unit_addresses=pointers, words_per_unit=self.words_per_unit)
+        empty_block = bytes(self.block_size)
+
+        for sample in range(samples):
+            if sample:
+                time.sleep(interval_seconds)
+            blocks = self.memory.read_blocks(pointers, self.block_size)
+            matrix = array('i', b''.join(block if len(block) == self.block_size else empty_block
+                                         for block in blocks))
+            result.timestamps.append(time.time())
+            result.matrices.append(matrix)
+            logger.info(f"Amostra {sample + 1}/{samples}: {len(pointers)} unidades x {self.words_per_unit} palavras")
+
+        return result
+
+    def compute_stats(self, data: DiscoverySamples,
+                      reference_fields: Optional[List[str]] = None) -> List[OffsetStats]:
+        """Calcula as estatísticas de cada offset sobre a matriz completa"""
+        if reference_fields is None:
+            reference_fields = ['id', 'birth_year']
+
+        n = data.unit_count
+        if n == 0 or not data.matrices:
+            return []
+
+        last = len(data.matrices) - 1
+        references = {}
+        for name in reference_fields:
+            offset = self.df.layout.get_offset('dwarf', name)
+            if offset and offset + WORD_SIZE <= self.block_size:
+                references[name] = data.column(last, offset // WORD_SIZE)
+
+        stats = []
+        for word in range(data.words_per_unit):
+            columns = [data.column(sample, word) for sample in range(len(data.matrices))]
+            current = columns[-1]
+
+            changed = array('b', bytes(n))
+            change_pairs = increases = decreases = 0
+            for previous, following in zip(columns, columns[1:]):
+                differs = list(map(operator.ne, previous, following))
+                pair_changes = sum(differs)
+                if pair_changes:
+                    change_pairs += pair_changes
+                    changed = array('b', map(operator.or_, changed, differs))
+                    increases += sum(map(operator.gt, following, previous))
+                    decreases += sum(map(operator.lt, following, previous))
+
+            total = sum(current)
+            mean = total / n
+            variance = max(sum(map(operator.mul, current, current)) / n - mean * mean, 0.0)
+            small = sum(1 for value in current if -1000 <= value <= 1000)
+
+            entry = OffsetStats(
+                offset=word * WORD_SIZE,
+                changed_fraction=sum(changed) / n,
+                change_rate=change_pairs / (n * max(len(columns) - 1, 1)),
+                increasing_ratio=increases / (increases + decreases) if increases + decreases else 0.0,
+                mean=mean,
+                stddev=math.sqrt(variance),
+                distinct_fraction=len(set(current)) / n,
+                small_value_fraction=small / n
+            )
+            for name, reference in references.items():
+                entry.correlations[name] = _pearson(current, reference)
+            stats.append(entry)
+
+        return stats
+
+    @staticmethod
+    def score(entry: OffsetStats, target: str, neighbours: List[OffsetStats]) -> float:
+        """Pontuação de um offset para a semântica alvo (maior = mais provável)"""
+        if target.startswith('correlated:'):
+            return abs(entry.correlations.get(target.split(':', 1)[1], 0.0))
+        if target == 'position':
+            if not neighbours:
+                return 0.0
+            triplet_small = min(n.small_value_fraction for n in neighbours)
+            # Posições sobem e descem; contadores monotônicos são penalizados
+            direction_balance = 1.0 - abs(2 * entry.increasing_ratio - 1)
+            return entry.changed_fraction * entry.small_value_fraction * triplet_small * direction_balance
+        if target == 'counter':
+            return entry.changed_fraction * entry.increasing_ratio
+        if target == 'volatile':
+            return entry.change_rate
+        if target == 'static_unique':
+            return entry.distinct_fraction if entry.changed_fraction == 0 else 0.0
+        raise ValueError(f"Semântica desconhecida: {target}")
+
+    def rank_offsets(self, stats: List[OffsetStats], target: str, top: int = 20) -> List[Dict[str, Any]]:
+        """Ranqueia os offsets para a semântica alvo"""
+        by_offset = {entry.offset: entry for entry in stats}
+        ranked = []
+        for entry in stats:
+            neighbours = [by_offset[entry.offset + delta] for delta in (4, 8) if entry.offset + delta in by_offset]
+            if target == 'position' and len(neighbours) < 2:
+                continue
+            score = self.score(entry, target, neighbours)
+            if score > 0:
+                ranked.append((score, entry))
+
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        return [
+            {
+                "offset": f"0x{entry.offset:x}",
+                "score": round(score, 4),
+                "known_field": self.known_fields.get(entry.offset),
+                "changed_fraction": round(entry.changed_fraction, 4),
+                "increasing_ratio": round(entry.increasing_ratio, 4),
+                "distinct_fraction": round(entry.distinct_fraction, 4),
+                "mean": round(entry.mean, 2),
+                "stddev": round(entry.stddev, 2),
+                "correlations": {name: round(value, 4) for name, value in entry.correlations.items()}
+            }
+            for score, entry in ranked[:top]
+        ]
+
+    def export_results(self, data: DiscoverySamples, rankings: Dict[str, List[Dict[str, Any]]]) -> str:
+        """Exporta os rankings por semântica"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        exports_dir = Path(__file__).parent.parent / "exports"
+        exports_dir.mkdir(exist_ok=True)
+        filepath = exports_dir / f"offset_discovery_{timestamp}.json"
+
+        export_data = {
+            "analysis_type": "offset_discovery",
+            "units": data.unit_count,
+            "samples": len(data.matrices),
+            "struct_bytes": self.block_size,
+            "targets": TARGETS,
+            "rankings": rankings
+        }
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Resultados exportados para: {filepath}")
+        return str(filepath)
+
+def main():
+    """Função principal"""
+    print("=== OFFSET DISCOVERY - Busca estatística de offsets ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        samples = int(input("Número de amostras (padrão: 5): ") or "5")
+        interval = float(input("Intervalo entre amostras em segundos (padrão: 2): ") or "2")
+    except ValueError:
+        samples, interval = 5, 2.0
+
+    try:
+        discovery = OffsetDiscovery(df)
+        data = discovery.collect_samples(samples, interval)
+
+        started = time.perf_counter()
+        stats = discovery.compute_stats(data)
+        targets = list(TARGETS) + ['correlated:id', 'correlated:birth_year']
+        rankings = {target: discovery.rank_offsets(stats, target) for target in targets}
+        elapsed = time.perf_counter() - started
+
+        filepath = discovery.export_results(data, rankings)
+
+        print(f"\n📊 {data.unit_count} unidades x {discovery.words_per_unit} palavras x {len(data.matrices)} amostras "
+              f"analisadas em {elapsed:.2f}s")
+        for target, ranking in rankings.items():
+            best = ", ".join(item["offset"] for item in ranking[:5]) or "nenhum"
+            print(f"   {target}: {best}")
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -323,7 +323,7 @@ def main():
         
         # Ler dwarves
         print("\nLendo dwarves...")
-        dwarves = df.read_complete_dwarves()
+        dwarves = df.read_dwarves(fields={'name', 'race', 'caste', 'sex'})
         
         if not dwarves:
             print("ERRO: Nenhum dwarf encontrado")
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Race Cache - Tabela de raças e castas lida uma vez por sessão
+Percorre o races_vector com leituras em bloco ([race_offsets] e
+[caste_offsets]), decodifica nomes, flags e body_info de cada casta e grava a
+tabela em disco por mundo. Resolver a raça/casta de uma unidade passa a ser
+uma consulta em dicionário, inclusive para raças de mods.
+"""
+
+import sys
+import json
+import time
+import struct
+import hashlib
+import logging
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Any
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "cache" / "races"
+
+MAX_RACES = 20000
+MAX_CASTES = 1000
+MAX_FLAG_BYTES = 1000  # mesmo limite do FlagArray no C++
+DF_STRING_SIZE = 32
+
+# CASTE_FLAGS de global_enums.h (índices de bit do FlagArray da casta)
+CASTE_FLAG_NAMES = {
+    0: "AMPHIBIOUS", 13: "NO_EAT", 14: "NO_DRINK", 15: "NO_SLEEP", 16: "DOMESTIC",
+    19: "FLIER", 25: "WEB_IMMUNE", 26: "FISHABLE", 27: "IMMOBILE_LAND", 29: "MILKABLE",
+    37: "NO_FISH", 39: "NO_DIZZINESS", 40: "NO_FEVERS", 46: "NOT_BUTCHERABLE",
+    53: "TRAINABLE_HUNTING", 54: "PET", 55: "PET_EXOTIC", 63: "NO_EXERT", 64: "NO_PAIN",
+    65: "EXTRAVISION", 66: "NO_BREATHE", 67: "NO_STUN", 68: "NO_NAUSEA",
+    79: "PARALYZE_IMMUNE", 83: "GETS_WOUND_INFECTIONS", 88: "TRAINABLE_WAR",
+    97: "BABY", 98: "CHILD", 161: "CRAZED", 162: "BLOODSUCKER",
+}
+
+# CREATURE_FLAGS de global_enums.h (FlagArray da raça)
+CREATURE_FLAG_NAMES = {
+    1: "WAGON", 9: "VERMIN_FISH", 71: "CAN_LEARN", 72: "HATEABLE",
+    89: "CAN_SPEAK", 99: "NIGHT_CREATURE",
+}
+
+def _capitalize_each(text: str) -> str:
+    """Equivalente ao capitalizeEach do C++"""
+    return " ".join(word[:1].upper() + word[1:] for word in text.split(" "))
+
+def _set_bits(data: bytes) -> List[int]:
+    """Índices dos bits ligados (bit k do byte i -> i * 8 + k), como o FlagArray"""
+    bits = []
+    for index, byte in enumerate(data):
+        if byte:
+            bits.extend(index * 8 + bit for bit in range(8) if byte & (1 << bit))
+    return bits
+
+def read_flag_arrays(memory, blocks: List[bytes], offset: int, pointer_size: int = 8) -> List[List[int]]:
+    """
+    Lê em bloco os FlagArray (ponteiro + tamanho) embutidos em cada bloco e
+    devolve os bits ligados de cada um
+    """
+    pointer_format = '<Q' if pointer_size == 8 else '<I'
+    addresses, sizes = [], []
+    for block in blocks:
+        if not offset or len(block) < offset + pointer_size + 4:
+            addresses.append(0)
+            sizes.append(0)
+            continue
+        address = struct.unpack_from(pointer_format, block, offset)[0]
+        size = struct.unpack_from('<I', block, offset + pointer_size)[0]
+        valid = address and 0 < size <= MAX_FLAG_BYTES
+        addresses.append(address if valid else 0)
+        sizes.append(size if valid else 0)
+
+    wanted = [i for i, address in enumerate(addresses) if address]
+    data = memory.read_blocks([addresses[i] for i in wanted], max((sizes[i] for i in wanted), default=0))
+    flags: List[List[int]] = [[] for _ in blocks]
+    for i, raw in zip(wanted, data):
+        flags[i] = _set_bits(raw[:sizes[i]])
+    return flags
+
+@dataclass
+class CasteInfo:
+    """Casta de uma raça (sexo/variante)"""
+    index: int
+    token: str
+    name: str
+    description: str = ""
+    baby_age: int = 0
+    child_age: int = 0
+    adult_size: int = 0
+    body_part_count: int = 0
+    flags: List[int] = field(default_factory=list)
+
+    def has_flag(self, bit: int) -> bool:
+        return bit in self.flags
+
+    @property
+    def flag_names(self) -> List[str]:
+        return [CASTE_FLAG_NAMES[bit] for bit in self.flags if bit in CASTE_FLAG_NAMES]
+
+@dataclass
+class RaceInfo:
+    """Raça do races_vector com suas castas"""
+    id: int
+    token: str
+    name: str
+    name_plural: str = ""
+    adjective: str = ""
+    baby_name: str = ""
+    child_name: str = ""
+    flags: List[int] = field(default_factory=list)
+    castes: List[CasteInfo] = field(default_factory=list)
+
+    @property
+    def flag_names(self) -> List[str]:
+        return [CREATURE_FLAG_NAMES[bit] for bit in self.flags if bit in CREATURE_FLAG_NAMES]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RaceInfo':
+        castes = [CasteInfo(**caste) for caste in data.get('castes', [])]
+        return cls(**{**data, 'castes': castes})
+
+class RaceCache:
+    """Tabela race id -> RaceInfo, carregada da memória ou do disco"""
+
+    def __init__(self, df_instance: Optional[CompleteDFInstance] = None,
+                 cache_dir: Path = DEFAULT_CACHE_DIR):
+        self.df = df_instance
+        self.cache_dir = Path(cache_dir)
+        self.races: Dict[int, RaceInfo] = {}
+        self.world_key = ""
+        self.from_disk = False
+        self.load_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.races)
+
+    def __contains__(self, race_id: int) -> bool:
+        return race_id in self.races
+
+    def get(self, race_id: int) -> Optional[RaceInfo]:
+        return self.races.get(race_id)
+
+    def race_name(self, race_id: int) -> str:
+        race = self.races.get(race_id)
+        return race.name if race else f"Unknown Race ({race_id})"
+
+    def caste(self, race_id: int, caste_id: int) -> Optional[CasteInfo]:
+        race = self.races.get(race_id)
+        if race and 0 <= caste_id < len(race.castes):
+            return race.castes[caste_id]
+        return None
+
+    def caste_name(self, race_id: int, caste_id: int) -> str:
+        caste = self.caste(race_id, caste_id)
+        return caste.name if caste else f"Unknown Caste ({caste_id})"
+
+    def race_names(self) -> Dict[int, str]:
+        return {race_id: race.name for race_id, race in self.races.items()}
+
+    def describe(self, race_id: int, caste_id: int) -> Dict[str, Any]:
+        """Resumo de raça/casta para os campos decodificados dos exports"""
+        race = self.races.get(race_id)
+        caste = self.caste(race_id, caste_id)
+        return {
+            "race_id": race_id,
+            "race_token": race.token if race else "",
+            "race_name": self.race_name(race_id),
+            "caste_id": caste_id,
+            "caste_token": caste.token if caste else "",
+            "caste_name": self.caste_name(race_id, caste_id),
+            "caste_flags": caste.flag_names if caste else []
+        }
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def path_for(self, world_key: str) -> Path:
+        return self.cache_dir / f"{world_key}.json"
+
+    def save(self) -> Path:
+        """Grava a tabela atual em <cache_dir>/<world_key>.json"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(self.world_key)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"world_key": self.world_key,
+                       "races": [asdict(race) for race in self.races.values()]},
+                      f, indent=2, ensure_ascii=False)
+        tmp_path.replace(path)
+        return path
+
+    def load_from_disk(self, world_key: str) -> bool:
+        """Carrega a tabela gravada para o mundo (False se não existir)"""
+        path = self.path_for(world_key)
+        if not path.exists():
+            return False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache de raças inválido em {path}: {e}")
+            return False
+
+        self.races = {race['id']: RaceInfo.from_dict(race) for race in data.get('races', [])}
+        self.world_key = world_key
+        self.from_disk = True
+        return True
+
+    # ------------------------------------------------------------------
+    # Leitura da memória
+    # ------------------------------------------------------------------
+
+    def load(self, refresh: bool = False) -> int:
+        """
+        Lê o races_vector do processo. Os blocos das raças (tokens e nomes) bastam
+        para calcular a chave do mundo; com cache em disco as castas não são lidas.
+        """
+        started = time.perf_counter()
+        df = self.df
+        memory = df.memory_reader
+        race_offsets = df.layout.offsets.get('race', {})
+
+        vector_addr = df.layout.get_address('races_vector')
+        if not vector_addr or not race_offsets:
+            logger.error("races_vector ou [race_offsets] não encontrado no layout")
+            return 0
+
+        # Slots crus do vetor: o índice do slot é o id da raça, mesmo com ponteiros nulos
+        slots = self._read_slots(vector_addr + df.base_addr)
+        race_ids = [race_id for race_id, pointer in enumerate(slots) if pointer]
+        race_block_size = max(race_offsets.values()) + DF_STRING_SIZE
+        blocks = memory.read_blocks([slots[race_id] for race_id in race_ids], race_block_size)
+
+        tokens = [memory.decode_df_string(block, 0, df.pointer_size) for block in blocks]
+        decoded = {race_id: self._decode_race(race_id, token, block, race_offsets)
+                   for race_id, token, block in zip(race_ids, tokens, blocks) if len(block) == race_block_size}
+        # Criaturas geradas (FORGOTTEN_BEAST_n, TITAN_n...) repetem o token em todo
+        # mundo: os nomes decodificados entram na chave para separar os saves
+        identity = "\n".join(f"{race_id}:{race.token}:{race.name}:{race.name_plural}:{race.adjective}"
+                              for race_id, race in decoded.items())
+        digest = hashlib.blake2b(identity.encode('utf-8'), digest_size=8).hexdigest()
+        self.world_key = f"{len(slots)}_{digest}"
+
+        if not refresh and self.load_from_disk(self.world_key):
+            self.load_seconds = time.perf_counter() - started
+            logger.info(f"{len(self.races)} raças carregadas do cache {self.path_for(self.world_key)}")
+            return len(self.races)
+
+        races: Dict[int, RaceInfo] = decoded
+        caste_vectors: Dict[int, List[int]] = {}
+        for race_id, block in zip(race_ids, blocks):
+            if race_id in races:
+                caste_vectors[race_id] = self._vector_bounds(block, race_offsets.get('castes_vector', 0))
+
+        # Ponteiros das castas: uma leitura em bloco para todos os castes_vector
+        with_castes = [race_id for race_id, (start, end) in caste_vectors.items()
+                       if start and end - start <= MAX_CASTES * df.pointer_size]
+        vector_sizes = [caste_vectors[race_id][1] - caste_vectors[race_id][0] for race_id in with_castes]
+        caste_storage = memory.read_blocks([caste_vectors[race_id][0] for race_id in with_castes],
+                                           max(vector_sizes, default=0))
+        caste_addresses: List[int] = []
+        caste_owners: List[int] = []
+        pointer_format = 'Q' if df.pointer_size == 8 else 'I'
+        for race_id, data, size in zip(with_castes, caste_storage, vector_sizes):
+            count = size // df.pointer_size
+            if count <= 0 or len(data) < size:
+                continue
+            # Ponteiros nulos ficam: _read_castes põe uma casta vazia no lugar
+            for address in struct.unpack_from(f'<{count}{pointer_format}', data):
+                caste_addresses.append(address)
+                caste_owners.append(race_id)
+
+        self._read_castes(races, caste_addresses, caste_owners)
+        self._read_race_flags(races, race_ids, blocks, race_offsets.get('flags', 0))
+
+        self.races = races
+        self.from_disk = False
+        self.load_seconds = time.perf_counter() - started
+        path = self.save()
+        logger.info(f"{len(races)} raças e {len(caste_addresses)} castas lidas em "
+                    f"{self.load_seconds:.2f}s (cache: {path})")
+        return len(races)
+
+    def _read_slots(self, vector_addr: int) -> List[int]:
+        """Ponteiros do races_vector, nulos incluídos (read_vector os descartaria)"""
+        memory = self.df.memory_reader
+        pointer_size = self.df.pointer_size
+        start = memory.read_pointer(vector_addr, pointer_size)
+        end = memory.read_pointer(vector_addr + pointer_size, pointer_size)
+        if not start or end <= start:
+            return []
+        count = (end - start) // pointer_size
+        if count > MAX_RACES:  # Sanity check
+            logger.error(f"races_vector com {count} entradas (máximo {MAX_RACES})")
+            return []
+        return memory.read_pointer_array(start, count, pointer_size)
+
+    def _vector_bounds(self, block: bytes, offset: int) -> tuple:
+        """(início, fim) de um std::vector embutido no bloco"""
+        pointer_format = '<Q' if self.df.pointer_size == 8 else '<I'
+        if not offset or len(block) < offset + 2 * self.df.pointer_size:
+            return 0, 0
+        start = struct.unpack_from(pointer_format, block, offset)[0]
+        end = struct.unpack_from(pointer_format, block, offset + self.df.pointer_size)[0]
+        return (start, end) if start and end > start else (0, 0)
+
+    def _decode_race(self, race_id: int, token: str, block: bytes, offsets: Dict[str, int]) -> RaceInfo:
+        """Nomes da raça, com os mesmos fallbacks de Race::read_race"""
+        def string(name: str) -> str:
+            offset = offsets.get(name)
+            if offset is None:
+                return ""
+            return self.df.memory_reader.decode_df_string(block, offset, self.df.pointer_size)
+
+        name = string('name_singular').capitalize()
+        name_plural = string('name_plural').capitalize()
+        baby_name = string('baby_name_singular') or string('child_name_singular') or f"{name} Baby"
+        child_name = string('child_name_singular') or string('baby_name_singular') or f"{name} Offspring"
+
+        return RaceInfo(
+            id=race_id,
+            token=token,
+            name=name,
+            name_plural=name_plural,
+            adjective=string('adjective').capitalize(),
+            baby_name=_capitalize_each(baby_name),
+            child_name=_capitalize_each(child_name)
+        )
+
+    def _read_race_flags(self, races: Dict[int, RaceInfo], race_ids: List[int], blocks: List[bytes], offset: int):
+        flag_arrays = read_flag_arrays(self.df.memory_reader, blocks, offset, self.df.pointer_size)
+        for race_id, bits in zip(race_ids, flag_arrays):
+            if race_id in races:
+                races[race_id].flags = bits
+
+    def _read_castes(self, races: Dict[int, RaceInfo], addresses: List[int], owners: List[int]):
+        """Decodifica todas as castas com uma leitura em bloco"""
+        df = self.df
+        memory = df.memory_reader
+        offsets = df.layout.offsets.get('caste', {})
+        if not addresses or not offsets:
+            return
+
+        fields = ('caste_name', 'caste_descr', 'baby_age', 'child_age', 'adult_size', 'flags', 'body_info')
+        block_size = max(offsets.get(name, 0) for name in fields) + DF_STRING_SIZE
+        readable = [i for i, address in enumerate(addresses) if address]
+        blocks = [b''] * len(addresses)
+        for i, block in zip(readable, memory.read_blocks([addresses[i] for i in readable], block_size)):
+            blocks[i] = block
+        flags = read_flag_arrays(memory, blocks, offsets.get('flags', 0), df.pointer_size)
+
+        def read_int(block: bytes, name: str) -> int:
+            offset = offsets.get(name)
+            return struct.unpack_from('<i', block, offset)[0] if offset is not None else 0
+
+        for block, race_id, caste_flags in zip(blocks, owners, flags):
+            race = races[race_id]
+            if len(block) != block_size:
+                # Mantém os índices das castas alinhados com unit.caste
+                race.castes.append(CasteInfo(index=len(race.castes), token="", name=""))
+                continue
+
+            body_start, body_end = self._vector_bounds(block, offsets.get('body_info', 0))
+            race.castes.append(CasteInfo(
+                index=len(race.castes),
+                token=memory.decode_df_string(block, 0, df.pointer_size),
+                name=_capitalize_each(memory.decode_df_string(block, offsets.get('caste_name', 0), df.pointer_size)),
+                description=memory.decode_df_string(block, offsets.get('caste_descr', 0), df.pointer_size),
+                baby_age=read_int(block, 'baby_age') if 97 in caste_flags else 0,
+                child_age=read_int(block, 'child_age') if 98 in caste_flags else 0,
+                adult_size=read_int(block, 'adult_size'),
+                body_part_count=(body_end - body_start) // df.pointer_size,
+                flags=caste_flags
+            ))
+
+def load_race_cache(df_instance: CompleteDFInstance, refresh: bool = False) -> RaceCache:
+    """Carrega (uma vez por conexão) a tabela de raças da instância"""
+    cache = getattr(df_instance, 'race_cache', None)
+    if cache is None or refresh:
+        cache = RaceCache(df_instance)
+        cache.load(refresh=refresh)
+        df_instance.race_cache = cache
+    return cache
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== RACE CACHE - Tabela de raças e castas ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        cache = load_race_cache(df, refresh='--refresh' in sys.argv)
+        origin = "disco" if cache.from_disk else "memória"
+        print(f"🧬 Raças: {len(cache)} ({origin}, {cache.load_seconds:.2f}s)")
+        print(f"🌍 Mundo: {cache.world_key}")
+        for race in list(cache.races.values())[:10]:
+            castes = ", ".join(caste.name or caste.token for caste in race.castes)
+            print(f"   #{race.id} {race.name} [{race.token}]: {castes}")
+        print(f"\n📁 CACHE: {cache.path_for(cache.world_key)}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
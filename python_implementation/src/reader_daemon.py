@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Reader Daemon - Serviço leitor de longa duração para várias ferramentas
+Um único processo abre o Dwarf Fortress e carrega o layout; as ferramentas
+(debug_memory.py, test_inorganics.py, location_finder.py...) conectam como
+clientes finos por um socket local (Unix domain socket; TCP em 127.0.0.1
+onde AF_UNIX não existe, como no Python para Windows) em vez de repetir o
+attach e a leitura do layout. O protocolo é binário e compacto: cada quadro é
+(operação/estado u8, tamanho u32) + payload. READ_MANY lê vários blocos de uma
+vez (blocos próximos viram uma só leitura) e guarda o resultado num cache
+compartilhado entre todos os clientes, descartado quando o cur_year_tick anda.
+QUERY roda consultas do dwarf_query sobre o roster mantido pelo
+RefreshScheduler do próprio daemon.
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import socket
+import struct
+import logging
+import tempfile
+import threading
+import socketserver
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any, Union, Iterable
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, MemoryReader, MemoryLayout, DFStatus
+
+logger = logging.getLogger(__name__)
+
+HAS_UNIX_SOCKETS = hasattr(socket, 'AF_UNIX')
+DEFAULT_PORT = 8766
+DEFAULT_ADDRESS: Union[str, Tuple[str, int]] = (
+    str(Path(tempfile.gettempdir()) / "dwarf_therapist_reader.sock") if HAS_UNIX_SOCKETS
+    else ('127.0.0.1', DEFAULT_PORT))
+
+# Quadro: operação (pedido) ou estado (resposta) u8 + tamanho do payload u32
+FRAME = struct.Struct('<BI')
+READ_ENTRY = struct.Struct('<QI')   # endereço u64, tamanho u32
+MAX_FRAME = 64 * 1024 * 1024
+
+OP_READ_MANY = 1
+OP_LAYOUT = 2
+OP_QUERY = 3
+OP_STATUS = 4
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+POLL_INTERVAL = 1.0     # segundos entre polls do RefreshScheduler
+CACHE_CHECK = 0.05      # segundos entre leituras do cur_year_tick para validar o cache
+CACHE_MAX_AGE = 2.0     # jogo pausado: o cache ainda expira (labors mudados na interface)
+CACHE_BYTES = 64 * 1024 * 1024
+MAX_GAP = 0x1000        # blocos a até 4 KB de distância são lidos juntos
+MAX_SPAN = 0x100000
+
+# Métodos encadeáveis do DwarfQuery aceitos em QUERY (filter recebe função: fica de fora)
+QUERY_METHODS = frozenset({'where', 'exclude', 'has_labor', 'has_any_labor', 'lacks_labor', 'skill_at_least',
+                           'skill_between', 'in_squad', 'not_in_squad', 'between', 'order_by', 'select', 'limit'})
+QUERY_RESULTS = frozenset({'all', 'ids', 'count'})
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Conexão encerrada no meio de um quadro")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def recv_frame(sock: socket.socket) -> Optional[Tuple[int, bytes]]:
+    """(código, payload) ou None se o outro lado fechou entre quadros"""
+    header = sock.recv(FRAME.size)
+    if not header:
+        return None
+    if len(header) < FRAME.size:
+        header += _recv_exact(sock, FRAME.size - len(header))
+    code, size = FRAME.unpack(header)
+    if size > MAX_FRAME:
+        raise ConnectionError(f"Quadro grande demais: {size} bytes")
+    return code, _recv_exact(sock, size) if size else b''
+
+def send_frame(sock: socket.socket, code: int, payload: bytes = b''):
+    sock.sendall(FRAME.pack(code, len(payload)) + payload)
+
+def pack_reads(requests: List[Tuple[int, int]]) -> bytes:
+    return struct.pack('<I', len(requests)) + b''.join(READ_ENTRY.pack(address, size) for address, size in requests)
+
+def unpack_reads(payload: bytes) -> List[Tuple[int, int]]:
+    count = struct.unpack_from('<I', payload)[0]
+    requests = [READ_ENTRY.unpack_from(payload, 4 + i * READ_ENTRY.size) for i in range(count)]
+    for address, size in requests:
+        if size > MAX_SPAN:
+            # Um tamanho u32 arbitrário viraria um buffer de até 4 GB no daemon
+            raise ValueError(f"Leitura de {size} bytes em 0x{address:x} excede o máximo de {MAX_SPAN}")
+    return requests
+
+def pack_blocks(blocks: List[bytes]) -> bytes:
+    """Tamanhos (u32 cada; 0 = falha) seguidos dos blocos concatenados"""
+    return struct.pack(f'<{len(blocks)}I', *(len(block) for block in blocks)) + b''.join(blocks)
+
+def unpack_blocks(payload: bytes, count: int) -> List[bytes]:
+    sizes = struct.unpack_from(f'<{count}I', payload)
+    blocks, offset = [], 4 * count
+    for size in sizes:
+        blocks.append(payload[offset:offset + size])
+        offset += size
+    return blocks
+
+def run_query(index: Any, spec: Dict[str, Any]) -> Any:
+    """
+    Executa {"calls": [["where", "profession", 0], ["limit", 5]], "result": "all"}
+    no DwarfIndex; sem select, "all" devolve os dwarves em to_dict(human_readable)
+    """
+    query = index.query()
+    for call in spec.get('calls', []):
+        if not isinstance(call, list) or not call:
+            raise ValueError(f"Chamada de consulta inválida: {call!r}")
+        method, args = call[0], call[1:]
+        if method not in QUERY_METHODS:
+            raise ValueError(f"Método de consulta não permitido: {method}")
+        getattr(query, method)(*args)
+    result = spec.get('result', 'all')
+    if result not in QUERY_RESULTS:
+        raise ValueError(f"Resultado desconhecido: {result}")
+    rows = getattr(query, result)()
+    if result == 'all':
+        rows = [row if isinstance(row, dict) else row.to_dict(human_readable=True) for row in rows]
+    return rows
+
+class ReadCache:
+    """Blocos lidos por (endereço, tamanho), válidos enquanto o tick não muda"""
+
+    def __init__(self, max_bytes: int = CACHE_BYTES, max_age: float = CACHE_MAX_AGE):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.blocks: Dict[Tuple[int, int], bytes] = {}
+        self.size = 0
+        self.tick = None
+        self.created = time.monotonic()
+        self.checked = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def validate(self, read_tick) -> None:
+        """Descarta o cache se o tick andou (checado no máximo a cada CACHE_CHECK)"""
+        now = time.monotonic()
+        if now - self.checked < CACHE_CHECK:
+            return
+        self.checked = now
+        tick = read_tick()
+        if tick != self.tick or now - self.created > self.max_age:
+            if self.blocks:
+                self.invalidations += 1
+            self.clear()
+            self.tick = tick
+
+    def clear(self):
+        self.blocks = {}
+        self.size = 0
+        self.created = time.monotonic()
+
+    def store(self, key: Tuple[int, int], block: bytes):
+        if self.size + len(block) > self.max_bytes:
+            self.clear()
+        self.blocks[key] = block
+        self.size += len(block)
+
+class ReaderDaemon:
+    """Dono do attach, do layout, do cache de leituras e do roster indexado"""
+
+    def __init__(self, df_instance: CompleteDFInstance, cache_bytes: int = CACHE_BYTES):
+        from refresh_scheduler import RefreshScheduler
+        from dwarf_query import DwarfIndex
+
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.cache = ReadCache(cache_bytes)
+        self.scheduler = RefreshScheduler(df_instance)
+        self.index = DwarfIndex()
+        self.scheduler.add_refresh_listener(lambda dwarves, units: self.index.refresh(dwarves))
+        self._lock = threading.RLock()   # uma leitura por vez no processo do jogo
+        self.clients = 0
+        self.requests = 0
+        self.started = time.monotonic()
+
+    def poll(self):
+        with self._lock:
+            self.scheduler.poll()
+
+    def _read_tick(self) -> int:
+        tick_addr = self.df.layout.get_address('cur_year_tick')
+        return self.memory.read_int32(tick_addr + self.df.base_addr) if tick_addr else -1
+
+    # ------------------------------------------------------------------
+    # Operações
+    # ------------------------------------------------------------------
+
+    def read_many(self, requests: List[Tuple[int, int]]) -> List[bytes]:
+        """Blocos pedidos; faltas no cache próximas entre si viram uma só leitura"""
+        with self._lock:
+            cache = self.cache
+            cache.validate(self._read_tick)
+            blocks: List[Optional[bytes]] = [cache.blocks.get(request) for request in requests]
+            missing = sorted({request for request, block in zip(requests, blocks) if block is None})
+            cache.hits += len(requests) - sum(block is None for block in blocks)
+            cache.misses += len(missing)
+
+            fetched: Dict[Tuple[int, int], bytes] = {}
+            span: List[Tuple[int, int]] = []
+            for request in missing + [None]:
+                if request is not None and span:
+                    span_end = max(address + size for address, size in span)
+                    if request[0] - span_end <= MAX_GAP and request[0] + request[1] - span[0][0] <= MAX_SPAN:
+                        span.append(request)
+                        continue
+                if span:
+                    start = span[0][0]
+                    data = self.memory.read_memory(start, max(address + size for address, size in span) - start)
+                    for address, size in span:
+                        # Span atravessa página ilegível: uma leitura por bloco
+                        block = data[address - start:address - start + size] if data else \
+                            self.memory.read_memory(address, size)
+                        fetched[(address, size)] = block
+                        if block:
+                            cache.store((address, size), block)
+                span = [request] if request is not None else []
+
+            return [block if block is not None else fetched[request] for request, block in zip(requests, blocks)]
+
+    def layout_info(self) -> Dict[str, Any]:
+        return {"pid": self.df.pid, "base_addr": self.df.base_addr, "pointer_size": self.df.pointer_size,
+                "layout": self.df.layout.to_dict()}
+
+    def query(self, spec: Dict[str, Any]) -> Any:
+        with self._lock:
+            if self.scheduler.current_tick < 0:
+                self.scheduler.poll()
+            return run_query(self.index, spec)
+
+    def status(self) -> Dict[str, Any]:
+        cache = self.cache
+        return {"pid": self.df.pid, "clients": self.clients, "requests": self.requests,
+                "dwarves": len(self.index), "tick": self.scheduler.current_tick,
+                "read_calls": self.memory.read_calls, "cache_blocks": len(cache.blocks),
+                "cache_bytes": cache.size, "cache_hits": cache.hits, "cache_misses": cache.misses,
+                "cache_invalidations": cache.invalidations,
+                "uptime_seconds": round(time.monotonic() - self.started, 1)}
+
+    def handle(self, op: int, payload: bytes) -> bytes:
+        self.requests += 1
+        if op == OP_READ_MANY:
+            return pack_blocks(self.read_many(unpack_reads(payload)))
+        if op == OP_LAYOUT:
+            return json.dumps(self.layout_info()).encode('utf-8')
+        if op == OP_QUERY:
+            return json.dumps(self.query(json.loads(payload)), default=str).encode('utf-8')
+        if op == OP_STATUS:
+            return json.dumps(self.status()).encode('utf-8')
+        raise ValueError(f"Operação desconhecida: {op}")
+
+class _ClientHandler(socketserver.BaseRequestHandler):
+    """Uma conexão: quadros pedido/resposta até o cliente fechar"""
+
+    def handle(self):
+        daemon: ReaderDaemon = self.server.daemon
+        daemon.clients += 1
+        try:
+            while True:
+                frame = recv_frame(self.request)
+                if frame is None:
+                    return
+                op, payload = frame
+                try:
+                    body = daemon.handle(op, payload)
+                except Exception as e:
+                    # Pedido inválido não derruba a conexão: o cliente recebe o erro
+                    logger.warning(f"Erro no pedido (operação {op}): {type(e).__name__}: {e}")
+                    send_frame(self.request, STATUS_ERROR, f"{type(e).__name__}: {e}".encode('utf-8'))
+                    continue
+                send_frame(self.request, STATUS_OK, body)
+        except (ConnectionError, OSError) as e:
+            logger.debug(f"Cliente desconectado: {e}")
+        finally:
+            daemon.clients -= 1
+
+if HAS_UNIX_SOCKETS:
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def make_server(daemon: ReaderDaemon, address: Union[str, Tuple[str, int]] = DEFAULT_ADDRESS):
+    """Servidor do daemon: caminho = Unix domain socket, (host, porta) = TCP local"""
+    if isinstance(address, str):
+        if os.path.lexists(address):
+            # Só remove socket de uma execução anterior; um --socket errado não apaga arquivo
+            if not stat.S_ISSOCK(os.lstat(address).st_mode):
+                raise FileExistsError(f"{address} existe e não é um socket")
+            os.unlink(address)
+        server = _UnixServer(address, _ClientHandler)
+        # READ_MANY lê qualquer endereço do jogo: só o dono do processo conecta
+        os.chmod(address, 0o600)
+    else:
+        server = _TCPServer(address, _ClientHandler)
+    server.daemon = daemon
+    return server
+
+class ReaderClient:
+    """Cliente fino do daemon (uma conexão; chamadas serializadas)"""
+
+    def __init__(self, address: Union[str, Tuple[str, int]] = DEFAULT_ADDRESS, timeout: float = 30.0):
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(address)
+        except OSError:
+            self.sock.close()
+            raise
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def __enter__(self) -> 'ReaderClient':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _call(self, op: int, payload: bytes = b'') -> bytes:
+        with self._lock:
+            self.calls += 1
+            send_frame(self.sock, op, payload)
+            frame = recv_frame(self.sock)
+        if frame is None:
+            raise ConnectionError("Daemon encerrou a conexão")
+        status, body = frame
+        if status != STATUS_OK:
+            raise RuntimeError(f"Erro no daemon: {body.decode('utf-8', errors='replace')}")
+        return body
+
+    def read_many(self, requests: List[Tuple[int, int]]) -> List[bytes]:
+        """Um bloco por (endereço, tamanho); b'' se ilegível"""
+        if not requests:
+            return []
+        return unpack_blocks(self._call(OP_READ_MANY, pack_reads(requests)), len(requests))
+
+    def layout_info(self) -> Dict[str, Any]:
+        return json.loads(self._call(OP_LAYOUT))
+
+    def memory_layout(self) -> MemoryLayout:
+        return MemoryLayout.from_dict(self.layout_info()['layout'])
+
+    def query(self, *calls: Iterable[Any], result: str = 'all') -> Any:
+        """query(['where', 'profession', 0], ['select', 'id', 'name'], result='all')"""
+        spec = {"calls": [list(call) for call in calls], "result": result}
+        return json.loads(self._call(OP_QUERY, json.dumps(spec).encode('utf-8')))
+
+    def status(self) -> Dict[str, Any]:
+        return json.loads(self._call(OP_STATUS))
+
+    def close(self):
+        self.sock.close()
+
+def connect_client(address: Union[str, Tuple[str, int]] = DEFAULT_ADDRESS) -> Optional[ReaderClient]:
+    """Cliente conectado, ou None se nenhum daemon estiver rodando"""
+    try:
+        return ReaderClient(address, timeout=30.0)
+    except OSError:
+        return None
+
+class RemoteMemoryReader(MemoryReader):
+    """MemoryReader que lê pelo daemon (read_int32, read_vector... vêm da classe base)"""
+
+    def __init__(self, client: ReaderClient):
+        self.client = client
+        self.process_handle = client  # "aberto" enquanto houver conexão
+        self.read_calls = 0
+
+    def open_process(self, pid: int) -> bool:
+        return True
+
+    def close_process(self):
+        if self.process_handle:
+            self.client.close()
+            self.process_handle = None
+
+    def read_memory(self, address: int, size: int) -> bytes:
+        if not self.process_handle:
+            return b''
+        self.read_calls += 1
+        return self.client.read_many([(address, size)])[0]
+
+    def read_blocks(self, addresses: List[int], size: int, max_gap: int = MAX_GAP) -> List[bytes]:
+        """Todos os blocos numa ida ao daemon (ele junta os próximos)"""
+        if not self.process_handle or not addresses:
+            return [b''] * len(addresses)
+        self.read_calls += 1
+        return self.client.read_many([(address, size) for address in addresses])
+
+def connect_memory_reader(address: Union[str, Tuple[str, int]] = DEFAULT_ADDRESS) -> Optional[RemoteMemoryReader]:
+    """RemoteMemoryReader se o daemon estiver rodando, senão None (a ferramenta abre o processo)"""
+    client = connect_client(address)
+    return RemoteMemoryReader(client) if client else None
+
+class DaemonDFInstance(CompleteDFInstance):
+    """CompleteDFInstance cujas leituras e layout vêm do daemon"""
+
+    def __init__(self, client: ReaderClient, prescan_item_types: bool = False):
+        super().__init__(prescan_item_types, memory_reader=RemoteMemoryReader(client))
+        self.client = client
+
+    @classmethod
+    def attach(cls, address: Union[str, Tuple[str, int]] = DEFAULT_ADDRESS) -> Optional['DaemonDFInstance']:
+        """Instância conectada ao daemon, ou None se ele não estiver rodando"""
+        client = connect_client(address)
+        if client is None:
+            return None
+        logger.info("Usando o reader daemon (sem attach próprio ao processo)")
+        return cls(client)
+
+    def connect(self) -> bool:
+        info = self.client.layout_info()
+        self.pid = info['pid']
+        self.base_addr = info['base_addr']
+        self.pointer_size = info['pointer_size']
+        self._remote_layout = info['layout']
+        self.status = DFStatus.CONNECTED
+        return True
+
+    def load_memory_layout(self, layout_file: Path = None) -> bool:
+        """Layout do daemon (layout_file é ignorado: vale o que o daemon carregou)"""
+        if self.status < DFStatus.CONNECTED and not self.connect():
+            return False
+        self.layout = MemoryLayout.from_dict(self._remote_layout)
+        self.status = DFStatus.LAYOUT_OK
+        self.item_type_cache.clear()
+        self._read_plans.clear()
+        if self.prescan_item_types:
+            self.prescan_item_vtables()
+        return True
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== READER DAEMON - Leituras compartilhadas por socket local ===")
+    print()
+
+    address = DEFAULT_ADDRESS
+    if '--socket' in sys.argv:
+        address = sys.argv[sys.argv.index('--socket') + 1]
+    elif '--port' in sys.argv:
+        address = ('127.0.0.1', int(sys.argv[sys.argv.index('--port') + 1]))
+
+    if '--status' in sys.argv:
+        client = connect_client(address)
+        if client is None:
+            print(f"❌ Nenhum daemon em {address}")
+            return
+        with client:
+            for key, value in client.status().items():
+                print(f"   {key}: {value}")
+        return
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    server = None
+    try:
+        daemon = ReaderDaemon(df)
+        daemon.poll()
+        server = make_server(daemon, address)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"🔌 Daemon em {address}: {len(daemon.index)} dwarves indexados")
+        print("   Ferramentas (debug_memory.py, location_finder.py...) usam o daemon automaticamente")
+        print("   Ctrl+C para encerrar")
+        while True:
+            time.sleep(POLL_INTERVAL)
+            daemon.poll()
+    except KeyboardInterrupt:
+        print("\nDaemon encerrado")
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+            if isinstance(address, str) and os.path.exists(address):
+                os.unlink(address)
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
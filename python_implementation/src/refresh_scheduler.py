@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Refresh Scheduler - Releitura dos dwarves em camadas, guiada pelo tick do jogo
+Cada grupo de campos tem uma camada com intervalo em ticks (cur_year_tick):
+humor, flags e estresse mudam a cada tick; skills, ferimentos e equipamentos
+mudam por dia; nome, nascimento e atributos mentais quase nunca. Um poll só
+relê as camadas vencidas (com os planos de leitura de read_dwarves), e o
+intervalo de cada camada se adapta às mudanças observadas: dobra quando nada
+mudou, cai pela metade quando algo mudou. Com o jogo pausado o custo é só a
+leitura do tick. O orçamento (leituras por segundo) é medido e pode ter teto.
+"""
+
+import sys
+import json
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any, Deque, Set, Callable
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData
+
+logger = logging.getLogger(__name__)
+
+TICKS_PER_DAY = 1200
+TICKS_PER_MONTH = TICKS_PER_DAY * 28
+TICKS_PER_YEAR = TICKS_PER_MONTH * 12
+BUDGET_WINDOW = 1.0  # segundos da janela do teto de leituras
+
+@dataclass
+class RefreshTier:
+    """Camada de releitura: campos de CompletelyDwarfData e intervalo em ticks"""
+    name: str
+    fields: Tuple[str, ...]
+    min_interval: int
+    max_interval: int
+    interval: int = 0
+    last_tick: int = -1
+    refreshes: int = 0
+    deferred: int = 0
+    last_changed: int = 0       # dwarves alterados no último refresh
+    change_rate: float = 0.0    # média móvel da fração de dwarves alterados
+    reads: int = 0
+    last_cost: int = 0          # leituras do último refresh
+
+    def __post_init__(self):
+        self.interval = self.interval or self.min_interval
+
+    def due(self, tick: int) -> bool:
+        return self.last_tick < 0 or tick - self.last_tick >= self.interval
+
+    def overdue(self, tick: int) -> float:
+        return float('inf') if self.last_tick < 0 else (tick - self.last_tick) / self.interval
+
+def default_tiers() -> List[RefreshTier]:
+    """Camadas padrão: por tick, diária e quase estática"""
+    return [
+        RefreshTier('tick', ('mood', 'temp_mood', 'flags1', 'flags2', 'flags3', 'squad_id',
+                             'squad_position', 'blood_level', 'personality'),
+                    min_interval=10, max_interval=TICKS_PER_DAY),
+        RefreshTier('daily', ('skills', 'labors', 'wounds', 'syndromes', 'equipment',
+                              'physical_attributes', 'turn_count', 'counters'),
+                    min_interval=TICKS_PER_DAY, max_interval=TICKS_PER_MONTH),
+        RefreshTier('static', ('name', 'custom_profession', 'profession', 'race', 'caste', 'sex',
+                               'age', 'hist_id', 'civ_id', 'pet_owner_id', 'body_size',
+                               'mental_attributes'),
+                    min_interval=TICKS_PER_MONTH, max_interval=TICKS_PER_YEAR),
+    ]
+
+class RefreshScheduler:
+    """Mantém os dwarves atualizados relendo só as camadas vencidas a cada poll"""
+
+    GROWTH = 2        # fator do intervalo quando nada mudou
+    SMOOTHING = 0.3   # peso da última medida em change_rate
+
+    def __init__(self, df_instance: CompleteDFInstance, tiers: Optional[List[RefreshTier]] = None,
+                 max_reads_per_second: Optional[int] = None, adapt: bool = True):
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.tiers = tiers if tiers is not None else default_tiers()
+        self.max_reads_per_second = max_reads_per_second
+        self.adapt = adapt
+
+        self.dwarves: Dict[int, CompletelyDwarfData] = {}   # endereço -> dwarf
+        self.changed: Dict[str, Set[int]] = {}              # camada -> unit_ids alterados no último refresh
+        self._ignored: Set[int] = set()                     # criaturas sem nome (não são dwarves)
+        self.current_tick = -1
+        self.polls = 0
+        self.tick_reads = 0
+        self.roster_reads = 0                               # creature_vector e dwarves novos
+        self._window: Deque[Tuple[float, int]] = deque()
+        self.started = time.monotonic()
+        self.refresh_listeners: List[Callable] = []
+
+    def __len__(self) -> int:
+        return len(self.dwarves)
+
+    def dwarf_list(self) -> List[CompletelyDwarfData]:
+        return list(self.dwarves.values())
+
+    def add_refresh_listener(self, listener: Callable):
+        """listener(dwarves, units) após cada poll que releu algo; units = ids alterados"""
+        self.refresh_listeners.append(listener)
+
+    def _notify_refresh(self, units: Optional[Set[int]]):
+        dwarves = self.dwarf_list()
+        for listener in self.refresh_listeners:
+            try:
+                listener(dwarves, units)
+            except Exception as e:
+                logger.error(f"Erro em listener de refresh: {e}")
+
+    # ------------------------------------------------------------------
+    # Tick e creature_vector
+    # ------------------------------------------------------------------
+
+    def read_tick(self) -> Tuple[int, Optional[int]]:
+        """(tick absoluto = ano * TICKS_PER_YEAR + cur_year_tick, ano); -1 se indisponível"""
+        tick_addr = self.df.layout.get_address('cur_year_tick')
+        if not tick_addr:
+            return -1, None
+        year = self.df._read_current_year()
+        tick = self.memory.read_int32(tick_addr + self.df.base_addr)
+        return (year or 0) * TICKS_PER_YEAR + tick, year
+
+    def _sync_roster(self, current_year: Optional[int]) -> int:
+        """
+        Lê por completo os dwarves novos no creature_vector e descarta os que
+        saíram; devolve quantos entraram ou saíram
+        """
+        addresses = self.df.creature_addresses()
+        present = set(addresses)
+        departed = [address for address in self.dwarves if address not in present]
+        for address in departed:
+            del self.dwarves[address]
+        self._ignored &= present
+
+        plan = self.df._read_plan()
+        added = 0
+        for address in addresses:
+            if address in self.dwarves or address in self._ignored:
+                continue
+            dwarf = self.df._read_complete_dwarf(address, plan, current_year)
+            if dwarf and dwarf.name:
+                self.dwarves[address] = dwarf
+                added += 1
+            else:
+                self._ignored.add(address)
+        return added + len(departed)
+
+    # ------------------------------------------------------------------
+    # Poll
+    # ------------------------------------------------------------------
+
+    def poll(self) -> List[str]:
+        """Relê o que venceu desde o último tick; devolve as camadas relidas"""
+        before = self.memory.read_calls
+        tick, current_year = self.read_tick()
+        self.tick_reads += self.memory.read_calls - before
+        if tick < 0:
+            logger.error("cur_year_tick não encontrado no layout")
+            return []
+        if tick == self.current_tick:
+            self._spend(self.memory.read_calls - before)
+            return []  # jogo pausado: nada mudou
+
+        self.polls += 1
+        roster_start = self.memory.read_calls
+        roster_changes = self._sync_roster(current_year)
+        self.roster_reads += self.memory.read_calls - roster_start
+        self._spend(self.memory.read_calls - before)
+        if self.current_tick < 0:
+            # Primeiro poll: a leitura completa do creature_vector já cobriu todas as camadas
+            for tier in self.tiers:
+                tier.last_tick = tick
+            self.current_tick = tick
+            self._notify_refresh(None)
+            return [tier.name for tier in self.tiers]
+
+        refreshed = []
+        for tier in sorted((tier for tier in self.tiers if tier.due(tick)),
+                           key=lambda tier: tier.overdue(tick), reverse=True):
+            if self._over_budget(tier.last_cost):
+                tier.deferred += 1
+                continue
+            self._refresh_tier(tier, tick, current_year)
+            refreshed.append(tier.name)
+
+        self.current_tick = tick
+        if refreshed or roster_changes:
+            changed = set()
+            for name in refreshed:
+                changed |= self.changed[name]
+            self._notify_refresh(changed)
+        return refreshed
+
+    def _refresh_tier(self, tier: RefreshTier, tick: int, current_year: Optional[int]):
+        plan = self.df._read_plan(tier.fields, lazy=True)
+        fields = sorted(plan.fields)
+        before = self.memory.read_calls
+        changed = set()
+        for dwarf in self.dwarves.values():
+            old = [getattr(dwarf, name) for name in fields]
+            self.df._apply_read_plan(dwarf, plan, current_year)
+            if old != [getattr(dwarf, name) for name in fields]:
+                changed.add(dwarf.id)
+
+        cost = self.memory.read_calls - before
+        self._spend(cost)
+        tier.last_tick = tick
+        tier.refreshes += 1
+        tier.reads += cost
+        tier.last_cost = cost
+        tier.last_changed = len(changed)
+        self.changed[tier.name] = changed
+        rate = len(changed) / len(self.dwarves) if self.dwarves else 0.0
+        tier.change_rate += self.SMOOTHING * (rate - tier.change_rate)
+
+        if self.adapt:
+            if changed:
+                tier.interval = max(tier.min_interval, tier.interval // self.GROWTH)
+            else:
+                tier.interval = min(tier.max_interval, tier.interval * self.GROWTH)
+        logger.debug(f"Camada {tier.name}: {len(changed)} alterados, {cost} leituras, "
+                     f"próximo em {tier.interval} ticks")
+
+    # ------------------------------------------------------------------
+    # Orçamento de leituras
+    # ------------------------------------------------------------------
+
+    def _spend(self, reads: int):
+        now = time.monotonic()
+        self._window.append((now, reads))
+        while self._window and now - self._window[0][0] > BUDGET_WINDOW:
+            self._window.popleft()
+
+    def _over_budget(self, cost: int) -> bool:
+        if not self.max_reads_per_second:
+            return False
+        spent = sum(reads for _, reads in self._window)
+        return spent + cost > self.max_reads_per_second * BUDGET_WINDOW
+
+    def budget(self) -> Dict[str, Any]:
+        """Leituras por segundo: total, janela recente e por camada"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        tier_reads = sum(tier.reads for tier in self.tiers)
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "polls": self.polls,
+            "dwarves": len(self.dwarves),
+            "current_tick": self.current_tick,
+            "reads_per_second": round((tier_reads + self.tick_reads + self.roster_reads) / elapsed, 1),
+            "window_reads": sum(reads for _, reads in self._window),
+            "tick_reads": self.tick_reads,
+            "roster_reads": self.roster_reads,
+            "tiers": {
+                tier.name: {
+                    "interval_ticks": tier.interval,
+                    "refreshes": tier.refreshes,
+                    "deferred": tier.deferred,
+                    "last_changed": tier.last_changed,
+                    "change_rate": round(tier.change_rate, 3),
+                    "last_cost": tier.last_cost,
+                    "reads_per_second": round(tier.reads / elapsed, 1),
+                }
+                for tier in self.tiers
+            }
+        }
+
+    def export_budget(self) -> str:
+        """Exporta o relatório de orçamento"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        exports_dir = Path(__file__).parent.parent / "exports"
+        exports_dir.mkdir(exist_ok=True)
+        filepath = exports_dir / f"refresh_scheduler_{timestamp}.json"
+
+        export_data = {"analysis_type": "refresh_scheduler", **self.budget()}
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Orçamento de leitura exportado para: {filepath}")
+        return str(filepath)
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== REFRESH SCHEDULER - Releitura em camadas por tick ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        scheduler = RefreshScheduler(df)
+        for _ in range(30):
+            refreshed = scheduler.poll()
+            if refreshed:
+                print(f"⏱️  tick {scheduler.current_tick}: {', '.join(refreshed)}")
+            time.sleep(0.5)
+
+        budget = scheduler.budget()
+        print(f"\n📊 {budget['dwarves']} dwarves, {budget['reads_per_second']} leituras/s")
+        for name, tier in budget['tiers'].items():
+            print(f"   {name}: a cada {tier['interval_ticks']} ticks, {tier['reads_per_second']} leituras/s, "
+                  f"{tier['change_rate']:.0%} mudando")
+
+        filepath = scheduler.export_budget()
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
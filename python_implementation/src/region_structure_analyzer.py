@@ -9,6 +9,8 @@ import sys
 from pathlib import Path
 import logging
 import struct
+import time
+from array import array
 from typing import Dict, List, Optional, Tuple, Any
 import json
 from datetime import datetime
@@ -28,6 +30,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bloco inicial de cada região analisado (128 bytes = 32 palavras)
+REGION_BLOCK_SIZE = 128
+REGION_WORDS = REGION_BLOCK_SIZE // 4
+
+# Layouts pré-compilados para decodificar o bloco inteiro de uma vez
+REGION_UNSIGNED = struct.Struct(f'<{REGION_WORDS}I')
+REGION_SIGNED = struct.Struct(f'<{REGION_WORDS}i')
+# Limite de sanidade para o vetor de regiões (mesmo padrão de read_vector(max_count=...))
+MAX_REGIONS = 10000
+
 class RegionStructureAnalyzer:
     """Analisador específico das 530 regiões do mundo"""
     
@@ -69,9 +81,11 @@ class RegionStructureAnalyzer:
             logger.error(f"Erro ao conectar: {e}")
             return False
     
-    def analyze_regions_vector(self) -> Dict[str, Any]:
-        """Análise do vetor de regiões no offset 0x300"""
+    def analyze_regions_vector(self, sample_limit: Optional[int] = None) -> Dict[str, Any]:
+        """Análise do vetor de regiões no offset 0x300 (todas as regiões por padrão)"""
         logger.info("Analisando vetor de regioes...")
+        started = time.perf_counter()
+        memory = self.dwarf_reader.memory_reader
         
         result = {
             "regions_vector": {},
@@ -84,13 +98,12 @@ class RegionStructureAnalyzer:
             # Vetor de regiões está no offset 0x300 do world_data
             regions_vector_addr = self.world_data_ptr + 0x300
             
-            # Ler ponteiros do vetor
-            start_ptr = self.dwarf_reader.memory_reader.read_pointer(regions_vector_addr, 8)
-            end_ptr = self.dwarf_reader.memory_reader.read_pointer(regions_vector_addr + 8, 8)
+            # Ler início e fim do vetor em uma única leitura
+            start_ptr, end_ptr = memory.read_pointer_array(regions_vector_addr, 2, 8) or (0, 0)
             
             # Calcular tamanho de cada região
             element_size = 8  # Assumindo ponteiros de 64-bit
-            region_count = (end_ptr - start_ptr) // element_size
+            region_count = max(end_ptr - start_ptr, 0) // element_size
             
             logger.info(f"Regioes encontradas: {region_count}")
             logger.info(f"Start ptr: 0x{start_ptr:x}")
@@ -104,29 +117,35 @@ class RegionStructureAnalyzer:
                 "element_size": element_size
             }
             
-            # Analisar uma amostra de regiões (primeiras 10)
-            sample_count = min(10, region_count)
-            logger.info(f"Analisando amostra de {sample_count} regioes...")
+            if region_count > MAX_REGIONS:
+                # Layout errado: ponteiros lixo virariam uma alocação e leitura enormes
+                logger.error(f"Contagem de regiões implausível ({region_count} > {MAX_REGIONS})")
+                return result
+
+            analyzed_count = region_count if sample_limit is None else min(sample_limit, region_count)
+            logger.info(f"Analisando {analyzed_count} regioes...")
+            
+            # Todo o array de ponteiros em uma leitura, depois os blocos das regiões em lote
+            region_ptrs = memory.read_pointer_array(start_ptr, analyzed_count, element_size)
+            valid = [(i, addr) for i, addr in enumerate(region_ptrs) if addr != 0]
+            blocks = memory.read_blocks([addr for _, addr in valid], REGION_BLOCK_SIZE)
             
-            for i in range(sample_count):
-                region_ptr_addr = start_ptr + (i * element_size)
-                
-                try:
-                    # Ler ponteiro para a região
-                    region_addr = self.dwarf_reader.memory_reader.read_pointer(region_ptr_addr, 8)
-                    
-                    if region_addr != 0:  # Verificar se é um ponteiro válido
-                        region_data = self._analyze_region_structure(region_addr, i)
-                        result["region_samples"].append(region_data)
-                        logger.info(f"Regiao {i}: 0x{region_addr:x}")
-                        
-                except Exception as e:
-                    logger.warning(f"Erro ao ler regiao {i}: {e}")
+            matrix = array('I')
+            for (i, region_addr), raw_bytes in zip(valid, blocks):
+                if len(raw_bytes) != REGION_BLOCK_SIZE:
+                    logger.warning(f"Erro ao ler regiao {i}: 0x{region_addr:x}")
                     continue
+                matrix.frombytes(raw_bytes)
+                result["region_samples"].append(self._analyze_region_structure(region_addr, i, raw_bytes))
             
             # Análise de padrões
             if result["region_samples"]:
-                result["structure_analysis"] = self._analyze_region_patterns(result["region_samples"])
+                result["structure_analysis"] = self._analyze_region_patterns(matrix)
+            
+            elapsed = time.perf_counter() - started
+            result["regions_vector"]["analyzed_count"] = len(result["region_samples"])
+            result["regions_vector"]["elapsed_seconds"] = round(elapsed, 4)
+            logger.info(f"{len(result['region_samples'])} regioes analisadas em {elapsed:.3f}s")
             
             return result
             
@@ -134,7 +153,8 @@ class RegionStructureAnalyzer:
             logger.error(f"Erro na análise do vetor de regiões: {e}")
             return result
     
-    def _analyze_region_structure(self, region_addr: int, region_index: int) -> Dict[str, Any]:
+    def _analyze_region_structure(self, region_addr: int, region_index: int,
+                                  raw_bytes: Optional[bytes] = None) -> Dict[str, Any]:
         """Análise detalhada da estrutura de uma região"""
         region_data = {
             "index": region_index,
@@ -146,36 +166,38 @@ class RegionStructureAnalyzer:
         }
         
         try:
-            # Ler os primeiros 128 bytes da estrutura da região
-            raw_bytes = self.dwarf_reader.memory_reader.read_memory(region_addr, 128)
+            # Ler os primeiros 128 bytes da estrutura da região (se não vieram do lote)
+            if raw_bytes is None:
+                raw_bytes = self.dwarf_reader.memory_reader.read_memory(region_addr, REGION_BLOCK_SIZE)
+            if len(raw_bytes) != REGION_BLOCK_SIZE:
+                return region_data
+            
+            unsigned_values = REGION_UNSIGNED.unpack(raw_bytes)
+            signed_values = REGION_SIGNED.unpack(raw_bytes)
             
             # Analisar cada 4 bytes como diferentes tipos
-            for offset in range(0, min(128, len(raw_bytes)), 4):
-                if offset + 4 <= len(raw_bytes):
-                    # Ler como int32 unsigned e signed
-                    uint_val = struct.unpack('<I', raw_bytes[offset:offset+4])[0]
-                    int_val = struct.unpack('<i', raw_bytes[offset:offset+4])[0]
-                    
-                    region_data["raw_data"][f"offset_0x{offset:02x}"] = {
-                        "unsigned": uint_val,
-                        "signed": int_val,
-                        "hex": f"0x{uint_val:x}"
+            for word, (uint_val, int_val) in enumerate(zip(unsigned_values, signed_values)):
+                offset = word * 4
+                region_data["raw_data"][f"offset_0x{offset:02x}"] = {
+                    "unsigned": uint_val,
+                    "signed": int_val,
+                    "hex": f"0x{uint_val:x}"
+                }
+                
+                # Identificar possíveis coordenadas (range 0-200)
+                if 0 < uint_val < 200:
+                    region_data["coordinates"][f"offset_0x{offset:02x}"] = {
+                        "value": uint_val,
+                        "type": self._classify_coordinate_value(uint_val),
+                        "likelihood": self._assess_coordinate_likelihood(uint_val, offset)
+                    }
+                
+                # Identificar possíveis IDs ou tipos (range 0-1000)
+                elif 0 <= uint_val < 1000:
+                    region_data["potential_fields"][f"offset_0x{offset:02x}"] = {
+                        "value": uint_val,
+                        "possible_types": self._classify_field_value(uint_val)
                     }
-                    
-                    # Identificar possíveis coordenadas (range 0-200)
-                    if 0 < uint_val < 200:
-                        region_data["coordinates"][f"offset_0x{offset:02x}"] = {
-                            "value": uint_val,
-                            "type": self._classify_coordinate_value(uint_val),
-                            "likelihood": self._assess_coordinate_likelihood(uint_val, offset)
-                        }
-                    
-                    # Identificar possíveis IDs ou tipos (range 0-1000)
-                    elif 0 <= uint_val < 1000:
-                        region_data["potential_fields"][f"offset_0x{offset:02x}"] = {
-                            "value": uint_val,
-                            "possible_types": self._classify_field_value(uint_val)
-                        }
             
             # Procurar por padrões XYZ
             region_data["patterns"] = self._find_xyz_patterns(raw_bytes)
@@ -253,35 +275,34 @@ class RegionStructureAnalyzer:
             "sequential_coords": []
         }
         
+        values = struct.unpack(f'<{len(raw_bytes) // 4}I', raw_bytes[:len(raw_bytes) // 4 * 4])
+        
         # Procurar triplas XYZ
-        for offset in range(0, len(raw_bytes) - 12, 4):
-            if offset + 12 <= len(raw_bytes):
-                x = struct.unpack('<I', raw_bytes[offset:offset+4])[0]
-                y = struct.unpack('<I', raw_bytes[offset+4:offset+8])[0]
-                z = struct.unpack('<I', raw_bytes[offset+8:offset+12])[0]
-                
-                if all(0 <= val < 200 for val in [x, y, z]) and any(val > 0 for val in [x, y, z]):
-                    patterns["xyz_triplets"].append({
-                        "offset": f"0x{offset:02x}",
-                        "x": x, "y": y, "z": z
-                    })
+        for word in range(len(values) - 3):
+            x, y, z = values[word:word + 3]
+            if all(0 <= val < 200 for val in [x, y, z]) and any(val > 0 for val in [x, y, z]):
+                patterns["xyz_triplets"].append({
+                    "offset": f"0x{word * 4:02x}",
+                    "x": x, "y": y, "z": z
+                })
         
         # Procurar pares XY
-        for offset in range(0, len(raw_bytes) - 8, 4):
-            if offset + 8 <= len(raw_bytes):
-                x = struct.unpack('<I', raw_bytes[offset:offset+4])[0]
-                y = struct.unpack('<I', raw_bytes[offset+4:offset+8])[0]
-                
-                if all(0 <= val < 200 for val in [x, y]) and any(val > 0 for val in [x, y]):
-                    patterns["xy_pairs"].append({
-                        "offset": f"0x{offset:02x}",
-                        "x": x, "y": y
-                    })
+        for word in range(len(values) - 2):
+            x, y = values[word:word + 2]
+            if all(0 <= val < 200 for val in [x, y]) and any(val > 0 for val in [x, y]):
+                patterns["xy_pairs"].append({
+                    "offset": f"0x{word * 4:02x}",
+                    "x": x, "y": y
+                })
         
         return patterns
     
-    def _analyze_region_patterns(self, region_samples: List[Dict]) -> Dict[str, Any]:
-        """Análise de padrões entre as regiões"""
+    def _analyze_region_patterns(self, matrix: array) -> Dict[str, Any]:
+        """
+        Análise de padrões entre as regiões.
+        `matrix` contém REGION_WORDS palavras por região, em sequência; cada
+        offset é analisado como uma coluna que atravessa todas as regiões.
+        """
         analysis = {
             "common_offsets": {},
             "coordinate_patterns": {},
@@ -289,47 +310,36 @@ class RegionStructureAnalyzer:
             "structure_size": 0
         }
         
-        if not region_samples:
+        region_count = len(matrix) // REGION_WORDS
+        if not region_count:
             return analysis
         
-        # Identificar offsets que aparecem em todas as regiões
-        all_offsets = set()
-        for region in region_samples:
-            all_offsets.update(region["raw_data"].keys())
-        
-        # Analisar valores comuns por offset
-        for offset in all_offsets:
-            values = []
-            for region in region_samples:
-                if offset in region["raw_data"]:
-                    values.append(region["raw_data"][offset]["unsigned"])
-            
-            if values:
-                analysis["common_offsets"][offset] = {
-                    "values": values,
-                    "min": min(values),
-                    "max": max(values),
-                    "unique_count": len(set(values)),
-                    "all_zero": all(v == 0 for v in values),
-                    "all_same": len(set(values)) == 1
-                }
-        
-        # Identificar padrões de coordenadas
-        coord_offsets = []
-        for region in region_samples:
-            coord_offsets.extend(list(region["coordinates"].keys()))
-        
-        # Contar frequência de offsets com coordenadas
         coord_frequency = {}
-        for offset in coord_offsets:
-            coord_frequency[offset] = coord_frequency.get(offset, 0) + 1
+        for word in range(REGION_WORDS):
+            offset = f"offset_0x{word * 4:02x}"
+            values = matrix[word::REGION_WORDS]
+            unique_count = len(set(values))
+            
+            analysis["common_offsets"][offset] = {
+                "values": values.tolist(),
+                "min": min(values),
+                "max": max(values),
+                "unique_count": unique_count,
+                "all_zero": not any(values),
+                "all_same": unique_count == 1
+            }
+            
+            # Frequência de valores no range de coordenadas
+            coord_count = sum(1 for value in values if 0 < value < 200)
+            if coord_count:
+                coord_frequency[offset] = coord_count
         
         analysis["coordinate_patterns"] = {
             "frequent_coord_offsets": {
                 offset: count for offset, count in coord_frequency.items() 
-                if count >= len(region_samples) // 2  # Aparece em pelo menos metade
+                if count >= region_count // 2  # Aparece em pelo menos metade
             },
-            "total_coord_offsets": len(set(coord_offsets))
+            "total_coord_offsets": len(coord_frequency)
         }
         
         return analysis
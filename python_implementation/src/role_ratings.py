@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+Role Ratings - Avaliação de todos os dwarves para todos os papéis (roles)
+Port de Role, RoleStats, RoleCalcBase/MinMax/Recenter e Dwarf::calc_role_rating
+do C++. As definições de [dwarf_roles] do game_data.ini são compiladas uma vez
+em vetores de coeficientes (a nota de um papel é uma média ponderada, logo
+linear nas notas dos aspectos); a cada refresh as notas de atributos, skills,
+traços e necessidades são calculadas por coluna (a ECDF é avaliada uma vez por
+valor distinto) e cada papel vira algumas somas de colunas inteiras.
+"""
+
+import sys
+import json
+import time
+import logging
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import repeat
+from operator import add, mul
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any, NamedTuple
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData
+from game_data import read_array, game_data_key, to_int
+
+logger = logging.getLogger(__name__)
+
+# DefaultRoleWeight (pesos globais de cada grupo de aspectos)
+DEFAULT_ROLE_WEIGHTS = {
+    'attributes': 0.25,
+    'skills': 1.0,
+    'traits': 0.20,
+    'beliefs': 0.20,
+    'goals': 0.10,
+    'needs': 0.10,
+    'preferences': 0.15,
+}
+# Grupos com colunas na matriz de notas (preferências não são lidas da memória)
+ASPECT_GROUPS = ('attributes', 'skills', 'traits', 'beliefs', 'goals', 'needs')
+
+ATTRIBUTE_POTENTIAL_WEIGHT = 0.5  # default_attribute_potential_weight
+DEFAULT_CTI = 500                 # custo de melhoria padrão (Dwarf::load_attribute)
+PHYSICAL_ATTRIBUTE_COUNT = 6
+MAX_CAPPED_XP = 29000
+NEUTRAL_RATING = 0.5              # DwarfStats::rating sem população
+MIN_ROLE_RATING = 0.0001
+
+# ----------------------------------------------------------------------
+# Normalização (RoleCalcBase, RoleCalcMinMax, RoleCalcRecenter, RoleStats)
+# ----------------------------------------------------------------------
+
+def find_median(values: List[float]) -> float:
+    """RoleCalcBase::find_median (lista já ordenada)"""
+    if not values:
+        return 0.0
+    middle = len(values) // 2
+    if len(values) % 2 == 0:
+        return 0.5 * (values[middle] + values[middle - 1])
+    return values[middle]
+
+def range_transform(val: float, low: float, mid: float, high: float) -> float:
+    """RoleCalcBase::range_transform (inclusive o retorno de mid quando high == mid)"""
+    return range_transform_all([val], low, mid, high)[0]
+
+def range_transform_all(values: List[float], low: float, mid: float, high: float) -> List[float]:
+    """range_transform sobre uma lista inteira"""
+    low_span = mid - low
+    high_span = high - mid
+    return [
+        (0.0 if low_span == 0 else (val - low) / low_span * 0.5) if val <= mid
+        else (mid if high_span == 0 else (val - mid) / high_span * 0.5 + 0.5)
+        for val in values
+    ]
+
+class RoleCalcBase:
+    """Posto na ECDF: média das posições do valor na lista ordenada"""
+
+    def __init__(self, sorted_values: List[float]):
+        self.sorted = sorted_values
+        self.div = float(len(sorted_values) - 1) or 1.0
+
+    def base_ratings(self, values: List[float]) -> List[float]:
+        ordered, count, div = self.sorted, len(self.sorted), self.div
+        ratings = []
+        for val in values:
+            high = bisect_right(ordered, val)
+            if high == 0:
+                ratings.append(0.0)
+                continue
+            low = bisect_left(ordered, val, 0, high)
+            ratings.append(1.0 if low == count else ((low + high - 1) / 2.0) / div)
+        return ratings
+
+    def ratings(self, values: List[float]) -> List[float]:
+        return [base / 2.0 + 0.5 for base in self.base_ratings(values)]
+
+    def rating(self, val: float) -> float:
+        return self.ratings([val])[0]
+
+class RoleCalcMinMax(RoleCalcBase):
+    """ECDF combinada com min/max"""
+
+    def __init__(self, sorted_values: List[float]):
+        super().__init__(sorted_values)
+        self.min = sorted_values[0]
+        self.diff = (sorted_values[-1] - self.min) or 1.0
+
+    def ratings(self, values: List[float]) -> List[float]:
+        low, diff = self.min, self.diff
+        return [(base + (val - low) / diff) * 0.25 + 0.5
+                for base, val in zip(self.base_ratings(values), values)]
+
+class RoleCalcRecenter(RoleCalcBase):
+    """ECDF combinada com a lista recentralizada na média"""
+
+    def __init__(self, sorted_values: List[float]):
+        super().__init__(sorted_values)
+        self.min = sorted_values[0]
+        self.max = sorted_values[-1]
+        self.avg = sum(sorted_values) / len(sorted_values)
+        self.adj_median = find_median(range_transform_all(sorted_values, self.min, self.avg, self.max))
+
+    def ratings(self, values: List[float]) -> List[float]:
+        adjusted = range_transform_all(values, self.min, self.avg, self.max)
+        adjusted = range_transform_all(adjusted, 0.0, self.adj_median, 1.0)
+        return [(base + adj) * 0.5 for base, adj in zip(self.base_ratings(values), adjusted)]
+
+class RoleStats:
+    """
+    RoleStats/DwarfStats: escolhe a normalização pela forma da distribuição e
+    avalia valores. ratings() avalia uma coluna inteira calculando cada valor
+    distinto uma única vez.
+    """
+
+    def __init__(self, values: List[float], invalid_value: float = -1, override: bool = False):
+        self.invalid = invalid_value
+        self.override = override
+        self.calc: Optional[RoleCalcBase] = None
+        self.null_rating = -1.0
+        self.valid = sorted(values)
+        self.median = find_median(self.valid)
+        total_count = len(self.valid)
+        if override or not self.valid:
+            return
+
+        first_quartile = self.valid[int(len(self.valid) / 4.0)]
+        skewed = self.median == first_quartile
+
+        # remove o menor valor (todas as ocorrências) quando ele é inválido
+        if self.valid[0] <= self.invalid:
+            del self.valid[:bisect_right(self.valid, self.valid[0])]
+        if not self.valid:
+            return
+
+        if skewed:
+            unique_count = len(set(self.valid))
+            if unique_count / len(self.valid) < 0.25:
+                self.calc = RoleCalcBase(self.valid)
+            else:
+                self.calc = RoleCalcMinMax(self.valid)
+
+            invalid_count = total_count - len(self.valid)
+            if invalid_count:
+                total = sum(self.ratings(self.valid))
+                self.null_rating = (total_count * 0.5 - total) / invalid_count
+        else:
+            self.calc = RoleCalcRecenter(self.valid)
+
+    def rating(self, val: float) -> float:
+        return self.ratings([val])[0]
+
+    def ratings(self, values: List[float]) -> List[float]:
+        """Notas de uma coluna inteira (um cálculo por valor distinto)"""
+        if self.calc is None:
+            if self.override and self.valid:
+                return range_transform_all(values, self.valid[0], self.median, self.valid[-1])
+            return [0.0] * len(values)
+
+        uniques = list(set(values))
+        rated = self.calc.ratings(uniques)
+        if self.null_rating != -1:
+            invalid, null_rating = self.invalid, self.null_rating
+            rated = [null_rating if val <= invalid else rating for val, rating in zip(uniques, rated)]
+        table = dict(zip(uniques, rated))
+        return [table[val] for val in values]
+
+# ----------------------------------------------------------------------
+# Valores equilibrados (Attribute::get_balanced_value, Skill::get_balanced_level)
+# ----------------------------------------------------------------------
+
+def xp_for_level(level: int) -> int:
+    """Skill::xp_for_level"""
+    return 0 if level < 0 else 50 * level * (level + 9)
+
+def skill_level_precise(level: int, experience: int) -> float:
+    """
+    Skill::capped_level_precise (sem bônus de aprendizado de casta, o nível
+    equilibrado é o próprio nível preciso, limitado a 0)
+    """
+    capped = min(level, 20)
+    if capped >= 20:
+        return 20.0
+    gap = xp_for_level(level + 1) - xp_for_level(level)
+    progress = min(experience / gap * 100.0, 100.0) if gap > 0 else 0.0
+    return max(capped + progress / 100.0, 0.0)
+
+def attribute_potential_value(value: int, maximum: int, cti: float = DEFAULT_CTI) -> float:
+    """DwarfStats::calc_att_potential_value"""
+    if value >= maximum:
+        return float(value)
+    diff = maximum - value
+    gap = diff * 500 / (cti if cti > 0 else 1.0)
+    potential = 0.5 * (1 - (gap / diff))
+    if potential >= 0:
+        potential += 0.5
+    else:
+        potential = -0.5 / (potential - 1.0)
+    return value + potential * gap
+
+def attribute_balanced_value(value: int, maximum: int) -> float:
+    """Média entre valor atual e potencial (default_attribute_potential_weight)"""
+    return (value * (1.0 - ATTRIBUTE_POTENTIAL_WEIGHT) +
+            attribute_potential_value(value, maximum) * ATTRIBUTE_POTENTIAL_WEIGHT)
+
+# ----------------------------------------------------------------------
+# Definições de papéis
+# ----------------------------------------------------------------------
+
+class RoleAspect(NamedTuple):
+    """Aspecto de um papel (Role::aspect_weight com o id)"""
+    key: Any
+    weight: float
+    is_neg: bool
+
+class RoleDefinition(NamedTuple):
+    """Papel de [dwarf_roles]"""
+    name: str
+    group_weights: Dict[str, float]
+    aspects: Dict[str, Tuple[RoleAspect, ...]]
+    script: str
+
+class CompiledRole(NamedTuple):
+    """Papel como constante + coeficientes por coluna da matriz de notas"""
+    name: str
+    constant: float
+    columns: Tuple[int, ...]
+    coefficients: Tuple[float, ...]
+
+class AspectLayout(NamedTuple):
+    """Posição de cada grupo de aspectos na matriz de notas"""
+    offsets: Dict[str, int]
+    sizes: Dict[str, int]
+    attribute_ids: Dict[str, int]  # nome em minúsculas -> id do atributo
+    skill_names: List[str]
+
+    @property
+    def width(self) -> int:
+        return sum(self.sizes.values())
+
+    def column(self, group: str, key: Any) -> int:
+        """Coluna do aspecto, ou -1 se o id não existe"""
+        if group == 'attributes':
+            key = self.attribute_ids.get(str(key).strip().lower(), -1)
+        else:
+            key = to_int(key, -1)
+        return self.offsets[group] + key if 0 <= key < self.sizes[group] else -1
+
+def _parse_aspects(entries: List[Dict[str, Any]], id_key: str = 'id') -> Tuple[RoleAspect, ...]:
+    aspects = []
+    for entry in entries:
+        key = entry.get(id_key, entry.get('name', ""))
+        is_neg = entry.get('is_neg', "false").strip().lower() in ('1', 'true')
+        if isinstance(key, str) and key.startswith('-'):  # formato antigo de aspecto negativo
+            key, is_neg = key.lstrip('-'), True
+        try:
+            weight = float(entry.get('weight', 1.0))
+        except ValueError:
+            weight = 1.0
+        aspects.append(RoleAspect(key, weight if weight >= 0 else 1.0, is_neg))
+    return tuple(aspects)
+
+def _parse_role(entry: Dict[str, Any]) -> RoleDefinition:
+    group_weights = {}
+    for group, default in DEFAULT_ROLE_WEIGHTS.items():
+        try:
+            weight = float(entry.get(f"{group}_weight", entry.get('prefs_weight', -1) if group == 'preferences' else -1))
+        except ValueError:
+            weight = -1.0
+        group_weights[group] = weight if weight >= 0 else default
+
+    aspects = {group: _parse_aspects(entry.get(group, [])) for group in ASPECT_GROUPS}
+    aspects['preferences'] = _parse_aspects(entry.get('preferences', []), id_key='name')
+    return RoleDefinition(entry.get('name', "UNKNOWN ROLE"), group_weights, aspects,
+                          entry.get('script', "").strip())
+
+def _build_layout() -> AspectLayout:
+    attribute_ids = {entry.get('name', "").lower(): to_int(entry.get('id'), -1)
+                     for entry in read_array('attributes')}
+    skill_names = [entry.get('name', "") for entry in read_array('skills')]
+    goal_ids = [to_int(entry.get('id'), -1) for entry in read_array('goals')]
+    sizes = {
+        'attributes': max(attribute_ids.values(), default=-1) + 1,
+        'skills': len(skill_names),
+        'traits': len(read_array('facets')),
+        'beliefs': len(read_array('beliefs')),
+        'goals': max(goal_ids, default=-1) + 1,
+        'needs': len(read_array('needs')),
+    }
+    offsets, offset = {}, 0
+    for group in ASPECT_GROUPS:
+        offsets[group] = offset
+        offset += sizes[group]
+    return AspectLayout(offsets, sizes, attribute_ids, skill_names)
+
+def compile_role(role: RoleDefinition, layout: AspectLayout) -> CompiledRole:
+    """
+    Dwarf::calc_role_rating como função linear das notas dos aspectos:
+    grupos vazios (e preferências, sem dados de memória) valem 50, aspectos
+    negativos contribuem com peso * (1 - nota).
+    """
+    global_total = sum(role.group_weights.values())
+    if global_total == 0:
+        return CompiledRole(role.name, 50.0, (), ())
+
+    constant = 0.0
+    coefficients: Dict[int, float] = {}
+    for group, group_weight in role.group_weights.items():
+        share = group_weight / global_total
+        aspects = role.aspects.get(group, ())
+        aspect_total = sum(aspect.weight for aspect in aspects)
+        if group == 'preferences' or not aspects or aspect_total <= 0:
+            constant += share * 50.0
+            continue
+        for aspect in aspects:
+            scale = share * 100.0 * aspect.weight / aspect_total
+            column = layout.column(group, aspect.key)
+            if column < 0:
+                constant += scale * NEUTRAL_RATING
+                continue
+            if aspect.is_neg:
+                constant += scale
+                scale = -scale
+            coefficients[column] = coefficients.get(column, 0.0) + scale
+    return CompiledRole(role.name, constant, tuple(coefficients), tuple(coefficients.values()))
+
+class RoleCatalog(NamedTuple):
+    """Papéis e layout compilados do game_data.ini"""
+    roles: List[RoleDefinition]
+    compiled: List[CompiledRole]
+    layout: AspectLayout
+
+@lru_cache(maxsize=2)
+def _compile_role_catalog(key: str) -> RoleCatalog:
+    layout = _build_layout()
+    roles = [_parse_role(entry) for entry in read_array('dwarf_roles')]
+    scripted = [role.name for role in roles if role.script]
+    if scripted:
+        # Sem engine de JavaScript: papéis com script não são avaliados
+        logger.warning(f"Papéis com script ignorados: {', '.join(scripted)}")
+    roles = [role for role in roles if not role.script]
+    logger.info(f"Papéis compilados: {len(roles)} ({layout.width} colunas de aspectos)")
+    return RoleCatalog(roles, [compile_role(role, layout) for role in roles], layout)
+
+def load_role_catalog() -> RoleCatalog:
+    """Papéis compilados uma vez por conteúdo do game_data.ini"""
+    return _compile_role_catalog(game_data_key())
+
+# ----------------------------------------------------------------------
+# Engine
+# ----------------------------------------------------------------------
+
+class RoleRatingEngine:
+    """Notas de todos os dwarves para todos os papéis"""
+
+    def __init__(self, catalog: Optional[RoleCatalog] = None):
+        self.catalog = catalog or load_role_catalog()
+        self.unit_ids: List[int] = []
+        self.names: List[str] = []
+        self.columns: List[List[float]] = []    # coluna de aspecto -> nota (0-1) por dwarf
+        self.raw: Dict[str, List[float]] = {}   # papel -> nota bruta por dwarf
+        self.display: Dict[str, List[float]] = {}  # papel -> nota exibida (0-100) por dwarf
+        self._row_of: Dict[int, int] = {}
+        self.refresh_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.unit_ids)
+
+    def refresh(self, dwarves: List[CompletelyDwarfData],
+                needs: Optional[Dict[int, Any]] = None) -> int:
+        """
+        Recalcula as notas (DFInstance::load_role_ratings). needs é o dicionário
+        unit_id -> DwarfNeeds do NeedsReader; sem ele as necessidades ficam neutras.
+        """
+        started = time.perf_counter()
+        self.unit_ids = [dwarf.id for dwarf in dwarves]
+        self.names = [dwarf.name for dwarf in dwarves]
+        self._row_of = {unit_id: row for row, unit_id in enumerate(self.unit_ids)}
+        self.columns = self._rate_aspects(dwarves, needs)
+
+        count = len(dwarves)
+        self.raw = {}
+        for role in self.catalog.compiled:
+            ratings = [role.constant] * count
+            for column, coefficient in zip(role.columns, role.coefficients):
+                ratings = list(map(add, ratings, map(mul, self.columns[column], repeat(coefficient))))
+            self.raw[role.name] = [rating if rating != 0.0 else MIN_ROLE_RATING for rating in ratings]
+
+        # DwarfStats::roles: transformação simples sobre todas as notas brutas
+        role_stats = RoleStats([rating for ratings in self.raw.values() for rating in ratings], -1, True)
+        self.display = {name: [rating * 100.0 for rating in role_stats.ratings(ratings)]
+                        for name, ratings in self.raw.items()}
+
+        self.refresh_seconds = time.perf_counter() - started
+        logger.info(f"{count} dwarves x {len(self.raw)} papéis avaliados em {self.refresh_seconds:.3f}s")
+        return count
+
+    def _rate_aspects(self, dwarves: List[CompletelyDwarfData],
+                      needs: Optional[Dict[int, Any]]) -> List[List[float]]:
+        """Matriz de notas por coluna, cada grupo normalizado pela população do grupo"""
+        layout = self.catalog.layout
+        count = len(dwarves)
+        neutral = [NEUTRAL_RATING] * count
+        columns: List[List[float]] = []
+
+        # ATRIBUTOS (valor equilibrado com o potencial; ausentes ficam neutros)
+        values: List[List[Optional[float]]] = [[None] * count for _ in range(layout.sizes['attributes'])]
+        for row, dwarf in enumerate(dwarves):
+            for base, attributes in ((0, dwarf.physical_attributes), (PHYSICAL_ATTRIBUTE_COUNT, dwarf.mental_attributes)):
+                for attribute in attributes:
+                    if 0 <= base + attribute.id < len(values):
+                        values[base + attribute.id][row] = attribute_balanced_value(attribute.value, attribute.max_value)
+        columns.extend(self._rate_group(values, RoleStats([val for column in values for val in column if val is not None])))
+
+        # SKILLS (skills ausentes têm nível 0, o valor inválido de DwarfStats::skills)
+        values = [[0.0] * count for _ in range(layout.sizes['skills'])]
+        for row, dwarf in enumerate(dwarves):
+            for skill in dwarf.skills:
+                if 0 <= skill.id < len(values):
+                    values[skill.id][row] = skill_level_precise(skill.level, skill.experience)
+        columns.extend(self._rate_group(values, RoleStats([val for column in values for val in column], 0)))
+
+        # TRAÇOS
+        values = [[None] * count for _ in range(layout.sizes['traits'])]
+        for row, dwarf in enumerate(dwarves):
+            if dwarf.personality:
+                for trait_id, trait_value in dwarf.personality.traits.items():
+                    if 0 <= trait_id < len(values):
+                        values[trait_id][row] = float(trait_value)
+        columns.extend(self._rate_group(values, RoleStats([val for column in values for val in column if val is not None])))
+
+        # CRENÇAS e METAS não são lidas: crenças neutras, metas não possuídas
+        columns.extend(neutral for _ in range(layout.sizes['beliefs']))
+        columns.extend([0.0] * count for _ in range(layout.sizes['goals']))
+
+        # NECESSIDADES (Dwarf::get_need_type_level: soma dos need_level do tipo)
+        if needs is None:
+            columns.extend(neutral for _ in range(layout.sizes['needs']))
+        else:
+            values = [[0.0] * count for _ in range(layout.sizes['needs'])]
+            for row, dwarf in enumerate(dwarves):
+                state = needs.get(dwarf.id)
+                for need in (state.needs if state else ()):
+                    if 0 <= need.need_id < len(values):
+                        values[need.need_id][row] += need.need_level
+            columns.extend(self._rate_group(values, RoleStats([val for column in values for val in column])))
+
+        return columns
+
+    @staticmethod
+    def _rate_group(values: List[List[Optional[float]]], stats: RoleStats) -> List[List[float]]:
+        """Notas das colunas do grupo com uma tabela única valor -> nota"""
+        uniques = [val for val in {val for column in values for val in column} if val is not None]
+        table = dict(zip(uniques, stats.ratings(uniques)))
+        table[None] = NEUTRAL_RATING
+        return [[table[val] for val in column] for column in values]
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def rating(self, unit_id: int, role_name: str) -> float:
+        """Nota exibida (0-100) de um dwarf num papel"""
+        row = self._row_of.get(unit_id)
+        ratings = self.display.get(role_name)
+        return ratings[row] if row is not None and ratings else 0.0
+
+    def top_roles(self, unit_id: int, limit: int = 3) -> List[Tuple[str, float]]:
+        """Melhores papéis de um dwarf (Dwarf::sorted_role_ratings)"""
+        row = self._row_of.get(unit_id)
+        if row is None:
+            return []
+        ratings = [(name, ratings[row]) for name, ratings in self.display.items()]
+        return sorted(ratings, key=lambda entry: entry[1], reverse=True)[:limit]
+
+    def best_for_role(self, role_name: str, limit: int = 5) -> List[Tuple[int, str, float]]:
+        """Dwarves mais adequados a um papel"""
+        ratings = self.display.get(role_name, [])
+        rows = sorted(range(len(ratings)), key=ratings.__getitem__, reverse=True)[:limit]
+        return [(self.unit_ids[row], self.names[row], ratings[row]) for row in rows]
+
+    def export_ratings(self) -> str:
+        """Exporta as notas exibidas por dwarf"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        exports_dir = Path(__file__).parent.parent / "exports"
+        exports_dir.mkdir(exist_ok=True)
+        filepath = exports_dir / f"role_ratings_{timestamp}.json"
+
+        export_data = {
+            "analysis_type": "role_ratings",
+            "total_dwarves": len(self.unit_ids),
+            "total_roles": len(self.display),
+            "refresh_seconds": self.refresh_seconds,
+            "dwarves": [
+                {
+                    "unit_id": unit_id,
+                    "name": name,
+                    "top_roles": [{"role": role, "rating": round(rating, 2)} for role, rating in self.top_roles(unit_id, 5)],
+                    "ratings": {role: round(ratings[row], 2) for role, ratings in self.display.items()}
+                }
+                for row, (unit_id, name) in enumerate(zip(self.unit_ids, self.names))
+            ]
+        }
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Notas de papéis exportadas para: {filepath}")
+        return str(filepath)
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== ROLE RATINGS - Papéis dos dwarves ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        from needs_reader import NeedsReader
+
+        dwarves = df.read_complete_dwarves()
+        needs = NeedsReader(df)
+        needs.refresh(dwarves)
+
+        engine = RoleRatingEngine()
+        engine.refresh(dwarves, needs.dwarves)
+        print(f"🎭 {len(engine)} dwarves x {len(engine.display)} papéis em {engine.refresh_seconds * 1000:.1f}ms")
+
+        for unit_id, name in list(zip(engine.unit_ids, engine.names))[:10]:
+            roles = ", ".join(f"{role} ({rating:.0f}%)" for role, rating in engine.top_roles(unit_id))
+            print(f"   {name}: {roles}")
+
+        filepath = engine.export_ratings()
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Shared Snapshot - Publicação do snapshot dos dwarves em memória compartilhada
+Um processo leitor (o único que acessa o Dwarf Fortress) publica cada refresh
+num segmento multiprocessing.shared_memory com layout binário fixo em colunas:
+cabeçalho, tabela de colunas e um array contíguo por coluna (id, profissão,
+estresse, máscara de labors, nome...). Outros processos (dashboard, tracker,
+analisadores) mapeiam o segmento e leem as colunas sem cópia nem syscalls no
+jogo. A consistência vem de um seqlock: o contador fica ímpar durante a
+escrita; o leitor repete a leitura se o contador mudou ou estava ímpar.
+"""
+
+import sys
+import time
+import struct
+import logging
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any, Set
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData, MAX_CREATURES
+from dwarf_query import COLUMNS
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_NAME = "dwarf_therapist_snapshot"
+MAGIC = b'DTSNAP01'
+LAYOUT_VERSION = 1
+NAME_WIDTH = 64     # bytes UTF-8 por nome (truncado)
+WRITE_TIMEOUT = 1.0  # segundos esperando o fim de uma escrita (seq ímpar)
+ALIGNMENT = 64
+
+# magic, versão, colunas, seq (offset 16), época, publicado em, capacidade, quantidade
+HEADER = struct.Struct('<8sIIQQdII')
+SEQ_OFFSET = 16
+HEADER_SIZE = 64
+COLUMN_ENTRY = struct.Struct('<16s4sII')  # nome, formato, offset, tamanho do item
+
+_LOW_64 = (1 << 64) - 1
+# Colunas publicadas: nome -> formato (struct/memoryview)
+SHARED_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('id', 'q'), ('profession', 'q'), ('race', 'q'), ('caste', 'q'), ('sex', 'q'), ('age', 'q'),
+    ('mood', 'q'), ('happiness', 'q'), ('squad_id', 'q'), ('civ_id', 'q'), ('hist_id', 'q'),
+    ('stress', 'q'), ('focus', 'q'), ('labors_low', 'Q'), ('labors_high', 'Q'),
+    ('has_skills', 'B'), ('has_wounds', 'B'), ('has_equipment', 'B'), ('has_syndromes', 'B'),
+    ('has_personality', 'B'), ('name', f'{NAME_WIDTH}s'),
+)
+_EXTRACTORS = dict(COLUMNS)
+_EXTRACTORS['labors_low'] = lambda dwarf: dwarf.labor_mask & _LOW_64
+_EXTRACTORS['labors_high'] = lambda dwarf: dwarf.labor_mask >> 64
+_EXTRACTORS['name'] = lambda dwarf: dwarf.name.encode('utf-8')[:NAME_WIDTH]
+
+def _align(value: int) -> int:
+    return (value + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def segment_layout(capacity: int) -> Tuple[Dict[str, Tuple[str, int, int]], int]:
+    """Offsets das colunas para a capacidade: ({nome: (formato, offset, tamanho)}, tamanho total)"""
+    offset = _align(HEADER_SIZE + COLUMN_ENTRY.size * len(SHARED_COLUMNS))
+    columns = {}
+    for name, fmt in SHARED_COLUMNS:
+        item_size = struct.calcsize(fmt)
+        columns[name] = (fmt, offset, item_size)
+        offset = _align(offset + item_size * capacity)
+    return columns, offset
+
+_PUBLISHED: Set[str] = set()  # segmentos criados neste processo (o tracker precisa deles)
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Abre um segmento existente sem registrá-lo no resource_tracker (que o apagaria na saída)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        segment = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            if name not in _PUBLISHED:
+                resource_tracker.unregister(segment._name, 'shared_memory')
+        except Exception:
+            pass
+        return segment
+
+class SharedSnapshotPublisher:
+    """Escreve cada refresh no segmento compartilhado (um único escritor)"""
+
+    def __init__(self, name: str = SEGMENT_NAME, capacity: int = MAX_CREATURES):
+        self.name = name
+        self.capacity = capacity
+        self.columns, size = segment_layout(capacity)
+        try:
+            self.segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Segmento de uma execução anterior: recriar com o layout atual
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _PUBLISHED.add(name)
+        self.buffer = self.segment.buf
+        self.seq = 0
+        self.epoch = 0
+        self.publish_seconds = 0.0
+
+        HEADER.pack_into(self.buffer, 0, MAGIC, LAYOUT_VERSION, len(SHARED_COLUMNS), 0, 0, 0.0, capacity, 0)
+        for index, (column, (fmt, offset, item_size)) in enumerate(self.columns.items()):
+            COLUMN_ENTRY.pack_into(self.buffer, HEADER_SIZE + index * COLUMN_ENTRY.size,
+                                   column.encode('ascii'), fmt.encode('ascii'), offset, item_size)
+        logger.info(f"Segmento {name} criado: {size} bytes, {capacity} dwarves")
+
+    def publish(self, dwarves: List[CompletelyDwarfData], units: Optional[Set[int]] = None) -> int:
+        """Publica o snapshot (serve de listener de refresh); devolve a época"""
+        started = time.perf_counter()
+        if len(dwarves) > self.capacity:
+            logger.warning(f"{len(dwarves)} dwarves, capacidade {self.capacity}: excedentes ignorados")
+            dwarves = dwarves[:self.capacity]
+        count = len(dwarves)
+        columns = {column: [_EXTRACTORS[column](dwarf) for dwarf in dwarves] for column in self.columns}
+
+        # Seqlock: ímpar = escrita em andamento
+        self.seq += 1
+        struct.pack_into('<Q', self.buffer, SEQ_OFFSET, self.seq)
+        for column, (fmt, offset, _) in self.columns.items():
+            if fmt.endswith('s'):
+                struct.pack_into(f'<{count * NAME_WIDTH}s', self.buffer, offset,
+                                 b''.join(value.ljust(NAME_WIDTH, b'\0') for value in columns[column]))
+            else:
+                struct.pack_into(f'<{count}{fmt}', self.buffer, offset, *columns[column])
+        self.epoch += 1
+        self.seq += 1
+        HEADER.pack_into(self.buffer, 0, MAGIC, LAYOUT_VERSION, len(SHARED_COLUMNS), self.seq,
+                         self.epoch, time.time(), self.capacity, count)
+
+        self.publish_seconds = time.perf_counter() - started
+        logger.debug(f"Época {self.epoch} publicada: {count} dwarves em {self.publish_seconds * 1000:.2f}ms")
+        return self.epoch
+
+    def close(self, unlink: bool = True):
+        self.buffer = None
+        self.segment.close()
+        if unlink:
+            self.segment.unlink()
+            _PUBLISHED.discard(self.name)
+
+class SharedSnapshotReader:
+    """Mapeia o segmento publicado; leitura consistente por seqlock"""
+
+    def __init__(self, name: str = SEGMENT_NAME):
+        self.segment = _attach(name)
+        self.buffer = self.segment.buf
+        magic, version, column_count, _, _, _, self.capacity, _ = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            self.close()
+            raise ValueError(f"Segmento {name} com layout desconhecido ({magic!r} v{version})")
+        self.columns: Dict[str, Tuple[str, int, int]] = {}
+        for index in range(column_count):
+            column, fmt, offset, item_size = COLUMN_ENTRY.unpack_from(self.buffer, HEADER_SIZE + index * COLUMN_ENTRY.size)
+            self.columns[column.rstrip(b'\0').decode('ascii')] = (fmt.rstrip(b'\0').decode('ascii'), offset, item_size)
+        self.retries = 0
+
+    def header(self) -> Dict[str, Any]:
+        _, _, _, seq, epoch, published_at, capacity, count = HEADER.unpack_from(self.buffer, 0)
+        return {"seq": seq, "epoch": epoch, "published_at": published_at, "capacity": capacity, "count": count}
+
+    def _seq(self) -> int:
+        return struct.unpack_from('<Q', self.buffer, SEQ_OFFSET)[0]
+
+    def view(self, timeout: float = WRITE_TIMEOUT) -> Tuple[int, int, Dict[str, memoryview]]:
+        """
+        (seq, quantidade, colunas) sem cópia: memoryviews direto no segmento. Os
+        valores só são garantidos se valid(seq) continuar True depois de usados.
+        O chamador precisa chamar release() em cada memoryview: com alguma viva,
+        close() levanta BufferError. TimeoutError se a escrita não terminar em
+        timeout segundos (publicador morto no meio de publish).
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            seq = self._seq()
+            if seq % 2 == 0:
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError("Publicação do snapshot compartilhado não terminou (publicador parado?)")
+            time.sleep(0)
+        count = self.header()["count"]
+        views = {}
+        for column, (fmt, offset, item_size) in self.columns.items():
+            raw = self.buffer[offset:offset + count * item_size]
+            views[column] = raw if fmt.endswith('s') else raw.cast(fmt)
+        return seq, count, views
+
+    def valid(self, seq: int) -> bool:
+        """Nenhuma publicação começou desde seq"""
+        return self._seq() == seq
+
+    def read(self, columns: Optional[List[str]] = None, max_retries: int = 1000,
+             timeout: float = WRITE_TIMEOUT) -> Tuple[int, Dict[str, list]]:
+        """(época, {coluna: valores}) consistente: copia e confere o seqlock"""
+        wanted = columns or list(self.columns)
+        for _ in range(max_retries):
+            seq, count, views = self.view(timeout)
+            epoch = self.header()["epoch"]
+            copied = {}
+            try:
+                for column in wanted:
+                    view = views[column]
+                    if self.columns[column][0].endswith('s'):
+                        data = bytes(view)
+                        copied[column] = [data[i:i + NAME_WIDTH].rstrip(b'\0').decode('utf-8', errors='ignore')
+                                          for i in range(0, count * NAME_WIDTH, NAME_WIDTH)]
+                    else:
+                        copied[column] = view.tolist()
+            finally:
+                for view in views.values():
+                    view.release()
+            if self.valid(seq):
+                return epoch, copied
+            self.retries += 1
+        raise TimeoutError("Snapshot compartilhado em escrita contínua")
+
+    def rows(self, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Snapshot consistente como lista de dicionários (um por dwarf)"""
+        _, data = self.read(columns)
+        names = list(data)
+        return [dict(zip(names, values)) for values in zip(*data.values())]
+
+    def wait_for_epoch(self, epoch: int, timeout: float = 10.0, interval: float = 0.05) -> int:
+        """Espera uma época maior que epoch (polling do cabeçalho, sem syscalls no jogo)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            current = self.header()["epoch"]
+            if current > epoch:
+                return current
+            time.sleep(interval)
+        return self.header()["epoch"]
+
+    def close(self):
+        """Desmapeia o segmento (as memoryviews de view() já devem ter sido liberadas)"""
+        self.buffer = None
+        self.segment.close()
+
+def read_main():
+    """Consumidor: lê o snapshot publicado por outro processo"""
+    reader = SharedSnapshotReader()
+    try:
+        header = reader.header()
+        print(f"📖 Época {header['epoch']}: {header['count']} dwarves")
+        for row in reader.rows(['id', 'name', 'stress', 'squad_id'])[:15]:
+            print(f"   {row['name']} (estresse {row['stress']}, squad {row['squad_id']})")
+    finally:
+        reader.close()
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== SHARED SNAPSHOT - Snapshot em memória compartilhada ===")
+    print()
+
+    if '--read' in sys.argv:
+        read_main()
+        return
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    publisher = None
+    try:
+        from refresh_scheduler import RefreshScheduler
+        publisher = SharedSnapshotPublisher()
+        scheduler = RefreshScheduler(df)
+        scheduler.add_refresh_listener(publisher.publish)
+        print(f"📤 Publicando em '{SEGMENT_NAME}' (consumidores: python src/shared_snapshot.py --read)")
+        print("   Ctrl+C para encerrar")
+        while True:
+            scheduler.poll()
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        print("\nPublicação encerrada")
+    finally:
+        if publisher:
+            publisher.close()
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
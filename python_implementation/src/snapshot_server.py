@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Snapshot Server - Servidor HTTP local com o último snapshot dos dwarves
+Serve o snapshot (/snapshot), cada dwarf (/dwarves/<id>), só o que mudou desde
+uma época (/snapshot?since=<época>) e o estado do servidor (/status). A época
+só avança quando algum dwarf muda: cada unidade é serializada uma vez quando
+muda e guarda a época da mudança, e os corpos (JSON e gzip) ficam em cache
+até a próxima época. ETag + If-None-Match devolvem 304 sem corpo, então o
+polling do dashboard com o forte parado custa quase nada. Os dados vêm do
+RefreshScheduler (releitura em camadas), não de um export em arquivo.
+"""
+
+import sys
+import gzip
+import json
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Set, Callable
+from urllib.parse import urlparse, parse_qs
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+POLL_INTERVAL = 1.0     # segundos entre polls do RefreshScheduler
+DELTA_HISTORY = 1000    # épocas de saídas guardadas para /snapshot?since=
+
+class SnapshotStore:
+    """Dwarves serializados por unidade, com época de mudança e cache de respostas"""
+
+    def __init__(self, history: int = DELTA_HISTORY, human_readable: bool = True):
+        self.boot = f"{int(time.time()):x}"   # ETags de outra execução nunca coincidem
+        self.history = history
+        self.human_readable = human_readable
+        self.epoch = 0
+        self.updated_at = 0.0
+        self._units: Dict[int, Tuple[int, bytes]] = {}   # unit_id -> (época da mudança, JSON)
+        self._removed: Dict[int, int] = {}               # unit_id -> época da saída
+        self._oldest_delta = 0                           # since menor recebe snapshot completo
+        self._cache: Dict[tuple, Tuple[str, bytes]] = {}  # respostas da época atual
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    # ------------------------------------------------------------------
+    # Atualização (thread do refresh)
+    # ------------------------------------------------------------------
+
+    def update(self, dwarves: List[CompletelyDwarfData], units: Optional[Set[int]] = None) -> int:
+        """
+        Serializa os dwarves alterados (units = dica de quem pode ter mudado) e
+        avança a época só se algo mudou; serve de listener de refresh
+        """
+        encoded: Dict[int, bytes] = {}
+        for dwarf in dwarves:
+            old = self._units.get(dwarf.id)
+            if old is not None and units is not None and dwarf.id not in units:
+                continue
+            body = json.dumps(dwarf.to_dict(human_readable=self.human_readable), sort_keys=True,
+                              ensure_ascii=False, default=str).encode('utf-8')
+            if old is None or old[1] != body:
+                encoded[dwarf.id] = body
+        present = {dwarf.id for dwarf in dwarves}
+        departed = [unit_id for unit_id in self._units if unit_id not in present]
+        if not encoded and not departed:
+            return self.epoch
+
+        with self._lock:
+            epoch = self.epoch + 1
+            for unit_id, body in encoded.items():
+                self._units[unit_id] = (epoch, body)
+                self._removed.pop(unit_id, None)
+            for unit_id in departed:
+                del self._units[unit_id]
+                self._removed[unit_id] = epoch
+            if epoch - self.history > self._oldest_delta:
+                self._oldest_delta = epoch - self.history
+                self._removed = {unit_id: removed for unit_id, removed in self._removed.items()
+                                 if removed > self._oldest_delta}
+            self.epoch = epoch
+            self.updated_at = time.time()
+            self._cache = {}
+        logger.info(f"Época {epoch}: {len(encoded)} dwarves alterados, {len(departed)} saíram")
+        return epoch
+
+    # ------------------------------------------------------------------
+    # Recursos (threads do servidor): (ETag, corpo)
+    # ------------------------------------------------------------------
+
+    def _cached(self, key: tuple, build: Callable[[], Optional[Tuple[str, bytes]]],
+                compressed: bool) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                entry = build()  # sob o lock: vê o mesmo estado que a época em self._cache
+                if entry is None:
+                    return None
+                self._cache[key] = entry
+            if not compressed:
+                return entry
+            gzip_key = key + ('gzip',)
+            compressed_entry = self._cache.get(gzip_key)
+            if compressed_entry is None:
+                # Corpo diferente, ETag forte diferente
+                compressed_entry = self._cache[gzip_key] = (entry[0][:-1] + '-gz"', gzip.compress(entry[1], 6))
+            return compressed_entry
+
+    def _body(self, epoch_fields: str, bodies: List[bytes], extra: str = "") -> bytes:
+        return (f'{{{epoch_fields},"dwarf_count":{len(bodies)}{extra},"dwarves":['.encode('utf-8') +
+                b','.join(bodies) + b']}')
+
+    def snapshot(self, compressed: bool = False) -> Tuple[str, bytes]:
+        def build():
+            bodies = [body for _, body in self._units.values()]
+            return f'"{self.boot}-{self.epoch}"', self._body(f'"epoch":{self.epoch}', bodies)
+        return self._cached(('snapshot',), build, compressed)
+
+    def delta(self, since: int, compressed: bool = False) -> Tuple[str, bytes]:
+        """
+        Dwarves alterados e ids que saíram depois da época since. Sem histórico
+        suficiente devolve o snapshot completo com "full":true, para o cliente
+        trocar o estado local inteiro (quem saiu não aparece em "removed")
+        """
+        since = min(since, self.epoch)  # chaves do cache limitadas a [_oldest_delta, época]
+
+        def build():
+            if since < self._oldest_delta:
+                bodies = [body for _, body in self._units.values()]
+                return (f'"{self.boot}-{self.epoch}-full"',
+                        self._body(f'"epoch":{self.epoch},"full":true', bodies))
+            bodies = [body for changed, body in self._units.values() if changed > since]
+            removed = sorted(unit_id for unit_id, epoch in self._removed.items() if epoch > since)
+            return (f'"{self.boot}-{self.epoch}-since-{since}"',
+                    self._body(f'"epoch":{self.epoch},"since":{since}', bodies, f',"removed":{json.dumps(removed)}'))
+        key = ('delta', 'full') if since < self._oldest_delta else ('delta', since)
+        return self._cached(key, build, compressed)
+
+    def unit(self, unit_id: int, compressed: bool = False) -> Optional[Tuple[str, bytes]]:
+        """Um dwarf; o ETag só muda quando esse dwarf muda"""
+        def build():
+            entry = self._units.get(unit_id)
+            if entry is None:
+                return None
+            changed, body = entry
+            return f'"{self.boot}-{unit_id}-{changed}"', body
+        return self._cached(('unit', unit_id), build, compressed)
+
+    def status(self) -> Dict[str, object]:
+        return {"epoch": self.epoch, "dwarf_count": len(self._units), "updated_at": self.updated_at,
+                "oldest_delta": self._oldest_delta, "cached_responses": len(self._cache)}
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Accept-Encoding aceita gzip (respeitando q=0 e o curinga *)"""
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip().lower()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match contém o ETag (comparação fraca) ou é *"""
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    """GET /snapshot[?since=N], /dwarves/<id>, /status"""
+
+    server_version = "DwarfTherapistSnapshot/1.0"
+
+    def do_GET(self):
+        store: SnapshotStore = self.server.store
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        compressed = accepts_gzip(self.headers.get('Accept-Encoding', ""))
+
+        try:
+            if url.path in ('/', '/snapshot'):
+                since = query.get('since')
+                resource = store.delta(int(since[0]), compressed) if since else store.snapshot(compressed)
+            elif url.path.startswith('/dwarves/'):
+                resource = store.unit(int(url.path[len('/dwarves/'):]), compressed)
+            elif url.path == '/status':
+                self._send(200, json.dumps(store.status()).encode('utf-8'))
+                return
+            else:
+                resource = None
+        except ValueError:
+            self._send(400, b'{"error": "parametro invalido"}')
+            return
+
+        if resource is None:
+            self._send(404, b'{"error": "nao encontrado"}')
+            return
+        etag, body = resource
+        if etag_matches(self.headers.get('If-None-Match', ""), etag):
+            self._send(304, b"", etag)
+        else:
+            self._send(200, body, etag, compressed)
+
+    def _send(self, code: int, body: bytes, etag: Optional[str] = None, compressed: bool = False):
+        self.send_response(code)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+        if code != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            if compressed:
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if code != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+def make_server(store: SnapshotStore, host: str = '127.0.0.1', port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Servidor HTTP (só local por padrão) servindo o store"""
+    server = ThreadingHTTPServer((host, port), SnapshotHandler)
+    server.daemon_threads = True
+    server.store = store
+    return server
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== SNAPSHOT SERVER - Dwarves via HTTP local ===")
+    print()
+
+    port = DEFAULT_PORT
+    if '--port' in sys.argv:
+        port = int(sys.argv[sys.argv.index('--port') + 1])
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    server = None
+    try:
+        from refresh_scheduler import RefreshScheduler
+        store = SnapshotStore()
+        scheduler = RefreshScheduler(df)
+        scheduler.add_refresh_listener(store.update)
+        scheduler.poll()
+
+        server = make_server(store, port=port)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"🌐 http://127.0.0.1:{port}/snapshot  (?since=<época>, /dwarves/<id>, /status)")
+        print(f"   {len(store)} dwarves na época {store.epoch}; Ctrl+C para encerrar")
+        while True:
+            time.sleep(POLL_INTERVAL)
+            scheduler.poll()
+    except KeyboardInterrupt:
+        print("\nServidor encerrado")
+    finally:
+        if server:
+            server.shutdown()
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Squad Reader - Leitura do squad_vector com [squad_offsets]
+Lê todos os esquadrões, suas posições (membros), ordens e uniformes com um
+punhado de leituras em bloco (uma por etapa, não por esquadrão) e monta os
+índices esquadrão -> membros e figura histórica/unidade -> esquadrão, como
+Squad::read_data no C++.
+"""
+
+import sys
+import json
+import time
+import struct
+import logging
+from datetime import datetime
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple, Any, NamedTuple
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance, CompletelyDwarfData, VM_TYPE_OFFSET
+from race_cache import DF_STRING_SIZE
+
+logger = logging.getLogger(__name__)
+
+MAX_SQUADS = 5000
+TICKS_PER_MONTH = 1200 * 28
+
+# SQ_ORDER_TYPE de squad.h
+ORDER_NAMES = {-1: "UNKNOWN", 0: "MOVE", 1: "KILL", 2: "DEFEND", 3: "PATROL", 4: "TRAIN"}
+ORD_UNKNOWN, ORD_MOVE, ORD_TRAIN = -1, 0, 4
+
+# Vetores de uniforme da posição -> ITEM_TYPE (mesma ordem de Squad::read_members)
+UNIFORM_CATEGORIES = (
+    ('armor_vector', 25), ('helm_vector', 28), ('pants_vector', 30), ('gloves_vector', 29),
+    ('shoes_vector', 26), ('shield_vector', 27), ('weapon_vector', 24),
+)
+
+class UniformItem(NamedTuple):
+    """Item de uniforme atribuído a uma posição (squad_uniform_spec)"""
+    category: int       # ITEM_TYPE da categoria do vetor
+    item_id: int        # item escolhido especificamente (-1 = qualquer)
+    item_type: int
+    item_subtype: int
+    mat_class: int
+    mat_type: int
+    mat_index: int
+    individual_choice: bool
+
+@dataclass
+class SquadPosition:
+    """Posição de um esquadrão e o membro que a ocupa"""
+    index: int
+    hist_id: int
+    order: int = ORD_UNKNOWN
+    uniform: List[UniformItem] = field(default_factory=list)
+    quiver_id: int = -1
+    backpack_id: int = -1
+    flask_id: int = -1
+
+    @property
+    def occupied(self) -> bool:
+        return self.hist_id > 0
+
+@dataclass
+class Squad:
+    """Esquadrão do squad_vector"""
+    id: int
+    name: str
+    address: int
+    alert: int = -1
+    squad_order: int = ORD_UNKNOWN
+    carry_food: int = 0
+    carry_water: int = 0
+    ammo_count: int = 0
+    positions: List[SquadPosition] = field(default_factory=list)
+
+    @property
+    def members(self) -> List[int]:
+        """hist_id dos membros, na ordem das posições"""
+        return [position.hist_id for position in self.positions if position.occupied]
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['squad_order_name'] = ORDER_NAMES.get(self.squad_order, str(self.squad_order))
+        for position in data['positions']:
+            position['order_name'] = ORDER_NAMES.get(position['order'], str(position['order']))
+            position['uniform'] = [item._asdict() for item in position['uniform']]
+        return data
+
+class SquadReader:
+    """Lê todos os esquadrões e mantém os índices de membros"""
+
+    def __init__(self, df_instance: CompleteDFInstance, active_only: bool = True):
+        self.df = df_instance
+        self.memory = df_instance.memory_reader
+        self.offsets = df_instance.layout.offsets.get('squad', {})
+        self.active_only = active_only
+        self.pointer_size = df_instance.pointer_size
+        self._pointer_format = '<Q' if self.pointer_size == 8 else '<I'
+
+        self.squads: Dict[int, Squad] = {}
+        self.hist_to_squad: Dict[int, Tuple[int, int]] = {}  # hist_id -> (squad id, posição)
+        self._order_types: Dict[int, int] = {}                # vtable da ordem -> SQ_ORDER_TYPE
+        self.refresh_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.squads)
+
+    def _field_block_size(self, *names: str, extra: int = 0) -> int:
+        return max(self.offsets.get(name, 0) for name in names) + extra
+
+    def active_squad_ids(self) -> Optional[set]:
+        """ids de historical_entity.squads da fortaleza (None se não encontrado)"""
+        entity_addr = self.df.layout.get_address('fortress_entity')
+        squads_offset = self.df.layout.get_offset('hist_entity', 'squads')
+        if not entity_addr or not squads_offset:
+            return None
+        entity = self.memory.read_pointer(entity_addr + self.df.base_addr, self.pointer_size)
+        if not entity:
+            return None
+        block = self.memory.read_memory(entity + squads_offset, 2 * self.pointer_size)
+        return set(self.memory.read_embedded_vectors([block], 0, self.pointer_size, MAX_SQUADS, 'i')[0])
+
+    def current_month(self) -> int:
+        tick_addr = self.df.layout.get_address('cur_year_tick')
+        if not tick_addr:
+            return 0
+        return min(self.memory.read_int32(tick_addr + self.df.base_addr) // TICKS_PER_MONTH, 11)
+
+    def refresh(self) -> int:
+        """Relê o squad_vector completo e reconstrói os índices"""
+        started = time.perf_counter()
+        vector_addr = self.df.layout.get_address('squad_vector')
+        if not vector_addr or not self.offsets:
+            logger.error("squad_vector ou [squad_offsets] não encontrado no layout")
+            return 0
+
+        addresses = self.memory.read_vector(vector_addr + self.df.base_addr, self.pointer_size, max_count=MAX_SQUADS)
+        block_size = self._field_block_size('alias', extra=DF_STRING_SIZE)
+        block_size = max(block_size, self._field_block_size('members', 'orders', 'schedules', 'ammunition',
+                                                            extra=2 * self.pointer_size + 8),
+                         self._field_block_size('alert', 'carry_food', 'carry_water', extra=4))
+        blocks = self.memory.read_blocks(addresses, block_size)
+
+        active = self.active_squad_ids() if self.active_only else None
+        keep = []
+        for address, block in zip(addresses, blocks):
+            if len(block) != block_size:
+                continue
+            squad_id = struct.unpack_from('<i', block, self.offsets.get('id', 0))[0]
+            if active is None or squad_id in active:
+                keep.append((address, block, squad_id))
+
+        squads = [self._decode_squad(address, block, squad_id) for address, block, squad_id in keep]
+        squad_blocks = [block for _, block, _ in keep]
+
+        members = self.memory.read_embedded_vectors(squad_blocks, self.offsets.get('members', 0), self.pointer_size)
+        position_blocks = self._read_positions(squads, members)
+        self._read_ammunition(squads, squad_blocks)
+        self._read_orders(squads, squad_blocks, position_blocks)
+
+        self.squads = {squad.id: squad for squad in squads}
+        self.hist_to_squad = {
+            position.hist_id: (squad.id, position.index)
+            for squad in squads for position in squad.positions if position.occupied
+        }
+        self.refresh_seconds = time.perf_counter() - started
+        logger.info(f"{len(squads)} esquadrões ({len(self.hist_to_squad)} membros) lidos em "
+                    f"{self.refresh_seconds:.3f}s")
+        return len(squads)
+
+    def _decode_squad(self, address: int, block: bytes, squad_id: int) -> Squad:
+        alias = self.memory.decode_df_string(block, self.offsets['alias'], self.pointer_size) \
+            if 'alias' in self.offsets else ""
+        return Squad(
+            id=squad_id,
+            # O nome traduzido (language_name) depende das tabelas de idioma; usa o apelido
+            name=alias or f"Squad {squad_id}",
+            address=address,
+            alert=struct.unpack_from('<i', block, self.offsets['alert'])[0] if 'alert' in self.offsets else -1,
+            carry_food=struct.unpack_from('<h', block, self.offsets['carry_food'])[0]
+            if 'carry_food' in self.offsets else 0,
+            carry_water=struct.unpack_from('<h', block, self.offsets['carry_water'])[0]
+            if 'carry_water' in self.offsets else 0
+        )
+
+    def _read_positions(self, squads: List[Squad],
+                        members: List[Tuple[int, ...]]) -> List[Tuple[SquadPosition, bytes]]:
+        """Posições de todos os esquadrões e seus uniformes, em leituras em bloco"""
+        owners = [(squad, index) for squad, addresses in zip(squads, members) for index in range(len(addresses))]
+        position_addresses = [address for addresses in members for address in addresses]
+
+        names = [name for name, _ in UNIFORM_CATEGORIES] + ['orders', 'quiver', 'backpack', 'flask']
+        block_size = self._field_block_size(*names, extra=2 * self.pointer_size)
+        blocks = self.memory.read_blocks(position_addresses, block_size)
+
+        for (squad, index), block in zip(owners, blocks):
+            position = SquadPosition(index=index, hist_id=-1)
+            if len(block) == block_size:
+                position.hist_id = struct.unpack_from('<i', block, 0)[0]
+                for name in ('quiver', 'backpack', 'flask'):
+                    if name in self.offsets:
+                        setattr(position, f"{name}_id", struct.unpack_from('<i', block, self.offsets[name])[0])
+            squad.positions.append(position)
+
+        positions = [squad.positions[index] for squad, index in owners]
+        self._read_uniforms(positions, blocks)
+        return list(zip(positions, blocks))
+
+    def _read_uniforms(self, positions: List[SquadPosition], blocks: List[bytes]):
+        spec_size = self._field_block_size('uniform_spec_item_type', 'uniform_spec_item_subtype',
+                                           'uniform_spec_mat_class', 'uniform_spec_mat_type',
+                                           'uniform_spec_mat_index', 'uniform_indiv_choice', extra=8)
+        for name, category in UNIFORM_CATEGORIES:
+            if name not in self.offsets:
+                continue
+            vectors = self.memory.read_embedded_vectors(blocks, self.offsets[name], self.pointer_size)
+            owners = [position for position, specs in zip(positions, vectors) for _ in specs]
+            spec_addresses = [address for specs in vectors for address in specs]
+            for position, spec in zip(owners, self.memory.read_blocks(spec_addresses, spec_size)):
+                if len(spec) != spec_size:
+                    continue
+                position.uniform.append(UniformItem(
+                    category=category,
+                    item_id=struct.unpack_from('<i', spec, 0)[0],
+                    item_type=struct.unpack_from('<h', spec, self.offsets.get('uniform_spec_item_type', 0))[0],
+                    item_subtype=struct.unpack_from('<h', spec, self.offsets.get('uniform_spec_item_subtype', 0))[0],
+                    mat_class=struct.unpack_from('<h', spec, self.offsets.get('uniform_spec_mat_class', 0))[0],
+                    mat_type=struct.unpack_from('<h', spec, self.offsets.get('uniform_spec_mat_type', 0))[0],
+                    mat_index=struct.unpack_from('<i', spec, self.offsets.get('uniform_spec_mat_index', 0))[0],
+                    # Bits: qualquer / corpo a corpo / à distância
+                    individual_choice=bool(spec[self.offsets.get('uniform_indiv_choice', 0)] & 0x7)
+                ))
+
+    def _read_ammunition(self, squads: List[Squad], blocks: List[bytes]):
+        if 'ammunition' not in self.offsets:
+            return
+        vectors = self.memory.read_embedded_vectors(blocks, self.offsets['ammunition'], self.pointer_size)
+        qty_offset = self.offsets.get('ammunition_qty', 0)
+        owners = [squad for squad, specs in zip(squads, vectors) for _ in specs]
+        specs = self.memory.read_blocks([address for specs in vectors for address in specs], qty_offset + 4)
+        for squad, spec in zip(owners, specs):
+            if len(spec) == qty_offset + 4:
+                squad.ammo_count += struct.unpack_from('<i', spec, qty_offset)[0]
+
+    def _order_types_for(self, order_addresses: List[int]) -> List[int]:
+        """
+        SQ_ORDER_TYPE de cada ordem: vtable -> 4ª função virtual -> imediato,
+        memorizado por vtable como em _read_item_type
+        """
+        vtables = [struct.unpack(self._pointer_format, block)[0] if len(block) == self.pointer_size else 0
+                   for block in self.memory.read_blocks(order_addresses, self.pointer_size)]
+        unknown = sorted({vtable for vtable in vtables if vtable and vtable not in self._order_types})
+        functions = [struct.unpack(self._pointer_format, block)[0] if len(block) == self.pointer_size else 0
+                     for block in self.memory.read_blocks([v + 3 * self.pointer_size for v in unknown],
+                                                          self.pointer_size)]
+        values = self.memory.read_blocks([function + VM_TYPE_OFFSET for function in functions], 4)
+        for vtable, function, value in zip(unknown, functions, values):
+            raw_type = struct.unpack('<i', value)[0] if function and len(value) == 4 else 0
+            self._order_types[vtable] = raw_type if raw_type > 0 else ORD_MOVE
+        return [self._order_types.get(vtable, ORD_UNKNOWN) for vtable in vtables]
+
+    def _read_orders(self, squads: List[Squad], blocks: List[bytes],
+                     position_blocks: List[Tuple[SquadPosition, bytes]]):
+        """Ordens do esquadrão, das posições e agendadas para o mês atual (Squad::read_orders)"""
+        if 'orders' not in self.offsets:
+            return
+        orders_offset = self.offsets['orders']
+        squad_orders = self.memory.read_embedded_vectors(blocks, orders_offset, self.pointer_size)
+        position_orders = self.memory.read_embedded_vectors([block for _, block in position_blocks],
+                                                            orders_offset, self.pointer_size)
+
+        all_orders = [address for orders in squad_orders for address in orders] + \
+                     [address for orders in position_orders for address in orders]
+        types = dict(zip(all_orders, self._order_types_for(all_orders)))
+
+        # Treino é tratado pelas atividades; demais ordens sobrescrevem a do esquadrão
+        for squad, orders in zip(squads, squad_orders):
+            for address in orders:
+                if types[address] != ORD_TRAIN:
+                    squad.squad_order = types[address]
+        for (position, _), orders in zip(position_blocks, position_orders):
+            for address in orders:
+                if types[address] != ORD_TRAIN:
+                    position.order = types[address]
+
+        self._read_scheduled_orders(squads, blocks)
+
+        for squad in squads:
+            for position in squad.positions:
+                if position.order == ORD_UNKNOWN:
+                    position.order = squad.squad_order
+
+    def _read_scheduled_orders(self, squads: List[Squad], blocks: List[bytes]):
+        """Ordens da agenda do alerta atual para o mês corrente"""
+        needed = ('schedules', 'sched_size', 'sched_orders', 'sched_assign')
+        if not all(name in self.offsets for name in needed):
+            return
+        schedules = self.memory.read_embedded_vectors(blocks, self.offsets['schedules'], self.pointer_size)
+        month_offset = self.offsets['sched_size'] * self.current_month()
+
+        pending = [(squad, vector[squad.alert] + month_offset)
+                   for squad, vector in zip(squads, schedules)
+                   if squad.squad_order == ORD_UNKNOWN and 0 <= squad.alert < len(vector)]
+        if not pending:
+            return
+
+        size = max(self.offsets['sched_orders'], self.offsets['sched_assign']) + 2 * self.pointer_size
+        month_blocks = self.memory.read_blocks([address for _, address in pending], size)
+        orders = self.memory.read_embedded_vectors(month_blocks, self.offsets['sched_orders'], self.pointer_size)
+        assigns = self.memory.read_embedded_vectors(month_blocks, self.offsets['sched_assign'], self.pointer_size)
+
+        assigned_ids = self.memory.read_blocks([address for vector in assigns for address in vector], 4)
+        order_pointers = self.memory.read_blocks([address for vector in orders for address in vector],
+                                                 self.pointer_size)
+        order_addresses = [struct.unpack(self._pointer_format, block)[0] if len(block) == self.pointer_size else 0
+                           for block in order_pointers]
+        types = self._order_types_for(order_addresses)
+
+        id_cursor = order_cursor = 0
+        for (squad, _), squad_orders, squad_assigns in zip(pending, orders, assigns):
+            squad_types = types[order_cursor:order_cursor + len(squad_orders)]
+            order_cursor += len(squad_orders)
+            for index in range(len(squad_assigns)):
+                block = assigned_ids[id_cursor + index]
+                order_id = struct.unpack('<i', block)[0] if len(block) == 4 else -1
+                if index < len(squad.positions) and 0 <= order_id < len(squad_types) \
+                        and squad.positions[index].order == ORD_UNKNOWN and squad_types[order_id] != ORD_TRAIN:
+                    squad.positions[index].order = squad_types[order_id]
+            id_cursor += len(squad_assigns)
+
+    # ------------------------------------------------------------------
+    # Índices
+    # ------------------------------------------------------------------
+
+    def members_of(self, squad_id: int) -> List[int]:
+        squad = self.squads.get(squad_id)
+        return squad.members if squad else []
+
+    def squad_of_hist(self, hist_id: int) -> Optional[Squad]:
+        entry = self.hist_to_squad.get(hist_id)
+        return self.squads.get(entry[0]) if entry else None
+
+    def resolve_dwarves(self, dwarves: List[CompletelyDwarfData]) -> Dict[int, Tuple[int, int]]:
+        """id da unidade -> (id do esquadrão, posição), pelo hist_id do dwarf"""
+        return {dwarf.id: self.hist_to_squad[dwarf.hist_id] for dwarf in dwarves if dwarf.hist_id in self.hist_to_squad}
+
+    def export_squads(self) -> str:
+        """Exporta todos os esquadrões com membros, ordens e uniformes"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        exports_dir = Path(__file__).parent.parent / "exports"
+        exports_dir.mkdir(exist_ok=True)
+        filepath = exports_dir / f"squads_{timestamp}.json"
+
+        export_data = {
+            "analysis_type": "squads",
+            "squad_count": len(self.squads),
+            "member_count": len(self.hist_to_squad),
+            "refresh_seconds": self.refresh_seconds,
+            "squads": [squad.to_dict() for squad in self.squads.values()]
+        }
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(export_data, f, indent=2, ensure_ascii=False)
+
+        logger.info(f"Esquadrões exportados para: {filepath}")
+        return str(filepath)
+
+def main():
+    """Função principal"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    print("=== SQUAD READER - Esquadrões da fortaleza ===")
+    print()
+
+    df = CompleteDFInstance()
+    if not df.connect() or not df.load_memory_layout():
+        print("❌ Erro: Não foi possível conectar ao Dwarf Fortress")
+        return
+
+    try:
+        reader = SquadReader(df)
+        reader.refresh()
+        dwarves = df.read_complete_dwarves()
+        names = {dwarf.hist_id: dwarf.name for dwarf in dwarves}
+
+        print(f"🛡️ {len(reader)} esquadrões lidos em {reader.refresh_seconds * 1000:.1f} ms")
+        for squad in reader.squads.values():
+            print(f"\n   {squad.name} (#{squad.id}) - ordem: {ORDER_NAMES.get(squad.squad_order)}")
+            for position in squad.positions:
+                if position.occupied:
+                    print(f"      {position.index}: {names.get(position.hist_id, position.hist_id)} "
+                          f"[{ORDER_NAMES.get(position.order)}] {len(position.uniform)} itens de uniforme")
+
+        filepath = reader.export_squads()
+        print(f"\n📁 ARQUIVO: {filepath}")
+    finally:
+        df.disconnect()
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ import sys
 from pathlib import Path
 import logging
 import struct
+import time
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Any
 import json
 from datetime import datetime
@@ -28,6 +30,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Estrutura do site lida em um único bloco
+SITE_BLOCK_SIZE = 256
+SITE_TYPE_OFFSET = 0x80                                  # int16
+SITE_COORD_OFFSETS = (0x04, 0x08, 0x0C, 0x10, 0x14, 0x18)  # int32
+SITE_NAME_OFFSETS = (0x20, 0x40, 0x60, 0x80, 0x100)
+SITE_RAW_WORDS = struct.Struct('<16i')                   # primeiros 64 bytes
+# Limite de sanidade para o vetor de sites (mesmo padrão de MAX_REGIONS)
+MAX_SITES = 100000
+
+@dataclass
+class SiteRecord:
+    """Site ativo decodificado a partir do bloco da estrutura"""
+    index: int
+    address: int
+    site_type: int
+    coordinates: Tuple[int, ...]
+    name: str = ""
+    raw_words: Tuple[int, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Mesmo formato usado por analyze_site_structure"""
+        coords = {}
+        for i, value in enumerate(self.coordinates):
+            coords[f'coord_{i}'] = value
+            if 0 <= value <= 1000:
+                coords[f'valid_coord_{i}'] = value
+
+        raw_data = {'type': self.site_type}
+        raw_data.update({f'offset_0x{i * 4:02x}': value for i, value in enumerate(self.raw_words)})
+
+        return {
+            'index': self.index,
+            'address': hex(self.address),
+            'type': self.site_type,
+            'name': self.name,
+            'coordinates': coords,
+            'raw_data': raw_data
+        }
+
+@dataclass
+class ActiveSitesIndex:
+    """Todos os sites ativos com índices por tipo e por coordenadas"""
+    sites: List[SiteRecord] = field(default_factory=list)
+    by_type: Dict[int, List[SiteRecord]] = field(default_factory=dict)
+    by_coordinates: Dict[Tuple[int, ...], List[SiteRecord]] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+
+    def add(self, site: SiteRecord):
+        self.sites.append(site)
+        self.by_type.setdefault(site.site_type, []).append(site)
+        self.by_coordinates.setdefault(site.coordinates, []).append(site)
+
+    def sites_of_type(self, site_type: int) -> List[SiteRecord]:
+        return self.by_type.get(site_type, [])
+
+    def sites_at(self, coordinates: Tuple[int, ...]) -> List[SiteRecord]:
+        return self.by_coordinates.get(tuple(coordinates), [])
+
 class WorldDataExplorer:
     """Explorador da estrutura world_data do Dwarf Fortress"""
     
@@ -51,6 +111,9 @@ class WorldDataExplorer:
             'rainfall': 0x6000,   # Dados de chuva
         }
         
+        # Nomes de sites não mudam: cache por endereço entre atualizações
+        self.site_name_cache: Dict[int, str] = {}
+        
     def connect_to_df(self) -> bool:
         """Conecta ao Dwarf Fortress"""
         try:
@@ -104,146 +167,117 @@ class WorldDataExplorer:
         """Explora o vetor de sites ativos"""
         logger.info("Explorando active sites...")
         
-        sites_data = {
-            'vector_address': 0,
-            'site_count': 0,
-            'sites': []
+        sites_vector_addr = world_data_ptr + self.known_fields['active_sites_vector']
+        index = self.read_active_sites(world_data_ptr)
+        
+        return {
+            'vector_address': sites_vector_addr,
+            'site_count': len(index.sites),
+            'sites': [site.to_dict() for site in index.sites],
+            'sites_by_type': {str(site_type): len(sites) for site_type, sites in sorted(index.by_type.items())},
+            'elapsed_seconds': round(index.elapsed_seconds, 4)
         }
+    
+    def read_active_sites(self, world_data_ptr: int) -> ActiveSitesIndex:
+        """
+        Lê todos os sites ativos: o array de ponteiros em uma leitura, os blocos
+        das estruturas em lote (read_blocks junta só sites a até 0x1000 bytes um
+        do outro: uma leitura por grupo, não por refresh) e os nomes a partir do
+        cache quando possível.
+        """
+        started = time.perf_counter()
+        memory = self.dwarf_reader.memory_reader
+        index = ActiveSitesIndex()
         
         try:
-            # Calcular endereço do active_sites_vector
             sites_vector_addr = world_data_ptr + self.known_fields['active_sites_vector']
-            sites_data['vector_address'] = sites_vector_addr
-            
-            # Ler o vetor (start, end pointers)
-            start_ptr = self.dwarf_reader.memory_reader.read_pointer(sites_vector_addr, 8)
-            end_ptr = self.dwarf_reader.memory_reader.read_pointer(sites_vector_addr + 8, 8)
+            start_ptr, end_ptr = memory.read_pointer_array(sites_vector_addr, 2, 8) or (0, 0)
             
             if start_ptr and end_ptr and end_ptr > start_ptr:
                 site_count = (end_ptr - start_ptr) // 8  # Cada ponteiro é 8 bytes
-                sites_data['site_count'] = site_count
-                
                 logger.info(f"Active sites vector: 0x{sites_vector_addr:x}")
                 logger.info(f"Sites encontrados: {site_count}")
                 
-                # Ler cada site
-                for i in range(min(site_count, 10)):  # Máximo 10 sites
-                    site_ptr_addr = start_ptr + (i * 8)
-                    site_addr = self.dwarf_reader.memory_reader.read_pointer(site_ptr_addr, 8)
-                    
-                    if site_addr:
-                        site_info = self.analyze_site_structure(site_addr, i)
-                        sites_data['sites'].append(site_info)
+                if site_count > MAX_SITES:
+                    # Vetor corrompido ou antigo viraria uma alocação e leitura enormes
+                    logger.error(f"Contagem de sites implausível ({site_count} > {MAX_SITES})")
+                    site_count = 0
+                
+                site_ptrs = memory.read_pointer_array(start_ptr, site_count, 8)
+                valid = [(i, addr) for i, addr in enumerate(site_ptrs) if addr]
+                blocks = memory.read_blocks([addr for _, addr in valid], SITE_BLOCK_SIZE)
+                
+                for (i, site_addr), block in zip(valid, blocks):
+                    site = self._decode_site_block(site_addr, i, block)
+                    if site is not None:
+                        index.add(site)
                         
         except Exception as e:
             logger.error(f"Erro ao explorar active sites: {e}")
             
-        return sites_data
+        index.elapsed_seconds = time.perf_counter() - started
+        logger.info(f"{len(index.sites)} sites lidos em {index.elapsed_seconds:.3f}s "
+                    f"({len(index.by_type)} tipos, {len(self.site_name_cache)} nomes em cache)")
+        return index
     
-    def analyze_site_structure(self, site_addr: int, index: int) -> Dict:
-        """Analisa a estrutura de um site específico"""
-        site_info = {
-            'index': index,
-            'address': hex(site_addr),
-            'type': 'unknown',
-            'name': '',
-            'coordinates': {},
-            'raw_data': {}
-        }
+    def _decode_site_block(self, site_addr: int, index: int, block: bytes) -> Optional[SiteRecord]:
+        """Decodifica tipo, coordenadas e dados brutos de um bloco de site"""
+        if len(block) != SITE_BLOCK_SIZE:
+            logger.warning(f"  Site {index}: falha ao ler 0x{site_addr:x}")
+            return None
         
-        try:
-            # Ler tipo do site (offset +0x80 baseado no layout)
-            site_type = self.dwarf_reader.memory_reader.read_int16(site_addr + 0x80)
-            site_info['type'] = site_type
-            site_info['raw_data']['type'] = site_type
-            
-            # Se for tipo 0 (player fortress), explorar mais
-            if site_type == 0:
-                site_info['name'] = 'Player Fortress'
-                logger.info(f"  Site {index}: Player Fortress encontrada!")
-                
-                # Tentar ler coordenadas do site
-                coords = self.read_site_coordinates(site_addr)
-                site_info['coordinates'] = coords
-                
-                # Ler nome da fortaleza
-                fortress_name = self.read_fortress_name(site_addr)
-                if fortress_name:
-                    site_info['name'] = fortress_name
-                    
-            else:
-                site_info['name'] = f'Site Type {site_type}'
-                logger.info(f"  Site {index}: Tipo {site_type}")
-                
-            # Ler dados adicionais da estrutura
-            site_info['raw_data'].update(self.read_site_raw_data(site_addr))
-            
-        except Exception as e:
-            logger.error(f"Erro ao analisar site {index}: {e}")
-            
-        return site_info
-    
-    def read_site_coordinates(self, site_addr: int) -> Dict:
-        """Lê coordenadas de um site"""
-        coords = {}
+        site_type = struct.unpack_from('<H', block, SITE_TYPE_OFFSET)[0]
+        coordinates = tuple(struct.unpack_from('<i', block, offset)[0] for offset in SITE_COORD_OFFSETS)
         
-        try:
-            # Offsets típicos para coordenadas em estruturas de site
-            coord_offsets = [0x04, 0x08, 0x0C, 0x10, 0x14, 0x18]
-            
-            for i, offset in enumerate(coord_offsets):
-                value = self.dwarf_reader.memory_reader.read_int32(site_addr + offset)
-                coords[f'coord_{i}'] = value
-                
-                # Verificar se parece coordenada válida
-                if 0 <= value <= 1000:
-                    coords[f'valid_coord_{i}'] = value
-                    
-        except Exception as e:
-            logger.error(f"Erro ao ler coordenadas do site: {e}")
-            
-        return coords
+        return SiteRecord(
+            index=index,
+            address=site_addr,
+            site_type=site_type,
+            coordinates=coordinates,
+            name=self.get_site_name(site_addr, site_type),
+            raw_words=SITE_RAW_WORDS.unpack_from(block)
+        )
+    
+    def get_site_name(self, site_addr: int, site_type: int) -> str:
+        """Nome do site, lido da memória apenas na primeira vez"""
+        name = self.site_name_cache.get(site_addr)
+        if name is None:
+            name = self.read_fortress_name(site_addr)
+            if not name:
+                name = 'Player Fortress' if site_type == 0 else f'Site Type {site_type}'
+            self.site_name_cache[site_addr] = name
+        return name
+    
+    def analyze_site_structure(self, site_addr: int, index: int) -> Dict:
+        """Analisa a estrutura de um site específico"""
+        block = self.dwarf_reader.memory_reader.read_memory(site_addr, SITE_BLOCK_SIZE)
+        site = self._decode_site_block(site_addr, index, block)
+        if site is None:
+            return {
+                'index': index,
+                'address': hex(site_addr),
+                'type': 'unknown',
+                'name': '',
+                'coordinates': {},
+                'raw_data': {}
+            }
+        return site.to_dict()
     
     def read_fortress_name(self, site_addr: int) -> str:
         """Tenta ler o nome da fortaleza"""
         try:
             # O nome geralmente está numa estrutura de language_name
             # Vamos tentar vários offsets possíveis
-            name_offsets = [0x20, 0x40, 0x60, 0x80, 0x100]
-            
-            for offset in name_offsets:
-                name_ptr = self.dwarf_reader.memory_reader.read_pointer(site_addr + offset, 8)
-                if name_ptr:
-                    name = self.dwarf_reader.memory_reader.read_string(name_ptr, 64)
-                    if name and len(name) > 2 and name.isprintable():
-                        return name
+            for offset in SITE_NAME_OFFSETS:
+                name = self.dwarf_reader.memory_reader.read_df_string(site_addr + offset, 8)
+                if name and len(name) > 2 and name.isprintable():
+                    return name
                         
         except Exception as e:
             logger.error(f"Erro ao ler nome da fortaleza: {e}")
             
         return ""
     
-    def read_site_raw_data(self, site_addr: int) -> Dict:
-        """Lê dados brutos da estrutura do site"""
-        raw_data = {}
-        
-        try:
-            # Ler primeiros 256 bytes da estrutura
-            chunk_size = 256
-            data = self.dwarf_reader.memory_reader.read_memory(site_addr, chunk_size)
-            
-            if data:
-                # Interpretar como diferentes tipos de dados
-                for offset in range(0, min(len(data), 64), 4):
-                    if offset + 4 <= len(data):
-                        value_int32 = int.from_bytes(data[offset:offset+4], byteorder='little', signed=True)
-                        raw_data[f'offset_0x{offset:02x}'] = value_int32
-                        
-        except Exception as e:
-            logger.error(f"Erro ao ler dados brutos do site: {e}")
-            
-        return raw_data
-    
     def explore_world_map_data(self, world_data_ptr: int) -> Dict:
         """Explora dados do mapa mundial"""
         logger.info("Explorando dados do mapa mundial...")
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+World Raster Cache - Extração das camadas do mapa mundial para arrays 2-D
+Converte as regiões do world_data exploradas pelo CoordinateArraysAnalyzer
+(elevação, clima, geologia, biomas) em rasters tipados e grava cada camada em
+um arquivo .npy (formato 1.0, compatível com numpy.load(mmap_mode='r')) por
+mundo. Execuções seguintes abrem os arquivos via mmap sem tocar na memória do
+processo.
+"""
+
+import ast
+import sys
+import mmap
+import json
+import struct
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Any
+
+# Adicionar o caminho do complete_dwarf_reader
+sys.path.insert(0, str(Path(__file__).parent))
+from complete_dwarf_reader import CompleteDFInstance
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(),
+        logging.FileHandler('world_raster_cache.log')
+    ]
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "cache" / "rasters"
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+
+# typecode do módulo array -> descr do numpy
+NPY_DESCR = {
+    'b': '|i1', 'B': '|u1',
+    'h': '<i2', 'H': '<u2',
+    'i': '<i4', 'I': '<u4',
+}
+TYPECODE_FOR_DESCR = {descr: code for code, descr in NPY_DESCR.items()}
+
+# Offsets do cabeçalho do world_data onde aparecem as dimensões do mundo
+# (mesmos candidatos de WorldDataExplorer.explore_world_map_data)
+WORLD_DIMENSION_OFFSETS = (0x00, 0x04, 0x08, 0x0C, 0x10, 0x14, 0x18, 0x1C)
+
+@dataclass(frozen=True)
+class RasterLayerSpec:
+    """Camada do mapa: posição no world_data e tamanho máximo da região"""
+    name: str
+    offset: int
+    size: int
+
+# Mesmas faixas de CoordinateArraysAnalyzer.analyze_coordinate_arrays;
+# climate_data (0x20000, 0x8000) dividido em chuva e temperatura
+RASTER_LAYERS = (
+    RasterLayerSpec('elevation', 0x1000, 0x10000),
+    RasterLayerSpec('rainfall', 0x20000, 0x4000),
+    RasterLayerSpec('temperature', 0x24000, 0x4000),
+    RasterLayerSpec('geology', 0x30000, 0x8000),
+    RasterLayerSpec('features', 0x40000, 0x10000),
+    RasterLayerSpec('biome', 0x60000, 0x8000),
+)
+
+class Raster:
+    """Array 2-D (linhas = y) sobre um buffer, normalmente um mmap do .npy"""
+
+    def __init__(self, name: str, width: int, height: int, typecode: str, buffer, owner=None):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.typecode = typecode
+        self.data = memoryview(buffer).cast('B').cast(typecode)
+        self._owner = owner  # mantém o mmap vivo enquanto o raster existir
+
+    def get(self, x: int, y: int) -> int:
+        return self.data[y * self.width + x]
+
+    def row(self, y: int) -> List[int]:
+        return self.data[y * self.width:(y + 1) * self.width].tolist()
+
+    def statistics(self) -> Dict[str, Any]:
+        values = self.data
+        return {
+            "width": self.width,
+            "height": self.height,
+            "typecode": self.typecode,
+            "min": min(values) if len(values) else 0,
+            "max": max(values) if len(values) else 0,
+            "mean": round(sum(values) / len(values), 3) if len(values) else 0.0
+        }
+
+def write_npy(path: Path, data: bytes, typecode: str, shape: Tuple[int, int]):
+    """Grava um .npy versão 1.0 com o cabeçalho padrão do numpy"""
+    header = f"{{'descr': '{NPY_DESCR[typecode]}', 'fortran_order': False, 'shape': {shape}, }}"
+    # magic + versão + tamanho do cabeçalho + cabeçalho + '\n' alinhados em 64 bytes
+    padding = 64 - (len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header = header + ' ' * (padding % 64) + '\n'
+
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(NPY_MAGIC)
+        f.write(struct.pack('<H', len(header)))
+        f.write(header.encode('latin1'))
+        f.write(data)
+    tmp_path.replace(path)
+
+def open_npy(path: Path, name: Optional[str] = None) -> Raster:
+    """Abre um .npy gravado por write_npy via mmap (somente leitura)"""
+    with open(path, 'rb') as f:
+        if f.read(len(NPY_MAGIC)) != NPY_MAGIC:
+            raise ValueError(f"Arquivo .npy inválido: {path}")
+        header_len = struct.unpack('<H', f.read(2))[0]
+        header = ast.literal_eval(f.read(header_len).decode('latin1'))
+        data_offset = len(NPY_MAGIC) + 2 + header_len
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    height, width = header['shape']
+    typecode = TYPECODE_FOR_DESCR[header['descr']]
+    view = memoryview(mapped)[data_offset:]
+    return Raster(name or path.stem, width, height, typecode, view, owner=mapped)
+
+class WorldRasterCache:
+    """Diretório de rasters de um mundo: <cache_dir>/<world_key>/<camada>.npy"""
+
+    def __init__(self, world_key: str, cache_dir: Path = DEFAULT_CACHE_DIR):
+        self.world_key = world_key
+        self.directory = Path(cache_dir) / world_key
+
+    def path_for(self, layer: str) -> Path:
+        return self.directory / f"{layer}.npy"
+
+    def layers(self) -> List[str]:
+        return sorted(p.stem for p in self.directory.glob("*.npy")) if self.directory.exists() else []
+
+    def has(self, layer: str) -> bool:
+        return self.path_for(layer).exists()
+
+    def load(self, layer: str) -> Raster:
+        return open_npy(self.path_for(layer), layer)
+
+    def load_all(self) -> Dict[str, Raster]:
+        return {layer: self.load(layer) for layer in self.layers()}
+
+    def store(self, layer: str, data: bytes, typecode: str, width: int, height: int) -> Raster:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        write_npy(self.path_for(layer), data, typecode, (height, width))
+        return self.load(layer)
+
+class WorldRasterExtractor:
+    """Lê as camadas do world_data uma única vez por mundo e serve do cache depois"""
+
+    def __init__(self, dwarf_reader: CompleteDFInstance, world_data_ptr: int,
+                 cache_dir: Path = DEFAULT_CACHE_DIR, layers=RASTER_LAYERS):
+        self.dwarf_reader = dwarf_reader
+        self.memory = dwarf_reader.memory_reader
+        self.world_data_ptr = world_data_ptr
+        self.cache_dir = Path(cache_dir)
+        self.layers = layers
+
+    def read_world_dimensions(self) -> Tuple[int, int]:
+        """Primeiro par consecutivo de valores plausíveis (16-1024) no cabeçalho do world_data"""
+        header = self.memory.read_memory(self.world_data_ptr, WORLD_DIMENSION_OFFSETS[-1] + 4)
+        if len(header) < WORLD_DIMENSION_OFFSETS[-1] + 4:
+            return 0, 0
+        values = [struct.unpack_from('<i', header, offset)[0] for offset in WORLD_DIMENSION_OFFSETS]
+        for width, height in zip(values, values[1:]):
+            if 16 <= width <= 1024 and 16 <= height <= 1024:
+                return width, height
+        return 0, 0
+
+    def world_key(self, width: int, height: int) -> str:
+        """
+        Chave do mundo: dimensões + hash do início da camada de elevação, que
+        não muda durante o jogo (o layout não expõe a seed do mundo).
+        """
+        elevation = self.layers[0]
+        sample = self.memory.read_memory(self.world_data_ptr + elevation.offset, 0x1000)
+        digest = hashlib.blake2b(sample, digest_size=8).hexdigest()
+        return f"{width}x{height}_{digest}"
+
+    @staticmethod
+    def _typecode_for(size: int, cells: int) -> str:
+        """Maior tipo inteiro que cabe na região para a quantidade de células"""
+        if size >= cells * 4:
+            return 'i'
+        if size >= cells * 2:
+            return 'h'
+        return 'B'
+
+    def extract(self, world_key: Optional[str] = None, width: int = 0, height: int = 0,
+                refresh: bool = False) -> Tuple[WorldRasterCache, Dict[str, Raster]]:
+        """Extrai (ou reaproveita do cache) todas as camadas configuradas"""
+        if world_key and not refresh:
+            # Mundo já conhecido e completo: nenhuma leitura da memória do processo
+            cache = WorldRasterCache(world_key, self.cache_dir)
+            if all(cache.has(spec.name) for spec in self.layers):
+                return cache, {spec.name: cache.load(spec.name) for spec in self.layers}
+
+        if not width or not height:
+            width, height = self.read_world_dimensions()
+        if not width or not height:
+            raise ValueError("Dimensões do mundo não encontradas no world_data")
+
+        cache = WorldRasterCache(world_key or self.world_key(width, height), self.cache_dir)
+        rasters: Dict[str, Raster] = {}
+
+        for spec in self.layers:
+            if cache.has(spec.name) and not refresh:
+                rasters[spec.name] = cache.load(spec.name)
+                continue
+
+            cells = width * height
+            typecode = self._typecode_for(spec.size, cells)
+            item_size = struct.calcsize(typecode)
+            rows = min(height, spec.size // (width * item_size))
+            if rows == 0:
+                logger.warning(f"Camada {spec.name}: região pequena demais para {width}x{height}")
+                continue
+
+            data = self.memory.read_memory(self.world_data_ptr + spec.offset, rows * width * item_size)
+            if not data:
+                logger.warning(f"Camada {spec.name}: falha ao ler 0x{self.world_data_ptr + spec.offset:x}")
+                continue
+
+            rasters[spec.name] = cache.store(spec.name, data, typecode, width, rows)
+            logger.info(f"Camada {spec.name}: {width}x{rows} ({typecode}) gravada em {cache.path_for(spec.name)}")
+
+        return cache, rasters
+
+def main():
+    """Função principal"""
+    print("=" * 60)
+    print("🗺️ WORLD RASTER CACHE")
+    print("=" * 60)
+    print()
+
+    from coordinate_arrays_analyzer import CoordinateArraysAnalyzer
+
+    analyzer = CoordinateArraysAnalyzer()
+    print("🔍 Conectando ao Dwarf Fortress...")
+    if not analyzer.connect_to_df():
+        print("❌ ERRO: Falha ao conectar ao DF")
+        return
+
+    extractor = WorldRasterExtractor(analyzer.dwarf_reader, analyzer.world_data_ptr)
+    try:
+        cache, rasters = extractor.extract()
+    except ValueError as e:
+        print(f"❌ ERRO: {e}")
+        return
+
+    summary = {name: raster.statistics() for name, raster in rasters.items()}
+    print(f"\n🌍 Mundo: {cache.world_key}")
+    for name, stats in summary.items():
+        print(f"   {name}: {stats['width']}x{stats['height']} ({stats['typecode']}), "
+              f"min={stats['min']} max={stats['max']}")
+
+    summary_path = cache.directory / f"summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"\n📁 RASTERS: {cache.directory}")
+
+if __name__ == "__main__":
+    main()
@@ -18,12 +18,14 @@ from decode_skills import get_skill_names
 class DwarfDataDecoder:
     """Decodificador central para todos os dados do Dwarf Fortress"""
     
-    def __init__(self):
+    def __init__(self, race_cache=None):
         self.professions = get_profession_names()
         self.skills = get_skill_names()
         self.attributes = self._load_attribute_names()
         self.labors = self._load_labor_names()
-        self.races = self._load_race_names()
+        # Tabela de raças lida da memória (src/race_cache.py); sem ela, nomes fixos
+        self.race_cache = race_cache
+        self.races = race_cache.race_names() if race_cache else self._load_race_names()
         self.castes = self._load_caste_names()
         self.moods = self._load_mood_names()
         self.body_parts = self._load_body_parts()
@@ -110,6 +112,12 @@ class DwarfDataDecoder:
             2: "Neuter"
         }
         
+    def _caste_name(self, race: int, caste: int) -> str:
+        """Nome da casta da raça (castas variam por raça na tabela real)"""
+        if self.race_cache and self.race_cache.caste(race, caste):
+            return self.race_cache.caste_name(race, caste)
+        return self.castes.get(caste, f"Unknown Caste ({caste})")
+        
     def _load_mood_names(self) -> Dict[int, str]:
         """Nomes dos estados de humor/mood"""
         return {
@@ -180,7 +188,7 @@ class DwarfDataDecoder:
         decoded['decoded_info'] = {
             'profession_name': self.professions.get(dwarf_data['profession'], f"Unknown Profession ({dwarf_data['profession']})"),
             'race_name': self.races.get(dwarf_data['race'], f"Unknown Race ({dwarf_data['race']})"),
-            'caste_name': self.castes.get(dwarf_data['caste'], f"Unknown Caste ({dwarf_data['caste']})"),
+            'caste_name': self._caste_name(dwarf_data['race'], dwarf_data['caste']),
             'gender': "Male" if dwarf_data['sex'] == 0 else "Female" if dwarf_data['sex'] == 1 else "Unknown",
             'mood_name': self.moods.get(dwarf_data['mood'], f"Unknown Mood ({dwarf_data['mood']})"),
             'happiness_level': self._decode_happiness(dwarf_data.get('happiness', 0)),
@@ -419,6 +427,18 @@ class DwarfDataDecoder:
                 
         return sorted(main_traits, key=lambda x: abs(x['value'] - 50), reverse=True)[:5]  # Top 5 traits
 
+def load_saved_race_table(world_key: Optional[str]):
+    """RaceCache gravado em disco para o mundo do export (None se indisponível)"""
+    if not world_key:
+        return None
+    try:
+        sys.path.append(str(Path(__file__).parent.parent / "src"))
+        from race_cache import RaceCache
+    except ImportError:
+        return None
+    cache = RaceCache()
+    return cache if cache.load_from_disk(world_key) else None
+
 def decode_complete_export(input_file: str, output_file: str = None) -> bool:
     """Decodifica um arquivo JSON completo de export"""
     try:
@@ -438,8 +458,8 @@ def decode_complete_export(input_file: str, output_file: str = None) -> bool:
         with open(input_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
             
-        # Inicializar decodificador
-        decoder = DwarfDataDecoder()
+        # Inicializar decodificador com a tabela de raças gravada no export, se houver
+        decoder = DwarfDataDecoder(race_cache=load_saved_race_table(data.get('metadata', {}).get('race_table')))
         
         # Decodificar todos os dwarves
         print(f"Decodificando {len(data['dwarves'])} dwarves...")
@@ -5,24 +5,30 @@ import sys
 sys.path.insert(0, 'python_implementation/src')
 
 from complete_dwarf_reader import MemoryReader
+from reader_daemon import connect_memory_reader
 import psutil
 
-# Find DF
-df_proc = None
-for proc in psutil.process_iter(['pid', 'name']):
-    if 'Dwarf Fortress' in proc.info['name']:
-        df_proc = proc
-        break
+# Reuse the reader daemon's attach when it is running
+mr = connect_memory_reader()
+if mr:
+    print("Using reader daemon")
+else:
+    # Find DF
+    df_proc = None
+    for proc in psutil.process_iter(['pid', 'name']):
+        if 'Dwarf Fortress' in proc.info['name']:
+            df_proc = proc
+            break
 
-if not df_proc:
-    print("ERROR: DF not running")
-    sys.exit(1)
+    if not df_proc:
+        print("ERROR: DF not running")
+        sys.exit(1)
 
-print(f"Found DF: PID {df_proc.pid}")
+    print(f"Found DF: PID {df_proc.pid}")
 
-# Open process
-mr = MemoryReader()
-mr.open_process(df_proc.pid)
+    # Open process
+    mr = MemoryReader()
+    mr.open_process(df_proc.pid)
 
 # Try to read inorganics_vector at hardcoded address
 inorg_vec_addr = 0x142454b58  # From layout